@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, Form, Request, HTTPException, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from sqlalchemy.orm import Session
 from datetime import date
 
 from app.core.database import get_db
 from app.core.dependencies import login_required
 from app.core.models import Assets # DB 모델 import
-from .schemas import AssetCreate
+from .schemas import AssetCreate, BatchDelete, AssetBatchUpdate
+from app.service.batch import batch_delete, batch_update
 from fastapi.templating import Jinja2Templates
 from fastapi import Depends
 from app.core.dependencies import login_required # login_required 추가
@@ -84,3 +85,26 @@ def delete_asset(asset_id: int = Form(...), db: Session = Depends(get_db), ):
         db.commit()
     return RedirectResponse(url="/dashboard", status_code=303)
 
+
+@router.post("/assets/batch_delete", dependencies=[Depends(login_required)])
+def batch_delete_assets(payload: BatchDelete, db: Session = Depends(get_db)):
+    """
+    선택한 자산들을 한 번에 삭제합니다.
+    """
+    deleted = batch_delete(db, Assets, payload.ids)
+    db.commit()
+    return JSONResponse(content={"deleted": deleted})
+
+
+@router.post("/assets/batch_update", dependencies=[Depends(login_required)])
+def batch_update_assets(payload: AssetBatchUpdate, db: Session = Depends(get_db)):
+    """
+    선택한 자산들의 카테고리/항목/메모를 한 번에 수정합니다.
+    """
+    values = payload.model_dump(exclude_unset=True, exclude={"ids"})
+    try:
+        updated = batch_update(db, Assets, payload.ids, values)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return JSONResponse(content={"updated": updated})
@@ -1,12 +1,18 @@
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, Depends, Request, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 # 'Assets'와 'Task' 모델을 import 합니다.
-from app.core.models import Income, Expense, Assets, Task
+from app.core.models import Income, Expense, Assets, Task, row_to_dict
 # get_db 의존성을 정확한 경로에서 가져와야 합니다.
 from app.core.database import get_db
+from app.core.cache import dashboard_cache
+from app.core.http_cache import validator_headers, is_not_modified, not_modified_response, make_etag, conditional_json
+from app.service.rollups import get_grand_totals
 from app.core.dependencies import login_required
 from fastapi import Depends
 
@@ -16,19 +22,39 @@ templates = Jinja2Templates(directory="templates")
 # 라우터 객체를 생성합니다.
 router = APIRouter()
 
-#@router.get("/", response_class=HTMLResponse)
-@router.get("/dashboard", response_class=HTMLResponse, dependencies=[Depends(login_required)])
-def dashboard(request: Request, db: Session = Depends(get_db)):
+# 대시보드에 처음 보여줄 최근 수입/지출 개수 ("더 보기"는 /dashboard/api/* 로 이어서 조회)
+DASHBOARD_LIST_LIMIT = 10
+DASHBOARD_LIST_MAX_LIMIT = 100
+
+# 대시보드 캐시가 의존하는 테이블 (이 테이블에 쓰기가 커밋되면 캐시가 다시 계산됩니다)
+DASHBOARD_TABLES = (Income.__tablename__, Expense.__tablename__, Assets.__tablename__, Task.__tablename__)
+
+
+def get_recent_rows(db: Session, model, before_id: Optional[int] = None, limit: int = DASHBOARD_LIST_LIMIT):
     """
-    대시보드 페이지를 렌더링합니다.
-    수입, 지출, 자산, 알림 데이터를 모두 가져와 템플릿에 전달합니다.
+    최신순(id 내림차순) 목록을 before_id 이전부터 limit 개 가져옵니다.
+    다음 페이지가 있으면 next_before_id 를, 없으면 None 을 함께 반환합니다.
     """
-    incomes = db.query(Income).all()
-    expenses = db.query(Expense).all()
+    query = db.query(model)
+    if before_id is not None:
+        query = query.filter(model.id < before_id)
+    rows = query.order_by(model.id.desc()).limit(limit + 1).all()
+
+    next_before_id = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_before_id
+
+
+def build_dashboard_view(db: Session, today: date) -> dict:
+    """
+    대시보드 화면에 필요한 데이터를 계산합니다. (세션과 분리된 dict 로 반환하여 캐시에 저장)
+    합계는 집계 테이블로, 수입/지출 목록은 최근 항목만 가져옵니다.
+    """
+    incomes, next_income_before_id = get_recent_rows(db, Income)
+    expenses, next_expense_before_id = get_recent_rows(db, Expense)
     assets = db.query(Assets).all()
-    
-    # 등록된 알림(Task) 데이터를 조회합니다.
-    tasks = db.query(Task).order_by(Task.due_date.asc()).all()
+
+    # 등록된 알림(Task) 데이터를 조회합니다. (지난 알림은 화면에 표시하지 않으므로 오늘 이후만)
+    tasks = db.query(Task).filter(Task.due_date >= today).order_by(Task.due_date.asc()).all()
 
     # JavaScript에서 바로 사용할 수 있도록 자산 데이터를 가공합니다.
     assets_data = [
@@ -36,19 +62,86 @@ def dashboard(request: Request, db: Session = Depends(get_db)):
         for asset in assets
     ]
 
-    total_income_sum = sum(income.amount for income in incomes)
-    total_expense_sum = sum(expense.amount for expense in expenses)
+    # 합계는 월별 집계 테이블에서 가져옵니다.
+    total_income_sum, total_expense_sum = get_grand_totals(db)
+
+    return {
+        "incomes": [row_to_dict(i) for i in incomes],
+        "expenses": [row_to_dict(e) for e in expenses],
+        "next_income_before_id": next_income_before_id,
+        "next_expense_before_id": next_expense_before_id,
+        "total_income_sum": total_income_sum,
+        "total_expense_sum": total_expense_sum,
+        "assets_data": assets_data,
+        "tasks_data": [row_to_dict(t) for t in tasks],
+    }
+
+
+#@router.get("/", response_class=HTMLResponse)
+@router.get("/dashboard", response_class=HTMLResponse, dependencies=[Depends(login_required)])
+def dashboard(request: Request, db: Session = Depends(get_db)):
+    """
+    대시보드 페이지를 렌더링합니다.
+    수입, 지출, 자산, 알림 데이터는 데이터가 바뀌기 전까지 메모리 캐시에서 제공합니다.
+    """
+    today = date.today()
+
+    # 데이터가 바뀌지 않았다면 다시 그리지 않고 304 로 응답합니다.
+    headers = validator_headers(("dashboard.html", today), DASHBOARD_TABLES)
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified_response(headers)
 
+    view = get_dashboard_view(db, today)
     return templates.TemplateResponse(
         "dashboard.html",
-        {
-            "request": request,
-            "incomes": incomes,
-            "expenses": expenses,
-            "total_income_sum": total_income_sum,
-            "total_expense_sum": total_expense_sum,
-            "assets_data": assets_data,
-            # 조회된 알림 데이터를 HTML에 전달합니다.
-            "tasks_data": tasks
-        }
+        {"request": request, **view, "data_etag": make_etag(("dashboard", today), DASHBOARD_TABLES)},
+        headers=headers
     )
+
+
+def get_dashboard_view(db: Session, today: date) -> dict:
+    return dashboard_cache.get_or_build(today, DASHBOARD_TABLES, lambda: build_dashboard_view(db, today))
+
+
+@router.get("/dashboard/api/data", dependencies=[Depends(login_required)])
+def get_dashboard_data(request: Request, db: Session = Depends(get_db)):
+    """
+    대시보드 데이터(JSON). ETag 가 같으면(If-None-Match) DB 조회 없이 304 를 반환합니다.
+    """
+    today = date.today()
+    return conditional_json(request, ("dashboard", today), DASHBOARD_TABLES, lambda: get_dashboard_view(db, today))
+
+
+@router.get("/dashboard/api/incomes", dependencies=[Depends(login_required)])
+def get_dashboard_incomes(before_id: Optional[int] = None, limit: int = DASHBOARD_LIST_LIMIT, db: Session = Depends(get_db)):
+    """
+    대시보드 수입 목록 "더 보기"
+    """
+    limit = max(1, min(limit, DASHBOARD_LIST_MAX_LIMIT))
+    incomes, next_before_id = get_recent_rows(db, Income, before_id, limit)
+    result = [{
+        "id": i.id,
+        "income_date": str(i.income_date),
+        "income_type": i.income_type,
+        "amount": i.amount
+    } for i in incomes]
+    return JSONResponse(content={"incomes": result, "next_before_id": next_before_id})
+
+
+@router.get("/dashboard/api/expenses", dependencies=[Depends(login_required)])
+def get_dashboard_expenses(before_id: Optional[int] = None, limit: int = DASHBOARD_LIST_LIMIT, db: Session = Depends(get_db)):
+    """
+    대시보드 지출 목록 "더 보기"
+    """
+    limit = max(1, min(limit, DASHBOARD_LIST_MAX_LIMIT))
+    expenses, next_before_id = get_recent_rows(db, Expense, before_id, limit)
+    result = [{
+        "id": e.id,
+        "expense_date": str(e.expense_date),
+        "expense_type": e.expense_type,
+        "category": e.category,
+        "item": e.item,
+        "amount": e.amount,
+        "notes": e.notes
+    } for e in expenses]
+    return JSONResponse(content={"expenses": result, "next_before_id": next_before_id})
@@ -1,50 +1,220 @@
-import os
-import io
-from datetime import datetime, date
+import base64
+from datetime import date
 from typing import Optional
-from PIL import Image
 
-from fastapi import APIRouter, Depends, Form, Request, status, UploadFile, File
+from fastapi import APIRouter, Depends, Form, Request, status, UploadFile, File, HTTPException
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.models import Diary
 from fastapi import Depends
 from app.core.dependencies import login_required
+from app.core.cache import diary_calendar_cache
+from app.core.http_cache import conditional_json
+from app.service.diary_search import search_diaries, SEARCH_PAGE_SIZE, SEARCH_PAGE_MAX_SIZE
+from app.service.uploads import receive_upload, UploadRejected, UploadRoute
+from app.service.diary_images import (
+    save_diary_image, remove_diary_image, diary_image_sources, diary_image_key, diary_image_lock,
+    content_base_name, DIARY_IMAGE_SIZES,
+)
 
 templates = Jinja2Templates(directory="templates")
-router = APIRouter()
+# 업로드를 받는 라우터: 파일을 요청 스트림에서 바로 저장 폴더로 받습니다. (app.service.uploads.UploadRoute)
+router = APIRouter(route_class=UploadRoute)
+
+# 무한 스크롤 한 번에 불러오는 개수
+DIARY_PAGE_SIZE = 10
+DIARY_PAGE_MAX_SIZE = 50
+# fields=excerpt 일 때 본문 대신 보내는 글자 수 (긴 일기는 "더 보기"로 전체를 불러옵니다)
+DIARY_EXCERPT_LENGTH = 300
+
+
+# --- 일기 목록 커서 ---
+# (diary_date, id) 를 "날짜|id" 로 묶어 URL-safe base64 로 인코딩합니다. (클라이언트는 값을 해석하지 않고 그대로 돌려줌)
+def encode_diary_cursor(diary_date: date, diary_id: int) -> str:
+    raw = f"{diary_date.isoformat()}|{diary_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_diary_cursor(cursor: Optional[str]):
+    """
+    커서를 (날짜, id) 로 해석합니다. 형식이 잘못되면 None (처음부터)
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        date_part, id_part = raw.split("|")
+        return date.fromisoformat(date_part), int(id_part)
+    except ValueError:
+        return None
+
+
+def get_diary_entries(db: Session, cursor=None, direction: str = "next", limit: int = DIARY_PAGE_SIZE, excerpt: bool = False):
+    """
+    날짜 오름차순 일기 목록을 커서 기준으로 limit 개 가져옵니다.
+    (diary_date, id) 범위 조건이라 ux_diaries_diary_date 인덱스에서 바로 시작하므로, 얼마나 깊이 스크롤해도 비용이 같습니다.
+      - direction="next": 커서 이후(더 최근) 항목
+      - direction="prev": 커서 이전(더 오래된) 항목
+    반환: (항목 dict 목록(항상 날짜 오름차순), prev_cursor, next_cursor) - 더 없으면 커서는 None
+    """
+    text_col = func.substr(Diary.content, 1, DIARY_EXCERPT_LENGTH + 1) if excerpt else Diary.content
+    query = select(Diary.id, Diary.diary_date, Diary.image_url, Diary.video_url, text_col.label("text"))
+    key = tuple_(Diary.diary_date, Diary.id)
+
+    backward = direction == "prev"
+    if cursor is not None:
+        query = query.filter(key < tuple_(*cursor) if backward else key > tuple_(*cursor))
+    if backward:
+        query = query.order_by(Diary.diary_date.desc(), Diary.id.desc())
+    else:
+        query = query.order_by(Diary.diary_date.asc(), Diary.id.asc())
+    rows = db.execute(query.limit(limit + 1)).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+
+    entries = []
+    for row in rows:
+        entry = {
+            "id": row.id,
+            "diary_date": str(row.diary_date),
+            "image_url": row.image_url,
+            "image": diary_image_sources(row.image_url),
+            "video_url": row.video_url,
+        }
+        if excerpt:
+            text = row.text or ""
+            entry["excerpt"] = text[:DIARY_EXCERPT_LENGTH]
+            entry["truncated"] = len(text) > DIARY_EXCERPT_LENGTH
+        else:
+            entry["content"] = row.text
+        entries.append(entry)
+
+    if not rows:
+        return entries, None, None
+    first_cursor = encode_diary_cursor(rows[0].diary_date, rows[0].id)
+    last_cursor = encode_diary_cursor(rows[-1].diary_date, rows[-1].id)
+    # 요청한 방향은 한 개 더 읽어 확인하고, 반대 방향은 커서가 있었다면(=그 앞에 항목이 있었음) 이어서 볼 수 있습니다.
+    if backward:
+        return entries, first_cursor if has_more else None, last_cursor if cursor is not None else None
+    return entries, first_cursor if cursor is not None else None, last_cursor if has_more else None
+
+
+# --- 달력 ---
+# 월마다 일기가 있는 날을 비트마스크 정수로 보냅니다. (1일 = 1 << 0, 31일 = 1 << 30)
+# 달력은 보고 있는 달만 요청하고, 일기가 저장/삭제되어 diaries 버전이 바뀔 때까지 캐시와 ETag(304)로 응답합니다.
+CALENDAR_TABLES = (Diary.__tablename__,)
+
+
+def get_diary_calendar(db: Session, year: int, month: Optional[int] = None) -> dict:
+    """
+    {"YYYY-MM": 비트마스크} (month 가 없으면 그 해 12개월 모두)
+    ux_diaries_diary_date 인덱스 범위만 읽습니다. (테이블 접근 없음)
+    """
+    start = date(year, month or 1, 1)
+    end = date(year + 1, 1, 1) if (month or 12) == 12 else date(year, (month or 12) + 1, 1)
+    masks = {f"{year}-{m:02d}": 0 for m in ([month] if month else range(1, 13))}
+    rows = db.execute(
+        select(Diary.diary_date).filter(Diary.diary_date >= start, Diary.diary_date < end)
+    ).scalars()
+    for diary_date in rows:
+        masks[f"{diary_date.year}-{diary_date.month:02d}"] |= 1 << (diary_date.day - 1)
+    return masks
+
+
+@router.get("/diary/api/calendar", dependencies=[Depends(login_required)])
+def get_diary_calendar_api(request: Request, year: int, month: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    달력에 표시할 일기 작성일. {"months": {"YYYY-MM": 비트마스크}} - 비트 (일 - 1) 이 켜져 있으면 그날 일기가 있습니다.
+    """
+    if not 1 <= year <= 9998 or (month is not None and not 1 <= month <= 12):
+        raise HTTPException(status_code=400, detail="year/month 값이 올바르지 않습니다.")
+    key = ("diary_calendar", year, month)
+    return conditional_json(request, key, CALENDAR_TABLES, lambda: {
+        "months": diary_calendar_cache.get_or_build(key, CALENDAR_TABLES, lambda: get_diary_calendar(db, year, month))
+    })
 
-UPLOAD_FOLDER = "static/diary"
 
 @router.get("/diary", response_class=HTMLResponse,dependencies=[Depends(login_required)] )
 def get_diary_page(request: Request, db: Session = Depends(get_db)):
-    all_dates_query = db.query(Diary.diary_date).all()
-    all_dates = [str(d[0]) for d in all_dates_query]
-    
-    # 첫 화면: 무한 스크롤을 위해 10개만 로드 (오름차순)
-    diaries = db.query(Diary).order_by(Diary.diary_date.asc()).limit(10).all()
+    # 첫 화면: 무한 스크롤을 위해 10개만 로드 (오름차순), 이후는 next_cursor 로 이어서 불러옵니다.
+    diaries, _, next_cursor = get_diary_entries(db, excerpt=True)
     
     return templates.TemplateResponse("diary.html", {
         "request": request,
         "diaries": diaries,
-        "all_dates": all_dates
+        "next_cursor": next_cursor,
+        "image_sizes": DIARY_IMAGE_SIZES
     })
 
 @router.get("/diary/api/list")
-def get_diary_list(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    diaries = db.query(Diary).order_by(Diary.diary_date.asc()).offset(skip).limit(limit).all()
-    result = [{
-        "id": d.id,
-        "diary_date": str(d.diary_date),
-        "content": d.content,
-        "image_url": d.image_url,
-        "video_url": d.video_url
-    } for d in diaries]
-    
-    return JSONResponse(content={"diaries": result})
+def get_diary_list(
+    cursor: Optional[str] = None,
+    direction: str = "next",
+    limit: int = DIARY_PAGE_SIZE,
+    fields: str = "full",
+    db: Session = Depends(get_db)
+):
+    """
+    무한 스크롤용 일기 목록 (날짜 오름차순).
+    - cursor: 응답의 next_cursor / prev_cursor 를 그대로 전달 (없으면 처음부터)
+    - direction: next(이후 항목) | prev(이전 항목)
+    - fields: full(본문 전체) | excerpt(앞부분 DIARY_EXCERPT_LENGTH 자 + truncated)
+    """
+    if direction not in ("next", "prev"):
+        raise HTTPException(status_code=400, detail="direction 은 next 또는 prev 만 가능합니다.")
+    limit = max(1, min(limit, DIARY_PAGE_MAX_SIZE))
+    diaries, prev_cursor, next_cursor = get_diary_entries(
+        db, decode_diary_cursor(cursor), direction, limit, excerpt=(fields == "excerpt")
+    )
+    return JSONResponse(content={"diaries": diaries, "prev_cursor": prev_cursor, "next_cursor": next_cursor})
+
+@router.get("/diary/api/entry/{diary_id}", dependencies=[Depends(login_required)])
+def get_diary_entry(diary_id: int, db: Session = Depends(get_db)):
+    """
+    일기 한 편의 본문 전체 (목록에서 요약만 받은 항목의 "더 보기"/수정에 사용)
+    """
+    diary = db.get(Diary, diary_id)
+    if diary is None:
+        raise HTTPException(status_code=404, detail="일기를 찾을 수 없습니다.")
+    return JSONResponse(content={
+        "id": diary.id,
+        "diary_date": str(diary.diary_date),
+        "content": diary.content,
+        "image_url": diary.image_url,
+        "image": diary_image_sources(diary.image_url),
+        "video_url": diary.video_url
+    })
+
+@router.get("/diary/api/search", dependencies=[Depends(login_required)])
+def search_diary(q: str = "", offset: int = 0, limit: int = SEARCH_PAGE_SIZE, db: Session = Depends(get_db)):
+    """
+    일기 전문 검색 (관련도순). 다음 페이지는 응답의 next_offset 을 offset 으로 전달합니다.
+    결과의 snippet 은 HTML 이스케이프되어 있고 일치한 부분만 <mark> 로 감싸져 있습니다.
+    """
+    limit = max(1, min(limit, SEARCH_PAGE_MAX_SIZE))
+    return JSONResponse(content=search_diaries(db, q.strip(), max(offset, 0), limit))
+
+async def release_diary_image(db: AsyncSession, image_url: Optional[str]):
+    """
+    더 이상 이 사진을 쓰는 일기가 없으면 사진 파일(모든 변형)을 삭제합니다. (참조 수 = 같은 image_url 을 가진 일기 수)
+    커밋 후에 호출해야 방금 바꾼/삭제한 일기가 참조 수에서 빠집니다.
+    같은 사진을 저장 중인 요청이 있으면 그 요청이 커밋할 때까지 기다렸다가 참조 수를 셉니다.
+    """
+    if not image_url:
+        return
+    async with diary_image_lock(diary_image_key(image_url)):
+        refs = await db.scalar(select(func.count()).select_from(Diary).filter(Diary.image_url == image_url))
+        if refs == 0:
+            remove_diary_image(image_url)
+
 
 @router.post("/diary/save")
 async def save_diary(
@@ -53,72 +223,68 @@ async def save_diary(
     youtube: Optional[str] = Form(""),
     delete_image: Optional[str] = Form("false"),  # [추가됨] 사진 삭제 신호
     file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
+    upload = None
     image_url = None
+    created = False
+    released_url = None
     
-    # 1. 새 파일 업로드 처리
+    # 1. 새 파일 업로드 처리 (파일 복사는 스레드, 크기별 변형 생성은 프로세스 풀에서 실행되어 다른 요청을 막지 않음)
     if file and file.filename:
-        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        timestamp = datetime.now().strftime("%H%M%S")
-        safe_filename = f"{date}_{timestamp}_compressed.jpg"
-        file_path = os.path.join(UPLOAD_FOLDER, safe_filename)
-        
-        content = await file.read()
         try:
-            img = Image.open(io.BytesIO(content))
-            if img.mode != 'RGB': img = img.convert('RGB')
-            img.thumbnail((1200, 1200))
-            img.save(file_path, "JPEG", quality=80, optimize=True)
-            image_url = f"/static/diary/{safe_filename}"
-        except Exception as e:
-            with open(file_path, "wb") as buffer: buffer.write(content)
-            image_url = f"/static/diary/{safe_filename}"
-
-    # 2. 기존 일기 덮어쓰기 로직
-    existing_diary = db.query(Diary).filter(Diary.diary_date == date).first()
-    
-    if existing_diary:
-        existing_diary.content = text
-        existing_diary.video_url = youtube
-        
-        # 사용자가 X 버튼을 눌러 사진을 비운 상태로 수정(저장)한 경우 OR 새 사진을 올린 경우 기존 파일 삭제
-        if delete_image == "true" or image_url:
-            if existing_diary.image_url:
-                old_file_path = existing_diary.image_url.lstrip('/')
-                if os.path.exists(old_file_path):
-                    try: os.remove(old_file_path)
-                    except: pass
-            
-            # X를 눌러 삭제 처리한 경우 DB에서도 비움
-            if delete_image == "true":
-                existing_diary.image_url = None
-
-        # 새 사진을 올렸다면 새 경로로 덮어쓰기
-        if image_url:
-            existing_diary.image_url = image_url
-            
-    else:
-        # 신규 생성
-        new_diary = Diary(diary_date=date, content=text, video_url=youtube, image_url=image_url)
-        db.add(new_diary)
-        
-    db.commit()
+            upload = await receive_upload(file, "diary")
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    # 같은 사진의 저장과 삭제가 엇갈리지 않도록 사진 저장부터 커밋까지 이 사진을 잠급니다.
+    async with diary_image_lock(content_base_name(upload.sha256) if upload else None):
+        if upload:
+            image_url, created = await save_diary_image(upload)
+        try:
+            # 2. 기존 일기 덮어쓰기 로직
+            result = await db.execute(select(Diary).filter(Diary.diary_date == date))
+            existing_diary = result.scalars().first()
+
+            if existing_diary:
+                existing_diary.content = text
+                existing_diary.video_url = youtube
+
+                # 사용자가 X 버튼을 눌러 사진을 비운 상태로 수정(저장)한 경우 OR 새 사진을 올린 경우 기존 사진을 놓음
+                # (파일은 커밋 후 다른 일기가 쓰고 있지 않을 때만 삭제)
+                if (delete_image == "true" or image_url) and existing_diary.image_url != image_url:
+                    released_url = existing_diary.image_url
+
+                    # X를 눌러 삭제 처리한 경우 DB에서도 비움
+                    if delete_image == "true":
+                        existing_diary.image_url = None
+
+                # 새 사진을 올렸다면 새 경로로 덮어쓰기
+                if image_url:
+                    existing_diary.image_url = image_url
+
+            else:
+                # 신규 생성
+                new_diary = Diary(diary_date=date, content=text, video_url=youtube, image_url=image_url)
+                db.add(new_diary)
+
+            await db.commit()
+        except BaseException:
+            # 커밋하지 못했으면 이 요청이 새로 만든 사진 파일은 아무 일기도 쓰지 않으므로 지웁니다.
+            if created:
+                remove_diary_image(image_url)
+            raise
+    await release_diary_image(db, released_url)
     return JSONResponse(content={"status": "success"})
 
 @router.post("/diary/delete")
-async def delete_diary(diary_id: int = Form(...), db: Session = Depends(get_db)):
-    diary = db.query(Diary).filter(Diary.id == diary_id).first()
+async def delete_diary(diary_id: int = Form(...), db: AsyncSession = Depends(get_async_db)):
+    diary = await db.get(Diary, diary_id)
     if diary:
-        if diary.image_url:
-            file_path = diary.image_url.lstrip('/')
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except:
-                    pass
-        db.delete(diary)
-        db.commit()
+        image_url = diary.image_url
+        await db.delete(diary)
+        await db.commit()
+        await release_diary_image(db, image_url)
         return JSONResponse(content={"status": "success"})
     
     return JSONResponse(content={"status": "error", "message": "일기를 찾을 수 없습니다."}, status_code=404)
\ No newline at end of file
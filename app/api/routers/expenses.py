@@ -1,18 +1,22 @@
 from fastapi import APIRouter, Depends, Form, Request, HTTPException, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from sqlalchemy import case
 from datetime import date
 from typing import Optional
 from fastapi import Depends
 
 import json
+from urllib.parse import urlencode
 
 # 데이터베이스 및 모델을 정확한 경로에서 가져옵니다.
 from app.core.database import get_db
-from app.core.models import Expense, Income
+from app.core.models import Expense, Income, EXPENSE_TYPE_ORDER, EXPENSE_CATEGORY_ORDER
 from app.core.dependencies import login_required
+from app.service.rollups import get_grand_totals, get_expense_category_totals
+from app.service.batch import batch_delete, batch_update
+from app.service.archive import expense_archive_page, archived_row_count
+from app.api.schemas import BatchDelete, ExpenseBatchUpdate, IncomeBatchUpdate
 
 # Jinja2 템플릿 설정을 가져옵니다.
 templates = Jinja2Templates(directory="templates")
@@ -20,41 +24,127 @@ templates = Jinja2Templates(directory="templates")
 # 라우터 객체를 생성합니다.
 router = APIRouter()
 
+# 한 페이지에 보여줄 수입/지출 개수
+EXPENSES_PAGE_SIZE = 50
+EXPENSES_PAGE_MAX_SIZE = 200
+
+
+def encode_expense_cursor(type_rank: int, category_rank: int, expense_id: int) -> str:
+    return f"{type_rank}.{category_rank}.{expense_id}"
+
+
+def decode_expense_cursor(cursor: Optional[str]):
+    """
+    "유형순서.카테고리순서.id" 형식의 커서를 해석합니다. 형식이 잘못되면 None (첫 페이지)
+    """
+    if not cursor:
+        return None
+    try:
+        type_rank, category_rank, expense_id = (int(part) for part in cursor.split("."))
+    except ValueError:
+        return None
+    return type_rank, category_rank, expense_id
+
+
+def get_expense_page(db: Session, cursor, limit: int):
+    """
+    (유형 순서, 카테고리 순서, 최신순) 정렬로 커서 다음의 지출 limit 개를 가져옵니다.
+    OR 조건 하나로 합치면 SQLite가 인덱스를 처음부터 훑으므로,
+    ix_expenses_sort_order 인덱스 범위 검색이 되는 3단계로 나눠 필요한 만큼만 조회합니다.
+      1) 같은 유형/카테고리에서 id 가 더 작은 항목
+      2) 같은 유형에서 다음 카테고리
+      3) 다음 유형
+    """
+    query = db.query(Expense, EXPENSE_TYPE_ORDER, EXPENSE_CATEGORY_ORDER)
+    if cursor is None:
+        stages = [query.order_by(EXPENSE_TYPE_ORDER, EXPENSE_CATEGORY_ORDER, Expense.id.desc())]
+    else:
+        type_rank, category_rank, expense_id = cursor
+        stages = [
+            query.filter(EXPENSE_TYPE_ORDER == type_rank, EXPENSE_CATEGORY_ORDER == category_rank, Expense.id < expense_id)
+                 .order_by(Expense.id.desc()),
+            query.filter(EXPENSE_TYPE_ORDER == type_rank, EXPENSE_CATEGORY_ORDER > category_rank)
+                 .order_by(EXPENSE_CATEGORY_ORDER, Expense.id.desc()),
+            query.filter(EXPENSE_TYPE_ORDER > type_rank)
+                 .order_by(EXPENSE_TYPE_ORDER, EXPENSE_CATEGORY_ORDER, Expense.id.desc()),
+        ]
+
+    rows = []
+    for stage in stages:
+        rows += stage.limit(limit + 1 - len(rows)).all()
+        if len(rows) > limit:
+            break
+
+    next_cursor = encode_expense_cursor(rows[limit - 1][1], rows[limit - 1][2], rows[limit - 1][0].id) if len(rows) > limit else None
+    return [row[0] for row in rows[:limit]], next_cursor
+
+
+def get_income_page(db: Session, before_id: Optional[int], limit: int):
+    """
+    최신순(id 내림차순)으로 before_id 이전의 수입 limit 개를 가져옵니다.
+    """
+    query = db.query(Income)
+    if before_id is not None:
+        query = query.filter(Income.id < before_id)
+    incomes = query.order_by(Income.id.desc()).limit(limit + 1).all()
+    next_before_id = incomes[limit - 1].id if len(incomes) > limit else None
+    return incomes[:limit], next_before_id
+
+
+def _expenses_url(**params) -> str:
+    query = urlencode({key: value for key, value in params.items() if value is not None})
+    return f"/expenses?{query}" if query else "/expenses"
+
+
 @router.get("/expenses", response_class=HTMLResponse, dependencies=[Depends(login_required)])
-def get_expenses_page(request: Request, db: Session = Depends(get_db)):
+def get_expenses_page(
+    request: Request,
+    income_before: Optional[int] = None,
+    expense_cursor: Optional[str] = None,
+    limit: int = EXPENSES_PAGE_SIZE,
+    archived: bool = False,
+    archive_before: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
     """
     월급 및 지출 내역을 보여주는 메인 페이지를 렌더링합니다.
+    목록은 커서 기반으로 한 페이지씩, 합계는 집계 테이블에서 가져오므로 기록이 쌓여도 응답 시간이 일정합니다.
+    ?archived=1 이면 지출 목록 대신 보관(아카이브)된 지출을 보여줍니다. (읽기 전용)
     """
-    incomes = db.query(Income).order_by(Income.id.desc()).all()
-    
+    limit = max(1, min(limit, EXPENSES_PAGE_MAX_SIZE))
+    incomes, next_income_before = get_income_page(db, income_before, limit)
+
     # ▼▼▼ [수정] 다중 정렬 조건 적용 (case 문 활용) ▼▼▼
     # 1. '고정적' -> '변동적' 순서 지정
-    type_order = case(
-        (Expense.expense_type == '고정적', 1),
-        (Expense.expense_type == '변동적', 2),
-        else_=3
-    )
-
     # 2. '저축' -> '주거/통신' -> '용돈' 순서 지정
-    category_order = case(
-        (Expense.category == '저축', 1),
-        (Expense.category == '주거/통신', 2),
-        (Expense.category == '용돈', 3),
-        else_=4
-    )
-
+    # (정렬 식은 ix_expenses_sort_order 인덱스와 동일해야 하므로 models.py에 정의되어 있습니다)
     # 정렬 적용 (조건 1 -> 조건 2 -> 같은 조건일 경우 최신순)
-    expenses = db.query(Expense).order_by(type_order, category_order, Expense.id.desc()).all()
+    if archived:
+        expenses, next_archive_before = expense_archive_page(db, archive_before, limit)
+        next_expense_cursor = None
+    else:
+        expenses, next_expense_cursor = get_expense_page(db, decode_expense_cursor(expense_cursor), limit)
     # ▲▲▲ 여기까지 ▲▲▲
     
-    total_income = sum(income.amount for income in incomes)
-    total_expense = sum(expense.amount for expense in expenses)
+    # 합계는 월별 집계 테이블에서 가져옵니다. (행 수가 아닌 기간 x 카테고리 수에 비례)
+    total_income, total_expense = get_grand_totals(db)
     balance = total_income - total_expense
 
-    # 모든 지출의 카테고리별 합계 계산
-    expense_category_totals = {}
-    for expense in expenses:
-        expense_category_totals[expense.category] = expense_category_totals.get(expense.category, 0) + expense.amount
+    # 모든 지출의 카테고리별 합계
+    expense_category_totals = get_expense_category_totals(db)
+
+    # 페이지 이동 링크 (다른 목록의 현재 위치는 유지)
+    page_limit = limit if limit != EXPENSES_PAGE_SIZE else None
+    next_income_url = _expenses_url(income_before=next_income_before, expense_cursor=expense_cursor, limit=page_limit) if next_income_before else None
+    next_expense_url = _expenses_url(income_before=income_before, expense_cursor=next_expense_cursor, limit=page_limit) if next_expense_cursor else None
+    first_income_url = _expenses_url(expense_cursor=expense_cursor, limit=page_limit) if income_before else None
+    first_expense_url = _expenses_url(income_before=income_before, limit=page_limit) if expense_cursor else None
+    if archived:
+        next_expense_url = _expenses_url(income_before=income_before, archived=1, archive_before=next_archive_before, limit=page_limit) if next_archive_before else None
+        first_expense_url = _expenses_url(income_before=income_before, archived=1, limit=page_limit) if archive_before else None
+    # 보관된 지출이 있으면 목록 전환 링크를 보여줍니다.
+    archived_count = archived_row_count(db, Expense)
+    toggle_archive_url = _expenses_url(income_before=income_before, archived=None if archived else 1, limit=page_limit) if archived_count else None
     
     return templates.TemplateResponse("expenses.html", {
         "request": request,
@@ -63,7 +153,14 @@ def get_expenses_page(request: Request, db: Session = Depends(get_db)):
         "total_income": total_income,
         "total_expense": total_expense,
         "balance": balance,
-        "expense_category_totals": expense_category_totals
+        "expense_category_totals": expense_category_totals,
+        "next_income_url": next_income_url,
+        "next_expense_url": next_expense_url,
+        "first_income_url": first_income_url,
+        "first_expense_url": first_expense_url,
+        "archived_view": archived,
+        "archived_count": archived_count,
+        "toggle_archive_url": toggle_archive_url
     })
 
 @router.post("/add_income", response_class=RedirectResponse, dependencies=[Depends(login_required)])
@@ -134,6 +231,49 @@ def delete_expense(expense_id: int = Form(...), db: Session = Depends(get_db)):
     db.commit()
     return RedirectResponse(url="/expenses", status_code=status.HTTP_303_SEE_OTHER)
 
+def _batch_update_or_400(db: Session, model, payload) -> int:
+    values = payload.model_dump(exclude_unset=True, exclude={"ids"})
+    try:
+        return batch_update(db, model, payload.ids, values)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/expenses/batch_delete", dependencies=[Depends(login_required)])
+def batch_delete_expenses(payload: BatchDelete, db: Session = Depends(get_db)):
+    """
+    선택한 지출 항목들을 한 번에 삭제합니다. (한 트랜잭션, 삭제된 개수 반환)
+    """
+    deleted = batch_delete(db, Expense, payload.ids)
+    db.commit()
+    return JSONResponse(content={"deleted": deleted})
+
+@router.post("/expenses/batch_update", dependencies=[Depends(login_required)])
+def batch_update_expenses(payload: ExpenseBatchUpdate, db: Session = Depends(get_db)):
+    """
+    선택한 지출 항목들의 유형/카테고리 등을 한 번에 바꿉니다. (보낸 항목만 수정, 수정된 개수 반환)
+    """
+    updated = _batch_update_or_400(db, Expense, payload)
+    db.commit()
+    return JSONResponse(content={"updated": updated})
+
+@router.post("/incomes/batch_delete", dependencies=[Depends(login_required)])
+def batch_delete_incomes(payload: BatchDelete, db: Session = Depends(get_db)):
+    """
+    선택한 수입 항목들을 한 번에 삭제합니다.
+    """
+    deleted = batch_delete(db, Income, payload.ids)
+    db.commit()
+    return JSONResponse(content={"deleted": deleted})
+
+@router.post("/incomes/batch_update", dependencies=[Depends(login_required)])
+def batch_update_incomes(payload: IncomeBatchUpdate, db: Session = Depends(get_db)):
+    """
+    선택한 수입 항목들의 날짜/유형을 한 번에 바꿉니다.
+    """
+    updated = _batch_update_or_400(db, Income, payload)
+    db.commit()
+    return JSONResponse(content={"updated": updated})
+
 @router.get("/edit_expense/{expense_id}", response_class=HTMLResponse, dependencies=[Depends(login_required)])
 def edit_expense_form(request: Request, expense_id: int, db: Session = Depends(get_db)):
     """
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.dependencies import login_required
+from app.service.importer import IMPORT_TARGETS, ImportFormatError, iter_upload_rows, import_rows
+
+router = APIRouter()
+
+
+@router.post("/import/{target}", dependencies=[Depends(login_required)])
+async def import_file(
+    target: str,
+    file: UploadFile = File(...),
+    dry_run: bool = Form(False),
+    db: Session = Depends(get_db),
+):
+    """
+    CSV / XLSX 파일로 수입(incomes), 지출(expenses), 가계부 지출(ledger)을 한꺼번에 등록합니다.
+    잘못된 행은 건너뛰고 행 번호와 사유를 함께 반환합니다. dry_run 이면 검증만 하고 저장하지 않습니다.
+    """
+    if target not in IMPORT_TARGETS:
+        raise HTTPException(status_code=404, detail=f"가져올 수 없는 대상입니다: {target}")
+
+    def _run():
+        # 파일 파싱과 DB 저장은 블로킹 작업이므로 스레드에서 실행합니다.
+        rows = iter_upload_rows(file.filename, file.file)
+        return import_rows(db, target, rows, dry_run=dry_run)
+
+    try:
+        report = await run_in_threadpool(_run)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        await file.close()
+
+    return JSONResponse(content=report)
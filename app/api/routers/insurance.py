@@ -1,23 +1,42 @@
 import os
-import shutil
-from uuid import uuid4
 from typing import Optional
-from fastapi import APIRouter, Depends, Form, Request, UploadFile, File
+from fastapi import APIRouter, Depends, Form, Request, UploadFile, File, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_async_db
 from app.core.models import Insurance, FamilyMember
 from fastapi import Depends
 from app.core.dependencies import login_required # login_required 추가
+from app.service.uploads import receive_upload, UploadRejected, UploadRoute
+from app.service.document_store import DOCUMENT_ROOT, store_document, release_document
 
-router = APIRouter()
+# 업로드를 받는 라우터: 파일을 요청 스트림에서 바로 저장 폴더로 받습니다. (app.service.uploads.UploadRoute)
+router = APIRouter(route_class=UploadRoute)
 templates = Jinja2Templates(directory="templates")
 
-UPLOAD_DIR = "static/uploads"
+UPLOAD_DIR = DOCUMENT_ROOT
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
+
+async def save_insurance_file(db: AsyncSession, file: UploadFile) -> str:
+    """
+    보험 서류를 문서 저장소에 넣고 URL 을 반환합니다. (형식/크기 확인과 해시 계산은 스레드에서)
+    같은 내용의 파일이 이미 있으면 그 파일을 함께 쓰며, 파일은 db 가 커밋될 때 제자리로 옮겨집니다.
+    """
+    try:
+        upload = await receive_upload(file, "insurance")
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    try:
+        return await db.run_sync(store_document, upload)
+    except BaseException:
+        upload.discard()
+        raise
+
 # --- [기존] 조회 페이지 ---
 @router.get("/insurance", response_class=HTMLResponse, dependencies=[Depends(login_required)])
 def get_insurance_page(request: Request, db: Session = Depends(get_db)):
@@ -25,13 +44,11 @@ def get_insurance_page(request: Request, db: Session = Depends(get_db)):
     default_names = ["재원", "다슬", "딸기"]
     current_members = db.query(FamilyMember).all()
     current_names = [m.name for m in current_members]
-    
-    is_added = False
-    for name in default_names:
-        if name not in current_names:
-            db.add(FamilyMember(name=name))
-            is_added = True
-    if is_added:
+
+    # 없는 기본 가족은 한 문장(executemany)으로 추가합니다. (하나씩 추가하면 INSERT 가 사람 수만큼 실행됨)
+    missing_names = [name for name in default_names if name not in current_names]
+    if missing_names:
+        db.execute(insert(FamilyMember), [{"name": name} for name in missing_names])
         db.commit()
         current_members = db.query(FamilyMember).all()
 
@@ -51,18 +68,14 @@ async def add_insurance(
     company: str = Form(...),
     memo: Optional[str] = Form(None),
     file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     file_path = None
     if file and file.filename:
-        extension = file.filename.split(".")[-1]
-        new_filename = f"{uuid4()}.{extension}"
-        file_location = os.path.join(UPLOAD_DIR, new_filename)
-        with open(file_location, "wb+") as file_object:
-            shutil.copyfileobj(file.file, file_object)
-        file_path = f"/static/uploads/{new_filename}"
-
-    member = db.query(FamilyMember).filter(FamilyMember.name == member_name).first()
+        file_path = await save_insurance_file(db, file)
+
+    result = await db.execute(select(FamilyMember).filter(FamilyMember.name == member_name))
+    member = result.scalars().first()
     member_id = member.id if member else 0
     
     new_ins = Insurance(
@@ -74,7 +87,7 @@ async def add_insurance(
         file_path=file_path
     )
     db.add(new_ins)
-    db.commit()
+    await db.commit()
     return RedirectResponse(url="/insurance", status_code=303)
 
 # --- [추가됨] 수정 로직 (Update) ---
@@ -86,12 +99,17 @@ async def update_insurance(
     company: str = Form(...),
     memo: Optional[str] = Form(None),
     file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    ins = db.query(Insurance).filter(Insurance.id == insurance_id).first()
+    ins = await db.get(Insurance, insurance_id)
     if not ins:
         return RedirectResponse(url="/insurance", status_code=303)
 
+    # 새 파일은 먼저 받아 둡니다. (형식/크기 때문에 거절되면 기존 파일과 정보를 그대로 둠)
+    new_file_path = None
+    if file and file.filename:
+        new_file_path = await save_insurance_file(db, file)
+
     # 텍스트 정보 업데이트
     ins.family_member_name = member_name
     ins.insurance_name = insurance_name
@@ -99,32 +117,24 @@ async def update_insurance(
     ins.memo = memo
 
     # 사용자 ID 재매핑
-    member = db.query(FamilyMember).filter(FamilyMember.name == member_name).first()
+    result = await db.execute(select(FamilyMember).filter(FamilyMember.name == member_name))
+    member = result.scalars().first()
     if member:
         ins.family_member_id = member.id
 
     # 파일이 새로 업로드된 경우 교체
-    if file and file.filename:
-        # 1. 기존 파일 삭제 (선택 사항)
-        if ins.file_path:
-            try:
-                old_path = ins.file_path.lstrip("/")
-                if os.path.exists(old_path):
-                    os.remove(old_path)
-            except Exception as e:
-                print(f"기존 파일 삭제 실패: {e}")
-
-        # 2. 새 파일 저장
-        extension = file.filename.split(".")[-1]
-        new_filename = f"{uuid4()}.{extension}"
-        file_location = os.path.join(UPLOAD_DIR, new_filename)
-        
-        with open(file_location, "wb+") as file_object:
-            shutil.copyfileobj(file.file, file_object)
-        
-        ins.file_path = f"/static/uploads/{new_filename}"
-
-    db.commit()
+    if new_file_path:
+        # 1. 기존 파일의 참조를 내림 (다른 보험이 쓰지 않으면 커밋 후 삭제)
+        if ins.file_path and ins.file_path != new_file_path:
+            await db.run_sync(release_document, ins.file_path)
+        elif ins.file_path:
+            # 같은 파일을 다시 올린 경우: 방금 올린 참조만 되돌림
+            await db.run_sync(release_document, new_file_path)
+
+        # 2. 새 파일로 교체
+        ins.file_path = new_file_path
+
+    await db.commit()
     return RedirectResponse(url="/insurance", status_code=303)
 
 # --- [기존] 삭제 로직 ---
@@ -132,11 +142,8 @@ async def update_insurance(
 def delete_insurance(insurance_id: int = Form(...), db: Session = Depends(get_db)):
     ins = db.query(Insurance).filter(Insurance.id == insurance_id).first()
     if ins:
-        if ins.file_path:
-            try:
-                os.remove(ins.file_path.lstrip("/"))
-            except:
-                pass
+        # 파일은 다른 보험이 쓰지 않을 때만 커밋 후 삭제됩니다.
+        release_document(db, ins.file_path)
         db.delete(ins)
         db.commit()
     return RedirectResponse(url="/insurance", status_code=303)
\ No newline at end of file
@@ -1,176 +1,260 @@
 # app/api/routers/monthly_ledger.py
+import os
 import json
-from fastapi import APIRouter, Depends, Request, Form, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, Form, HTTPException, Query
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_async_db
 from app.core.models import LedgerExpense, MonthlyBudget
+from app.core.cache import ledger_cache
+from app.core.http_cache import validator_headers, is_not_modified, not_modified_response, make_etag, conditional_json, CACHE_CONTROL
 from datetime import datetime, date, timedelta
-from dateutil.relativedelta import relativedelta
-import openpyxl
-from io import BytesIO
+from app.core.periods import parse_period, period_for, period_bounds, period_to_date, shift_period
 from urllib.parse import quote
 from fastapi import Depends
 from app.core.dependencies import login_required 
+from app.service.rollups import get_ledger_category_totals
+from app.service.batch import batch_delete, batch_update
+from app.service.ledger_export import export_ledger_to_tempfile, export_periods
+from app.service.archive import ledger_rows_for_period
+from app.service.export_cache import ledger_export_cache, ledger_export_versions, export_digest, iter_file
+from app.service.trends import build_trend_matrix
+from app.service.forecast import build_cycle_forecast
+from app.api.schemas import BatchDelete, LedgerExpenseBatchUpdate
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
 DEFAULT_BUDGET = 700000
-def adjust_date_for_weekend(target_date: date) -> date:
-    """
-    주어진 날짜가 토요일이면 금요일로, 일요일이면 금요일로 조정합니다.
-    (월=0, 화=1, 수=2, 목=3, 금=4, 토=5, 일=6)
-    """
-    # 토요일(5)이면 하루 전으로
-    if target_date.weekday() == 5:
-        return target_date - timedelta(days=1)
-    # 일요일(6)이면 이틀 전으로
-    elif target_date.weekday() == 6:
-        return target_date - timedelta(days=2)
-    # 평일이면 그대로 반환
-    else:
-        return target_date
+# 월별 가계부 캐시가 의존하는 테이블 (이 테이블에 쓰기가 커밋되면 캐시가 다시 계산됩니다)
+LEDGER_TABLES = (LedgerExpense.__tablename__, MonthlyBudget.__tablename__)
+
+def resolve_ledger_month(month: str = None):
+    """
+    "YYYY-MM" 파라미터(없으면 오늘이 속한 주기)로 화면에 표시할 월과 급여 주기(시작일, 종료일)를 계산합니다.
+    """
+    period = parse_period(month)
+    start_date, end_date = period_bounds(period)
+    return period_to_date(period), start_date, end_date
+
+
+def get_d_day(display_month_date: date, today: date):
+    """
+    보고 있는 월이 오늘이 속한 주기이면 다음 월급날까지 남은 일수를, 아니면 None 을 반환합니다.
+    """
+    current_period = period_for(today)
+    if current_period != display_month_date.strftime("%Y-%m"):
+        return None
+    next_payday = period_bounds(current_period)[1] + timedelta(days=1)
+    return (next_payday - today).days
+
+
+def get_ledger_view(db: Session, display_month_date: date, start_date: date, end_date: date) -> dict:
+    # 지출 내역/예산/합계는 데이터가 바뀌기 전까지 메모리 캐시에서 제공합니다.
+    display_month_str = display_month_date.strftime("%Y-%m")
+    return ledger_cache.get_or_build(
+        display_month_str, LEDGER_TABLES,
+        lambda: build_ledger_view(db, display_month_str, start_date, end_date)
+    )
+
+
+def get_ledger_forecast(db: Session, display_month_str: str, today: date, budget: float):
+    # 이번 주기의 예산 소진 예측 (가계부 지출/예산이 바뀌거나 날짜가 바뀌기 전까지 캐시)
+    return ledger_cache.get_or_build(
+        ("forecast", display_month_str, today), LEDGER_TABLES,
+        lambda: build_cycle_forecast(db, display_month_str, today, budget)
+    )
 
 
 @router.get("/monthly_ledger", response_class=HTMLResponse, dependencies=[Depends(login_required)])
 def get_monthly_ledger(request: Request, db: Session = Depends(get_db), month: str = None):
-    try:
-        base_date = datetime.strptime(month, "%Y-%m").date().replace(day=1) if month else date.today()
-    except ValueError:
-        base_date = date.today()
+    display_month_date, start_date, end_date = resolve_ledger_month(month)
+    display_month_str = display_month_date.strftime("%Y-%m")
+    today = date.today()
 
-    if base_date.day < 25:
-        display_month_date = base_date.replace(day=1)
-    else:
-        display_month_date = (base_date + relativedelta(months=1)).replace(day=1)
+    # 데이터가 바뀌지 않았다면 다시 그리지 않고 304 로 응답합니다. (D-Day 때문에 날짜도 키에 포함)
+    headers = validator_headers(("monthly_ledger.html", display_month_str, today), LEDGER_TABLES)
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified_response(headers)
 
-    # --- [수정] 시작일과 종료일을 계산하고 주말인지 확인하여 조정 ---
-    # 1. 기본 시작일/종료일 계산
-    initial_start_date = (display_month_date - relativedelta(months=1)).replace(day=25)
-    initial_end_date = display_month_date.replace(day=24)
+    view = get_ledger_view(db, display_month_date, start_date, end_date)
+    d_day = get_d_day(display_month_date, today)
+    forecast = get_ledger_forecast(db, display_month_str, today, view["budget"]) if d_day is not None else None
 
-    # 2. 주말 조정 함수를 적용하여 최종 시작일/종료일 확정
-    start_date = adjust_date_for_weekend(initial_start_date)
-    end_date = adjust_date_for_weekend(initial_end_date)
-    
-    today = date.today()
-    if today.day > 24:
-        d_day_target = today.replace(day=25) + relativedelta(months=1)
-    else:
-        d_day_target = today.replace(day=25)
-    
-    # 보고 있는 페이지의 월과 D-Day 기준일의 월이 일치하는지 확인
-    if d_day_target.strftime("%Y-%m") == display_month_date.strftime("%Y-%m"):
-        days_left = (d_day_target - today).days
-        d_day_to_pass = days_left
-    else:
-        d_day_to_pass = None
-    
+    prev_month = shift_period(display_month_str, -1)
+    next_month = shift_period(display_month_str, 1)
+
+    return templates.TemplateResponse("monthly_ledger.html", {
+        "request": request,
+        **view,
+        "current_month_display": display_month_date.strftime("%Y년 %m월"),
+        "prev_month": prev_month,
+        "next_month": next_month,
+        "d_day": d_day,
+        "forecast": forecast,
+        "data_etag": make_etag(("monthly_ledger", display_month_str, today), LEDGER_TABLES),
+        "data_month": display_month_str
+    }, headers=headers)
 
 
+@router.get("/monthly_ledger/api/data", dependencies=[Depends(login_required)])
+def get_monthly_ledger_data(request: Request, db: Session = Depends(get_db), month: str = None):
+    """
+    월별 가계부 데이터(JSON). ETag 가 같으면(If-None-Match) DB 조회 없이 304 를 반환합니다.
+    """
+    display_month_date, start_date, end_date = resolve_ledger_month(month)
     display_month_str = display_month_date.strftime("%Y-%m")
+    today = date.today()
+
+    def build():
+        view = get_ledger_view(db, display_month_date, start_date, end_date)
+        d_day = get_d_day(display_month_date, today)
+        return {
+            "month": display_month_str,
+            "start_date": start_date,
+            "end_date": end_date,
+            "d_day": d_day,
+            "forecast": get_ledger_forecast(db, display_month_str, today, view["budget"]) if d_day is not None else None,
+            **view,
+        }
+
+    return conditional_json(request, ("monthly_ledger", display_month_str, today), LEDGER_TABLES, build)
+
+
+TREND_DEFAULT_MONTHS = 12
+
+
+@router.get("/monthly_ledger/api/trend", dependencies=[Depends(login_required)])
+def get_monthly_ledger_trend(
+    request: Request,
+    db: Session = Depends(get_db),
+    from_month: Optional[str] = Query(None, alias="from"),
+    to_month: Optional[str] = Query(None, alias="to"),
+    months: int = TREND_DEFAULT_MONTHS,
+):
+    """
+    주기 x 카테고리 지출 행렬과 주기별 예산(JSON).
+    기본값은 오늘이 속한 주기까지 최근 12개 주기이며, from/to 또는 months 로 범위를 바꿀 수 있습니다.
+    """
+    end_period = parse_period(to_month)
+    start_period = parse_period(from_month) if from_month else shift_period(end_period, -(max(months, 1) - 1))
+    start_period, end_period = min(start_period, end_period), max(start_period, end_period)
+
+    def build():
+        return ledger_cache.get_or_build(
+            ("trend", start_period, end_period), LEDGER_TABLES,
+            lambda: build_trend_matrix(db, start_period, end_period, DEFAULT_BUDGET)
+        )
+
+    try:
+        return conditional_json(request, ("monthly_ledger_trend", start_period, end_period), LEDGER_TABLES, build)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def build_ledger_view(db: Session, display_month_str: str, start_date: date, end_date: date) -> dict:
+    """
+    한 급여 주기의 지출 내역, 예산, 카테고리별 합계를 계산합니다. (세션과 분리된 dict 로 반환하여 캐시에 저장)
+    """
     budget_record = db.query(MonthlyBudget).filter(MonthlyBudget.month == display_month_str).first()
     current_budget = budget_record.amount if budget_record else DEFAULT_BUDGET
 
-    expenses = db.query(LedgerExpense).filter(
-        LedgerExpense.expense_date.between(start_date, end_date)
-    ).order_by(LedgerExpense.expense_date.desc()).all()
+    # 저장된 급여 주기(period)로 조회합니다. (period, expense_date) 인덱스가 정렬까지 처리합니다.
+    # 보관(아카이브)된 주기이면 보관 테이블도 함께 읽습니다.
+    expenses = ledger_rows_for_period(db, display_month_str)
     
-    category_totals = {}
-    for expense in expenses:
-        category_totals[expense.category] = category_totals.get(expense.category, 0) + expense.amount
+    # 카테고리별 합계는 일별 집계 테이블에서 가져옵니다.
+    category_totals = get_ledger_category_totals(db, start_date, end_date)
 
-    total_spent = sum(e.amount for e in expenses)
+    total_spent = sum(category_totals.values())
     remaining_budget = current_budget - total_spent
     usage_percentage = (total_spent / current_budget * 100) if current_budget > 0 else 0
 
-    prev_month = (display_month_date - relativedelta(months=1)).strftime("%Y-%m")
-    next_month = (display_month_date + relativedelta(months=1)).strftime("%Y-%m")
-
-    return templates.TemplateResponse("monthly_ledger.html", {
-        "request": request,
+    return {
         "expenses": expenses,
         "budget": current_budget,
         "total_spent": total_spent,
         "remaining_budget": remaining_budget,
         "usage_percentage": usage_percentage,
-        "current_month_display": display_month_date.strftime("%Y년 %m월"),
-        "prev_month": prev_month,
-        "next_month": next_month,
         "chart_data": category_totals,
-        "d_day": d_day_to_pass
-    })
+    }
+
+@router.get("/monthly_ledger/download_excel", dependencies=[Depends(login_required)])
+def download_excel(
+    request: Request,
+    db: Session = Depends(get_db),
+    month: str = None,
+    from_month: Optional[str] = Query(None, alias="from"),
+    to_month: Optional[str] = Query(None, alias="to"),
+    year: Optional[int] = None,
+):
+    """
+    가계부 지출 내역을 엑셀로 내려받습니다.
+    - ?month=YYYY-MM : 한 주기
+    - ?from=YYYY-MM&to=YYYY-MM : 여러 주기 (주기마다 한 시트 + 요약 시트)
+    - ?year=YYYY : 해당 연도 1월~12월 주기
+    """
+    # 1. 내보낼 주기 범위를 정합니다.
+    if year:
+        start_period, end_period = f"{year:04d}-01", f"{year:04d}-12"
+        filename = f"가계부_{year}년_지출내역.xlsx"
+    elif from_month or to_month:
+        start_period = parse_period(from_month or to_month)
+        end_period = parse_period(to_month or from_month)
+        start_period, end_period = min(start_period, end_period), max(start_period, end_period)
+        filename = f"가계부_{start_period}_{end_period}_지출내역.xlsx"
+    else:
+        start_period = end_period = parse_period(month)
+        filename = f"가계부_{period_to_date(start_period).strftime('%Y년%m월')}_지출내역.xlsx"
 
-@router.get("/monthly_ledger/download_excel")
-def download_excel(request: Request, db: Session = Depends(get_db), month: str = None):
-    # 1. 기존 get_monthly_ledger 함수에서 지출 내역을 가져오는 부분 재사용
     try:
-        base_date = datetime.strptime(month, "%Y-%m").date().replace(day=1) if month else date.today()
-    except ValueError:
-        base_date = date.today()
+        periods = export_periods(start_period, end_period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    if base_date.day < 25:
-        display_month_date = base_date.replace(day=1)
-    else:
-        display_month_date = (base_date + relativedelta(months=1)).replace(day=1)
-        
-    initial_start_date = (display_month_date - relativedelta(months=1)).replace(day=25)
-    initial_end_date = display_month_date.replace(day=24)
-    start_date = adjust_date_for_weekend(initial_start_date)
-    end_date = adjust_date_for_weekend(initial_end_date)
-
-    expenses = db.query(LedgerExpense).filter(
-        LedgerExpense.expense_date.between(start_date, end_date)
-    ).order_by(LedgerExpense.expense_date.desc()).all()
-
-    # 2. openpyxl을 사용하여 메모리에 엑셀 파일 생성
-    output = BytesIO()
-    workbook = openpyxl.Workbook()
-    sheet = workbook.active
-    sheet.title = "월별 지출 내역"
-
-    # 헤더 작성
-    headers = ["날짜", "카테고리", "항목", "금액"]
-    sheet.append(headers)
-
-    # 데이터 작성
-    for expense in expenses:
-        sheet.append([
-            expense.expense_date.strftime("%Y-%m-%d"),
-            expense.category,
-            expense.item,
-            expense.amount
-        ])
-
-    # 3. 파일 저장 및 스트리밍 응답 반환
-    workbook.save(output)
-    output.seek(0)
-
-    filename = f"가계부_{display_month_date.strftime('%Y년%m월')}_지출내역.xlsx"
-    # --- 이 부분을 수정합니다. ---
+    # 2. 범위에 속한 주기의 데이터가 바뀌지 않았다면 304, 캐시 파일이 있으면 그 파일을 그대로 전송합니다.
+    range_key = (start_period, end_period)
+    versions = ledger_export_versions(periods)
     encoded_filename = quote(filename)
+    headers = {
+        "ETag": f'"{export_digest(range_key, versions)}"',
+        "Cache-Control": CACHE_CONTROL,
+        "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
+    }
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified_response(headers)
 
+    # 3. 없으면 write_only 워크북을 캐시 디렉터리에 만듭니다.
+    #    캐시가 연 파일을 그대로 전송하므로, 전송 중에 다른 요청이 캐시 파일을 교체/삭제해도 영향을 받지 않습니다.
+    file = ledger_export_cache.open_or_build(
+        range_key, versions,
+        lambda directory: export_ledger_to_tempfile(db, start_period, end_period, directory=directory),
+    )
+    headers["Content-Length"] = str(os.fstat(file.fileno()).st_size)
     return StreamingResponse(
-        output,
+        iter_file(file),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"}
-    )  
+        headers=headers,
+    )
 
 @router.post("/set_budget", response_class=RedirectResponse, dependencies=[Depends(login_required)])
 async def set_budget(
     month: str = Form(...), # "YYYY-MM"
     amount: int = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    budget_record = db.query(MonthlyBudget).filter(MonthlyBudget.month == month).first()
+    result = await db.execute(select(MonthlyBudget).filter(MonthlyBudget.month == month))
+    budget_record = result.scalars().first()
     if budget_record:
         budget_record.amount = amount
     else:
         new_budget = MonthlyBudget(month=month, amount=amount)
         db.add(new_budget)
-    db.commit()
+    await db.commit()
     return RedirectResponse(url=f"/monthly_ledger?month={month}", status_code=303)
 
 @router.post("/add_ledger_expense", response_class=RedirectResponse, dependencies=[Depends(login_required)])
@@ -179,7 +263,7 @@ async def add_ledger_expense(
     category: str = Form(...),
     item: str = Form(...),
     amount: int = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     new_expense = LedgerExpense(
         expense_date=expense_date,
@@ -188,35 +272,48 @@ async def add_ledger_expense(
         amount=amount,
     )
     db.add(new_expense)
-    db.commit()
+    await db.commit()
     
-    if expense_date.day < 25:
-        month_to_return = expense_date.strftime('%Y-%m')
-    else:
-        next_month_date = expense_date + relativedelta(months=1)
-        month_to_return = next_month_date.strftime('%Y-%m')
-        
-    return RedirectResponse(url=f"/monthly_ledger?month={month_to_return}", status_code=303)
+    # 추가한 지출이 속한 급여 주기 화면으로 돌아갑니다.
+    return RedirectResponse(url=f"/monthly_ledger?month={period_for(expense_date)}", status_code=303)
 
 @router.post("/delete_ledger_expense/{expense_id}", response_class=RedirectResponse)
 async def delete_ledger_expense(
     expense_id: int, 
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    expense_to_delete = db.query(LedgerExpense).filter(LedgerExpense.id == expense_id).first()
+    expense_to_delete = await db.get(LedgerExpense, expense_id)
     if not expense_to_delete:
         raise HTTPException(status_code=404, detail="지출 항목을 찾을 수 없습니다.")
     
-    deleted_date = expense_to_delete.expense_date
+    month_to_return = expense_to_delete.period or period_for(expense_to_delete.expense_date)
     
-    db.delete(expense_to_delete)
-    db.commit()
-    
-    if deleted_date.day < 25:
-        month_to_return = deleted_date.strftime('%Y-%m')
-    else:
-        next_month_date = deleted_date + relativedelta(months=1)
-        month_to_return = next_month_date.strftime('%Y-%m')
+    await db.delete(expense_to_delete)
+    await db.commit()
     
     return RedirectResponse(url=f"/monthly_ledger?month={month_to_return}", status_code=303)
+
+
+@router.post("/monthly_ledger/batch_delete", dependencies=[Depends(login_required)])
+async def batch_delete_ledger_expenses(payload: BatchDelete, db: AsyncSession = Depends(get_async_db)):
+    """
+    선택한 가계부 지출들을 한 트랜잭션으로 삭제하고 삭제된 개수를 반환합니다.
+    """
+    deleted = await db.run_sync(batch_delete, LedgerExpense, payload.ids)
+    await db.commit()
+    return JSONResponse(content={"deleted": deleted})
+
+
+@router.post("/monthly_ledger/batch_update", dependencies=[Depends(login_required)])
+async def batch_update_ledger_expenses(payload: LedgerExpenseBatchUpdate, db: AsyncSession = Depends(get_async_db)):
+    """
+    선택한 가계부 지출들의 카테고리/날짜/항목을 한 번에 바꾸고 수정된 개수를 반환합니다.
+    """
+    values = payload.model_dump(exclude_unset=True, exclude={"ids"})
+    try:
+        updated = await db.run_sync(batch_update, LedgerExpense, payload.ids, values)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await db.commit()
+    return JSONResponse(content={"updated": updated})
@@ -12,6 +12,7 @@ from app.core.database import get_db
 from app.core.models import Task
 from fastapi.templating import Jinja2Templates
 from app.core.dependencies import login_required # login_required 추가
+from app.core.metrics import EMAIL_SENT
 
 
 router = APIRouter()
@@ -37,7 +38,9 @@ async def send_email(to_email: str, subject: str, body: str):
             await server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
             await server.send_message(msg)
             print(f"이메일 전송 성공: '{subject}' to {to_email}")
+        EMAIL_SENT.labels("success").inc()
     except Exception as e:
+        EMAIL_SENT.labels("failure").inc()
         print(f"이메일 전송 실패: {e}")
 
 # ===================================================================
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
 from datetime import date
 
 class ExpenseCreate(BaseModel):
@@ -7,12 +7,19 @@ class ExpenseCreate(BaseModel):
     item: str
     amount: float
     notes: str | None = None
+    expense_type: str | None = None # '고정적' / '변동적'
 
 class IncomeCreate(BaseModel):
     date: date
     income_type: str
     amount: float
 
+class LedgerExpenseCreate(BaseModel):
+    date: date
+    category: str
+    item: str
+    amount: float
+
 class AssetCreate(BaseModel):
     date: date
     category: str
@@ -29,3 +36,44 @@ class HouseDataCreate(BaseModel):
 class TaskCreate(BaseModel):
     title: str
     due_date: date
+
+# 일괄 삭제/수정 요청: 모르는 필드(오타, 수정할 수 없는 금액 등)는 조용히 무시하지 않고 422 로 거절합니다.
+# 날짜/분류/항목은 보내지 않으면 그대로 두고, 명시적인 null 은 NULL 을 쓰게 되므로(가계부는 period 가 비어 월별 합계가 어긋남) 거절합니다.
+# (메모(notes)는 null 로 지울 수 있음)
+class BatchPayload(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    @field_validator("expense_date", "income_date", "expense_type", "income_type", "category", "item", check_fields=False)
+    @classmethod
+    def reject_null(cls, value):
+        if value is None:
+            raise ValueError("null 로 바꿀 수 없습니다.")
+        return value
+
+class BatchDelete(BatchPayload):
+    ids: list[int]
+
+class ExpenseBatchUpdate(BatchPayload):
+    ids: list[int]
+    expense_date: date | None = None
+    expense_type: str | None = None
+    category: str | None = None
+    item: str | None = None
+    notes: str | None = None
+
+class IncomeBatchUpdate(BatchPayload):
+    ids: list[int]
+    income_date: date | None = None
+    income_type: str | None = None
+
+class LedgerExpenseBatchUpdate(BatchPayload):
+    ids: list[int]
+    expense_date: date | None = None
+    category: str | None = None
+    item: str | None = None
+
+class AssetBatchUpdate(BatchPayload):
+    ids: list[int]
+    category: str | None = None
+    item: str | None = None
+    notes: str | None = None
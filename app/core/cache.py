@@ -0,0 +1,170 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.metrics import CACHE_REQUESTS, CACHE_EVICTIONS
+
+# --- 테이블 버전 카운터 ---
+# 테이블에 쓰기가 커밋될 때마다 버전이 1씩 올라갑니다.
+# 캐시 키에 의존 테이블들의 버전을 포함시키므로, 데이터가 바뀌면 이전 항목은 자연스럽게 사용되지 않습니다.
+_versions = {}
+_versions_lock = threading.Lock()
+# 테이블별 마지막 쓰기 시각 (Last-Modified 헤더용, 기록이 없으면 프로세스 시작 시각)
+_modified_at = {}
+STARTED_AT = time.time()
+
+
+def get_version(table_name: str) -> int:
+    return _versions.get(table_name, 0)
+
+
+def get_versions(table_names) -> tuple:
+    return tuple(_versions.get(name, 0) for name in table_names)
+
+
+def bump_versions(*table_names):
+    """
+    테이블 버전을 올립니다. ORM 세션을 거치는 쓰기는 커밋 시 자동으로 호출되고,
+    세션 밖에서 직접 SQL로 데이터를 바꾼 경우에만 직접 호출하면 됩니다.
+    """
+    with _versions_lock:
+        for name in table_names:
+            _versions[name] = _versions.get(name, 0) + 1
+            _modified_at[name] = time.time()
+
+
+def get_last_modified(table_names) -> float:
+    return max((_modified_at.get(name, STARTED_AT) for name in table_names), default=STARTED_AT)
+
+
+# --- 파티션(기간) 버전 카운터 ---
+# 테이블 전체가 아닌 일부(예: 가계부의 급여 주기 "2024-03")에만 의존하는 캐시를 위한 버전입니다.
+# 해당 파티션에 쓰기가 커밋될 때만 올라가므로, 다른 기간의 캐시는 그대로 유지됩니다.
+_partition_versions = {}
+
+
+def get_partition_versions(table_name: str, keys) -> tuple:
+    return tuple(_partition_versions.get((table_name, key), 0) for key in keys)
+
+
+def bump_partitions(table_name: str, keys):
+    with _versions_lock:
+        for key in keys:
+            _partition_versions[(table_name, key)] = _partition_versions.get((table_name, key), 0) + 1
+
+
+def mark_written_partitions(session, table_name: str, keys):
+    """
+    세션 커밋 시 버전을 올릴 파티션으로 표시합니다. (롤백되면 버리기)
+    """
+    keys = {key for key in keys if key is not None}
+    if keys:
+        session.info.setdefault("written_partitions", {}).setdefault(table_name, set()).update(keys)
+
+
+def _mark_tables(session, table_names):
+    session.info.setdefault("written_tables", set()).update(table_names)
+
+
+def mark_written(session, *table_names):
+    """
+    세션 커밋 시 버전을 올릴 테이블로 표시합니다.
+    ORM 을 거치지 않는 Core 문장(session.execute(table.insert(), rows) 등)으로 쓴 경우에 호출합니다.
+    """
+    _mark_tables(session, table_names)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_written_tables(session, flush_context, instances):
+    tables = {obj.__table__.name for obj in (*session.new, *session.dirty, *session.deleted) if hasattr(obj, "__table__")}
+    if tables:
+        _mark_tables(session, tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_written_tables(orm_execute_state):
+    # session.execute(update(...)/delete(...)/insert(...)) 처럼 flush를 거치지 않는 일괄 쓰기
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _mark_tables(orm_execute_state.session, {mapper.local_table.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_written_tables(session):
+    tables = session.info.pop("written_tables", None)
+    if tables:
+        bump_versions(*tables)
+    for table_name, keys in session.info.pop("written_partitions", {}).items():
+        bump_partitions(table_name, keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_tables(session):
+    session.info.pop("written_tables", None)
+    session.info.pop("written_partitions", None)
+
+
+# --- 버전 기반 읽기 캐시 ---
+class VersionedCache:
+    """
+    크기 제한(LRU)과 TTL을 가진 프로세스 내 캐시입니다.
+    항목의 키에는 의존 테이블의 버전이 포함되어, 쓰기가 커밋되면 다음 조회부터 다시 계산됩니다.
+    """
+    def __init__(self, name: str, maxsize: int = 256, ttl: float = 300):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, tables, build):
+        """
+        (key, 의존 테이블 버전)에 해당하는 값을 반환하고, 없으면 build()로 계산해 저장합니다.
+        버전은 build() 전에 읽으므로, 계산 중에 커밋된 쓰기는 다음 조회에서 반영됩니다.
+        """
+        full_key = (key, get_versions(tables))
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                CACHE_REQUESTS.labels(self.name, "hit").inc()
+                return entry[1]
+            self.misses += 1
+        CACHE_REQUESTS.labels(self.name, "miss").inc()
+
+        value = build()
+
+        with self._lock:
+            self._entries[full_key] = (now + self.ttl, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.labels(self.name).inc()
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"name": self.name, "size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+VIEW_CACHE_MAXSIZE = int(os.getenv("VIEW_CACHE_MAXSIZE", "256"))
+VIEW_CACHE_TTL = float(os.getenv("VIEW_CACHE_TTL", "300"))
+
+# 화면별 캐시 (대시보드, 월별 가계부)
+dashboard_cache = VersionedCache("dashboard", maxsize=VIEW_CACHE_MAXSIZE, ttl=VIEW_CACHE_TTL)
+ledger_cache = VersionedCache("monthly_ledger", maxsize=VIEW_CACHE_MAXSIZE, ttl=VIEW_CACHE_TTL)
+# 일기 달력 (월/연도별 작성일 비트마스크, 일기 저장/삭제 시 다시 계산)
+diary_calendar_cache = VersionedCache("diary_calendar", maxsize=64, ttl=VIEW_CACHE_TTL)
@@ -1,28 +1,263 @@
 import os
-from sqlalchemy import create_engine
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.schema import CreateIndex, CreateColumn
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import QueuePool, StaticPool
 
 # --- 데이터베이스 연결 설정 ---
 # 'DATABASE_URL' 환경 변수가 설정되어 있지 않으면 기본 SQLite 데이터베이스를 사용합니다.
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/sql_app.db")
 
-# SQLite는 기본적으로 동일 스레드에서만 접근이 가능하므로,
-# `check_same_thread=False` 옵션을 추가하여 멀티스레드 환경에서도 사용할 수 있게 합니다.
-# (FastAPI는 기본적으로 여러 스레드에서 요청을 처리합니다)
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# --- SQLite 엔진 프로파일 ---
+# 'DB_PROFILE' 환경 변수로 선택합니다. (기본값: production)
+# - production: WAL 모드 + 튜닝된 PRAGMA. 한 기기에서 가계부를 쓰는 동안
+#               다른 기기가 대시보드를 읽어도 "database is locked"가 나지 않습니다.
+# - legacy:     SQLite 기본값 그대로 (성능 비교 측정용)
+# cache_size 가 음수이면 KiB 단위입니다. (-20000 = 약 20MB)
+ENGINE_PROFILES = {
+    "production": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+            "cache_size": -20000,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+        },
+        "pool_size": 5,
+        "max_overflow": 10,
+    },
+    "legacy": {
+        "pragmas": {},
+        "pool_size": 5,
+        "max_overflow": 10,
+    },
+}
+
+DB_PROFILE = os.getenv("DB_PROFILE", "production")
+if DB_PROFILE not in ENGINE_PROFILES:
+    print(f"[DB] 알 수 없는 DB_PROFILE '{DB_PROFILE}' 입니다. production 프로파일을 사용합니다.")
+    DB_PROFILE = "production"
+
+_profile = ENGINE_PROFILES[DB_PROFILE]
+_is_sqlite = DATABASE_URL.startswith("sqlite")
+_is_memory = _is_sqlite and (DATABASE_URL in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in DATABASE_URL)
+
+
+def _build_engine():
+    if not _is_sqlite:
+        return create_engine(DATABASE_URL, pool_pre_ping=True)
+
+    # SQLite는 기본적으로 동일 스레드에서만 접근이 가능하므로,
+    # `check_same_thread=False` 옵션을 추가하여 멀티스레드 환경에서도 사용할 수 있게 합니다.
+    # (FastAPI는 기본적으로 여러 스레드에서 요청을 처리합니다)
+    connect_args = {"check_same_thread": False}
+
+    if _is_memory:
+        # 메모리 DB는 커넥션마다 별도 DB가 생기므로 하나의 커넥션을 공유합니다.
+        return create_engine(DATABASE_URL, connect_args=connect_args, poolclass=StaticPool)
+
+    # 파일 DB는 커넥션 풀을 사용해 PRAGMA가 적용된 커넥션을 재사용합니다.
+    return create_engine(
+        DATABASE_URL,
+        connect_args=connect_args,
+        poolclass=QueuePool,
+        pool_size=_profile["pool_size"],
+        max_overflow=_profile["max_overflow"],
+        pool_pre_ping=True,
+    )
+
+
+engine = _build_engine()
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict):
+    """
+    새 SQLite 커넥션에 프로파일의 PRAGMA를 적용합니다.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if name == "journal_mode" and _is_memory:
+                continue  # 메모리 DB는 WAL을 지원하지 않습니다.
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+if _is_sqlite:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, _profile["pragmas"])
+
+
+def get_applied_pragmas() -> dict:
+    """
+    현재 커넥션에 실제로 적용된 PRAGMA 값을 조회합니다. (시작 시 로그 확인용)
+    """
+    if not _is_sqlite:
+        return {}
+    names = ["journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size", "temp_store"]
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        applied = {}
+        for name in names:
+            row = cursor.execute(f"PRAGMA {name}").fetchone()
+            applied[name] = row[0] if row else None
+        cursor.close()
+        return applied
+    finally:
+        raw.close()
+
+
+def report_engine_profile():
+    """
+    선택된 엔진 프로파일과 적용된 PRAGMA를 출력합니다.
+    """
+    print(f"[DB] 엔진 프로파일: {DB_PROFILE} ({engine.pool.__class__.__name__})")
+    for name, value in get_applied_pragmas().items():
+        print(f"[DB]   PRAGMA {name} = {value}")
+
 
 # 세션 생성을 위한 `sessionmaker`를 설정합니다.
 # `autocommit=False`와 `autoflush=False`를 사용하여 수동으로 트랜잭션을 제어합니다.
 # `expire_on_commit=False`는 커밋 후 객체가 만료되지 않도록 합니다.
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# --- 비동기 엔진 / 세션 ---
+# `async def` 핸들러에서 동기 세션을 쓰면 DB I/O 동안 이벤트 루프 전체가 멈춥니다.
+# 같은 DB 파일을 aiosqlite 드라이버로 여는 비동기 엔진을 별도로 둡니다.
+def _to_async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _to_async_url(DATABASE_URL))
+
+if _is_memory:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=StaticPool)
+else:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+
+if _is_sqlite:
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _on_async_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, _profile["pragmas"])
+
+# 비동기 세션은 커밋 후 속성 접근 시 지연 로딩(I/O)이 일어나지 않도록 expire_on_commit=False 로 둡니다.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# --- 요청별 SQL 계측 ---
+# 요청마다 실행된 SQL 문 수, 총 DB 시간, 반복 실행된 문장(N+1 의심)을 수집합니다.
+# main.py의 미들웨어가 `track_queries()`로 수집을 시작하고 결과를 응답 헤더에 기록합니다.
+# 같은 문장이 이 횟수 이상 반복되면 N+1 쿼리로 간주합니다.
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "3"))
+
+
+class QueryStats:
+    __slots__ = ("count", "total_time", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0  # 초 단위
+        self.statements = Counter()
+
+    @property
+    def repeated(self) -> dict:
+        """
+        N_PLUS_ONE_THRESHOLD 이상 반복 실행된 문장과 횟수입니다.
+        """
+        return {sql: n for sql, n in self.statements.items() if n >= N_PLUS_ONE_THRESHOLD}
+
+
+_query_stats: ContextVar = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries():
+    """
+    with 블록 안에서 실행된 SQL 문을 집계합니다. (테스트에서 쿼리 수 예산 확인에도 사용)
+
+        with track_queries() as stats:
+            ...
+        assert stats.count <= 5
+    """
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _query_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if starts:
+        stats.total_time += time.perf_counter() - starts.pop()
+    stats.count += 1
+    stats.statements[statement] += 1
+
+
+for _sync_engine in (engine, async_engine.sync_engine):
+    event.listen(_sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_sync_engine, "after_cursor_execute", _after_cursor_execute)
+
 # SQLAlchemy 모델의 기본 클래스를 정의합니다.
 # 모든 모델(테이블) 클래스는 이 `Base` 클래스를 상속받아야 합니다.
 class Base(DeclarativeBase):
     pass
 
+# --- 인덱스 보강 ---
+# `create_all`은 이미 존재하는 테이블은 건너뛰므로, 모델에 나중에 추가된 인덱스는 만들어지지 않습니다.
+# 기존 DB에도 누락된 인덱스를 생성합니다. (중복 데이터 등으로 실패하면 경고만 출력)
+def ensure_indexes(bind=None):
+    bind = bind or engine
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                # 식(expression) 인덱스는 리플렉션이 안 되므로 checkfirst 대신 IF NOT EXISTS를 사용합니다.
+                with bind.begin() as conn:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+            except Exception as e:
+                print(f"[DB] 인덱스 생성 실패 ({index.name}): {e}")
+
+# --- 컬럼 보강 ---
+# `create_all`은 기존 테이블에 새 컬럼을 추가하지 않으므로, 모델에 나중에 추가된 (NULL 허용) 컬럼을 ALTER TABLE로 추가합니다.
+# ensure_indexes 보다 먼저 호출해야 새 컬럼의 인덱스도 만들어집니다.
+def ensure_columns(bind=None):
+    bind = bind or engine
+    existing_tables = set(inspect(bind).get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspect(bind).get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            try:
+                with bind.begin() as conn:
+                    column_sql = CreateColumn(column).compile(dialect=bind.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column_sql}")
+                print(f"[DB] {table.name}.{column.name} 컬럼을 추가했습니다.")
+            except Exception as e:
+                print(f"[DB] 컬럼 추가 실패 ({table.name}.{column.name}): {e}")
+
 # --- 데이터베이스 세션 의존성 주입 함수 ---
 # FastAPI에서 `Depends(get_db)`를 통해 요청마다 독립적인 데이터베이스 세션을 제공합니다.
 # 이 함수는 요청이 끝나면 세션을 자동으로 닫아 자원을 해제합니다.
@@ -32,3 +267,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# --- 비동기 데이터베이스 세션 의존성 주입 함수 ---
+# `async def` 핸들러에서는 `Depends(get_async_db)`를 사용해 DB 대기 중에도 이벤트 루프가 다른 요청을 처리하게 합니다.
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,3 +1,6 @@
+import os
+import ipaddress
+
 from fastapi import Request, HTTPException, status
 
 def login_required(request: Request):
@@ -13,4 +16,29 @@ def login_required(request: Request):
             headers={"Location": "/login"}
         )
         
-    return True
\ No newline at end of file
+    return True
+
+
+# --- /metrics 접근 제한 ---
+# 로그인한 세션이거나, METRICS_ALLOW_IPS(쉼표로 구분한 IP/CIDR, 예: "127.0.0.1,10.0.0.0/8")에 있는 주소만 볼 수 있습니다.
+# Prometheus 처럼 로그인할 수 없는 수집기는 허용 목록으로 받습니다. 기본값은 비어 있음(로그인만 허용).
+# 리버스 프록시 뒤에서는 모든 요청이 프록시 주소로 보이므로, 프록시 주소는 목록에 넣지 마세요.
+def _parse_networks(value: str):
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in value.split(",") if part.strip()]
+
+
+METRICS_ALLOW_NETWORKS = _parse_networks(os.getenv("METRICS_ALLOW_IPS", ""))
+
+
+def _is_metrics_client(host) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except (TypeError, ValueError):
+        return False
+    return any(address in network for network in METRICS_ALLOW_NETWORKS)
+
+
+def metrics_access_required(request: Request):
+    if request.client is not None and _is_metrics_client(request.client.host):
+        return True
+    return login_required(request)
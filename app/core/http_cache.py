@@ -0,0 +1,85 @@
+import os
+import re
+import hashlib
+import uuid
+from email.utils import formatdate
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
+
+from app.core.cache import get_versions, get_last_modified
+
+# --- 조건부 응답 (ETag / 304 Not Modified) ---
+# ETag 는 의존 테이블 버전으로 만들기 때문에, 304 판단에는 DB 조회가 전혀 필요 없습니다.
+# 버전 카운터는 프로세스마다 0부터 시작하므로, 재시작 전 ETag 와 겹치지 않도록 부팅 ID 를 섞습니다.
+BOOT_ID = uuid.uuid4().hex
+
+# 브라우저가 매번 ETag 로 재검증하도록 합니다. (로그인 사용자 데이터이므로 private)
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(key, tables) -> str:
+    raw = f"{BOOT_ID}|{key}|{get_versions(tables)}".encode()
+    return '"' + hashlib.sha1(raw).hexdigest() + '"'
+
+
+def validator_headers(key, tables) -> dict:
+    return {
+        "ETag": make_etag(key, tables),
+        "Last-Modified": formatdate(get_last_modified(tables), usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+    }
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    If-None-Match 헤더가 현재 ETag 와 일치하는지 확인합니다.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified_response(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def conditional_json(request: Request, key, tables, build):
+    """
+    데이터가 바뀌지 않았으면 본문 없는 304 를, 바뀌었으면 build() 결과를 JSON 으로 반환합니다.
+    """
+    headers = validator_headers(key, tables)
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified_response(headers)
+    return JSONResponse(content=jsonable_encoder(build()), headers=headers)
+
+
+# --- 내용 해시 이름의 정적 파일 ---
+# 이름에 내용 해시가 들어간 파일은 내용이 바뀌지 않으므로 1년 동안 재검증 없이 캐시하도록 합니다.
+# ETag 도 수정 시각/크기가 아닌 이름의 해시로 만들어, 파일을 다시 써도(마이그레이션 등) 같은 값을 유지합니다.
+# (일기 사진: SHA-256 앞 32자 + 변형 너비, 보험 문서: SHA-256 전체 64자)
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+CONTENT_HASHED_NAME = re.compile(r"^(?P<hash>[0-9a-f]{32}|[0-9a-f]{64})(?:_\d+)?\.[0-9a-z]+$")
+
+
+class ContentHashedStaticFiles(StaticFiles):
+    """
+    내용 해시 이름의 파일에는 immutable Cache-Control 과 강한 ETag 를, 그 밖의 파일에는 기본 헤더를 보냅니다.
+    """
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        name = os.path.basename(full_path)
+        if CONTENT_HASHED_NAME.match(name) is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        headers = {"ETag": f'"{name}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,148 @@
+import time
+import asyncio
+import functools
+
+from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.database import engine, async_engine
+
+# --- Prometheus 메트릭 정의 ---
+# 기본 레지스트리 대신 전용 레지스트리를 사용해 /metrics 에 앱 메트릭만 노출합니다.
+registry = CollectorRegistry()
+
+# 라벨은 실제 URL이 아닌 라우트 템플릿(예: /edit_asset/{asset_id})을 사용해 라벨 수가 늘어나지 않게 합니다.
+REQUEST_COUNT = Counter(
+    "http_requests_total", "HTTP 요청 수",
+    ["method", "route", "status"], registry=registry,
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간(초)",
+    ["method", "route"], registry=registry,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "처리 중인 HTTP 요청 수", registry=registry,
+)
+JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds", "스케줄러 작업 실행 시간(초)",
+    ["job"], registry=registry,
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+JOB_FAILURES = Counter(
+    "scheduler_job_failures_total", "스케줄러 작업 실패 수",
+    ["job"], registry=registry,
+)
+EMAIL_SENT = Counter(
+    "email_send_total", "이메일 발송 결과",
+    ["result"], registry=registry,
+)
+CACHE_REQUESTS = Counter(
+    "view_cache_requests_total", "화면 캐시 조회 결과(hit/miss)",
+    ["cache", "result"], registry=registry,
+)
+CACHE_EVICTIONS = Counter(
+    "view_cache_evictions_total", "크기 제한으로 제거된 화면 캐시 항목 수",
+    ["cache"], registry=registry,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class _PoolCollector:
+    """
+    스크레이프 시점에 DB 커넥션 풀 상태를 읽어 게이지로 노출합니다.
+    """
+    def collect(self):
+        gauges = {
+            "size": GaugeMetricFamily("db_pool_size", "커넥션 풀 크기", labels=["engine"]),
+            "checked_out": GaugeMetricFamily("db_pool_checked_out", "사용 중인 커넥션 수", labels=["engine"]),
+            "checked_in": GaugeMetricFamily("db_pool_checked_in", "대기 중인 커넥션 수", labels=["engine"]),
+            "overflow": GaugeMetricFamily("db_pool_overflow", "풀 크기를 초과해 연 커넥션 수", labels=["engine"]),
+        }
+        for name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+            for key, method in (("size", "size"), ("checked_out", "checkedout"), ("checked_in", "checkedin"), ("overflow", "overflow")):
+                fn = getattr(pool, method, None)
+                if fn is not None:
+                    gauges[key].add_metric([name], fn())
+        yield from gauges.values()
+
+
+registry.register(_PoolCollector())
+
+
+def observe_request(method: str, route: str, status_code: int, elapsed: float):
+    REQUEST_COUNT.labels(method, route, str(status_code)).inc()
+    REQUEST_LATENCY.labels(method, route).observe(elapsed)
+
+
+class MetricsMiddleware:
+    """
+    라우트 템플릿별 요청 수/지연 시간 히스토그램과 처리 중인 요청 수를 기록하는 ASGI 미들웨어입니다.
+    @app.middleware("http")(BaseHTTPMiddleware)는 요청마다 태스크와 메모리 스트림을 만들어 수백 us 가 더 들므로,
+    모든 요청에 붙는 계측은 순수 ASGI 로 구현합니다. (bench/metrics_bench.py)
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            # 라우터가 scope 에 넣어 둔 라우트의 템플릿 경로 (라우트가 없으면 UNMATCHED_ROUTE)
+            observe_request(scope["method"], getattr(scope.get("route"), "path", UNMATCHED_ROUTE), status_code, elapsed)
+
+
+def timed_job(job_name: str):
+    """
+    스케줄러 작업의 실행 시간과 실패 횟수를 기록하는 데코레이터입니다.
+    async 함수는 async 로, 일반 함수는 일반 함수로 감싸므로 APScheduler 가 일반 함수 작업을 그대로 스레드에서 실행합니다.
+    """
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    JOB_FAILURES.labels(job_name).inc()
+                    raise
+                finally:
+                    JOB_DURATION.labels(job_name).observe(time.perf_counter() - start)
+            return wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                JOB_FAILURES.labels(job_name).inc()
+                raise
+            finally:
+                JOB_DURATION.labels(job_name).observe(time.perf_counter() - start)
+        return sync_wrapper
+    return decorator
+
+
+def render_metrics():
+    """
+    Prometheus 텍스트 포맷의 (본문, Content-Type)을 반환합니다.
+    """
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, Date, REAL, Float, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, REAL, Float, Text, Index, UniqueConstraint, case, literal_column, event
 from .database import Base
+from .periods import period_for
 from pydantic import BaseModel
-from datetime import date 
+from datetime import date, datetime
 import uuid
 
+def row_to_dict(row) -> dict:
+    """
+    ORM 객체의 컬럼 값을 dict로 변환합니다. (세션과 무관하게 캐시/JSON 응답에 사용)
+    """
+    return {column.key: getattr(row, column.key) for column in row.__table__.columns}
+
 class Expense(Base):
     __tablename__ = "expenses"
     id = Column(Integer, primary_key=True, index=True)
@@ -14,6 +21,22 @@ class Expense(Base):
     amount = Column(Float)
     notes = Column(String(255), nullable=True)
 
+# /expenses 정렬 순서 (고정적 -> 변동적, 저축 -> 주거/통신 -> 용돈)
+# 인덱스 식과 쿼리의 ORDER BY 식이 정확히 같아야 SQLite가 인덱스로 정렬하므로,
+# 바인드 파라미터가 아닌 리터럴로 렌더링합니다.
+EXPENSE_TYPE_ORDER = case(
+    (Expense.expense_type == literal_column("'고정적'"), literal_column("1")),
+    (Expense.expense_type == literal_column("'변동적'"), literal_column("2")),
+    else_=literal_column("3"),
+)
+EXPENSE_CATEGORY_ORDER = case(
+    (Expense.category == literal_column("'저축'"), literal_column("1")),
+    (Expense.category == literal_column("'주거/통신'"), literal_column("2")),
+    (Expense.category == literal_column("'용돈'"), literal_column("3")),
+    else_=literal_column("4"),
+)
+Index("ix_expenses_sort_order", EXPENSE_TYPE_ORDER, EXPENSE_CATEGORY_ORDER, Expense.id.desc())
+
 class Income(Base):
     __tablename__ = "incomes"
     id = Column(Integer, primary_key=True, index=True)
@@ -46,7 +69,7 @@ class Task(Base):
     # ▼▼▼ 아래 필드들이 폼과 일치하도록 수정/추가해주세요. ▼▼▼
     item_name = Column(String, index=True)
     model_name = Column(String, nullable=True) # 선택 사항이므로 nullable=True
-    due_date = Column(Date)
+    due_date = Column(Date, index=True) # 매일 마감일 알림 조회에 사용
     email = Column(String)
     
 class TaskCreate(BaseModel):
@@ -54,6 +77,10 @@ class TaskCreate(BaseModel):
     due_date: date
     
     
+def _ledger_period_default(context):
+    # INSERT 시 지출일로 급여 주기를 계산합니다. (Core 일괄 INSERT 에서도 행마다 호출됨)
+    return period_for(context.get_current_parameters().get("expense_date"))
+
 class LedgerExpense(Base):
     __tablename__ = "ledger_expenses"
     id = Column(Integer, primary_key=True, index=True)
@@ -61,6 +88,20 @@ class LedgerExpense(Base):
     category = Column(String(50))
     item = Column(String(100))
     amount = Column(Float)
+    # 급여 주기 "YYYY-MM" (app.core.periods.period_for(expense_date)), 월별 화면은 이 값으로 조회합니다.
+    period = Column(String(7), default=_ledger_period_default)
+
+    # 급여 주기 범위 조회 후 카테고리별 합계를 테이블 접근 없이 인덱스만으로 계산합니다.
+    # 주기 화면은 (period, expense_date) 인덱스로 정렬까지 처리합니다.
+    __table_args__ = (
+        Index("ix_ledger_expenses_date_category_amount", "expense_date", "category", "amount"),
+        Index("ix_ledger_expenses_period_date", "period", "expense_date"),
+    )
+
+@event.listens_for(LedgerExpense, "before_update")
+def _update_ledger_period(mapper, connection, target):
+    # ORM 으로 지출일을 수정하면 급여 주기도 함께 바꿉니다. (일괄 UPDATE 는 app.service.batch 에서 처리)
+    target.period = period_for(target.expense_date)
     
 class MonthlyBudget(Base):
     __tablename__ = "monthly_budgets"
@@ -87,6 +128,18 @@ class Insurance(Base):
     file_path = Column(String, nullable=True) # 보험 증서 파일 경로
     
 
+class StoredDocument(Base):
+    # 내용 주소 문서 저장소의 파일 목록 (보험 증서). 파일은 SHA-256 으로 한 번만 저장하고,
+    # ref_count 는 이 파일을 쓰는 보험 수입니다. 0 이 되면 행과 파일을 함께 삭제합니다.
+    __tablename__ = "stored_documents"
+    id = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), nullable=False, unique=True)
+    size = Column(Integer, nullable=False)
+    content_type = Column(String(100), nullable=False)
+    extension = Column(String(10), nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.now)
+
 
 class Diary(Base):
     __tablename__ = "diaries"
@@ -99,6 +152,13 @@ class Diary(Base):
     video_id = Column(String, nullable=True)
     created_at = Column(Date, default=date.today)
     image_url = Column(String(255), nullable=True)
+
+    # 하루에 일기는 하나입니다. (save_diary가 날짜를 키로 덮어쓰기)
+    __table_args__ = (
+        Index("ux_diaries_diary_date", "diary_date", unique=True),
+        # 같은 사진(내용 해시 파일)을 쓰는 일기 수 확인용 (사진 파일 삭제 전 참조 수 계산)
+        Index("ix_diaries_image_url", "image_url"),
+    )
     
 class TrustedDevice(Base):
     __tablename__ = "trusted_devices"
@@ -107,4 +167,99 @@ class TrustedDevice(Base):
     
     device_name = Column(String(50), nullable=False)
     token = Column(String(100), unique=True, index=True, nullable=False)
-    created_at = Column(Date, default=date.today)
\ No newline at end of file
+    created_at = Column(Date, default=date.today)
+
+
+# --- 집계(롤업) 테이블 ---
+# 원본 행이 추가/수정/삭제될 때 같은 트랜잭션에서 app/service/rollups.py 가 갱신합니다.
+# 합계 조회는 원본 행 수가 아닌 (기간 x 카테고리) 수에 비례합니다.
+# 불일치 확인/재계산: python rollup_tool.py verify | rebuild
+
+class ExpenseMonthlyTotal(Base):
+    __tablename__ = "expense_monthly_totals"
+    id = Column(Integer, primary_key=True)
+    period = Column(String(7), nullable=False)    # "YYYY-MM" (expense_date 기준)
+    category = Column(String(50), nullable=False)
+    total = Column(Float, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("period", "category", name="uq_expense_monthly_totals_period_category"),
+    )
+
+class IncomeMonthlyTotal(Base):
+    __tablename__ = "income_monthly_totals"
+    id = Column(Integer, primary_key=True)
+    period = Column(String(7), nullable=False)    # "YYYY-MM" (income_date 기준)
+    category = Column(String(50), nullable=False) # income_type
+    total = Column(Float, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("period", "category", name="uq_income_monthly_totals_period_category"),
+    )
+
+class LedgerDailyTotal(Base):
+    # 급여 주기(25일~24일, 주말 조정)는 경계가 매달 달라지므로 일 단위로 집계합니다.
+    # 한 주기의 합계는 최대 31일 x 카테고리 수의 행만 더하면 됩니다.
+    __tablename__ = "ledger_daily_totals"
+    id = Column(Integer, primary_key=True)
+    period = Column(Date, nullable=False)         # expense_date
+    category = Column(String(50), nullable=False)
+    total = Column(Float, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("period", "category", name="uq_ledger_daily_totals_period_category"),
+    )
+
+
+# --- 보관(아카이브) 테이블 ---
+# 오래된 주기의 지출은 app/service/archive.py 가 원본 테이블에서 이 테이블로 옮깁니다.
+# 원본 테이블(과 인덱스)이 작아져 현재 주기 조회/백업이 빨라지고, 합계는 집계 테이블에 그대로 남아 있습니다.
+# 원본 id 는 source_id 로 보관합니다. (원본 테이블에서 id 가 재사용되어도 충돌하지 않도록)
+# 보관/상태 확인: python archive_tool.py run | status
+
+class ExpenseArchive(Base):
+    __tablename__ = "expenses_archive"
+    archive_id = Column(Integer, primary_key=True)
+    source_id = Column(Integer, nullable=False)
+    expense_type = Column(String)
+    expense_date = Column(Date, index=True)
+    category = Column(String(50))
+    item = Column(String(100))
+    amount = Column(Float)
+    notes = Column(String(255), nullable=True)
+
+class LedgerExpenseArchive(Base):
+    __tablename__ = "ledger_expenses_archive"
+    archive_id = Column(Integer, primary_key=True)
+    source_id = Column(Integer, nullable=False)
+    expense_date = Column(Date)
+    category = Column(String(50))
+    item = Column(String(100))
+    amount = Column(Float)
+    period = Column(String(7))
+
+    __table_args__ = (
+        Index("ix_ledger_expenses_archive_period_date", "period", "expense_date"),
+    )
+
+class ArchivedPeriod(Base):
+    # 보관된 기간 목록. 이 목록에 있는 기간만 화면/내보내기에서 보관 테이블을 함께 읽습니다.
+    __tablename__ = "archived_periods"
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    period = Column(String(7), nullable=False)    # "YYYY-MM" (가계부는 급여 주기, 지출은 달력 월)
+    row_count = Column(Integer, nullable=False, default=0)
+    archived_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint("table_name", "period", name="uq_archived_periods_table_period"),
+    )
+
+# 원본 모델 -> 보관 모델
+ARCHIVE_MODELS = {
+    Expense: ExpenseArchive,
+    LedgerExpense: LedgerExpenseArchive,
+}
@@ -0,0 +1,93 @@
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+# --- 급여 주기(가계부 월) 계산 ---
+# 가계부의 한 "월"은 전월 월급날부터 이번 달 월급날 전날까지입니다.
+# 월급날은 매월 25일이며, 주말이면 직전 금요일로 당겨집니다.
+# 예) 2024-03 주기: 2024-02-23(금, 25일이 일요일) ~ 2024-03-24
+PAYDAY = 25
+
+
+def adjust_date_for_weekend(target_date: date) -> date:
+    """
+    주어진 날짜가 토요일이면 금요일로, 일요일이면 금요일로 조정합니다.
+    (월=0, 화=1, 수=2, 목=3, 금=4, 토=5, 일=6)
+    """
+    # 토요일(5)이면 하루 전으로
+    if target_date.weekday() == 5:
+        return target_date - timedelta(days=1)
+    # 일요일(6)이면 이틀 전으로
+    elif target_date.weekday() == 6:
+        return target_date - timedelta(days=2)
+    # 평일이면 그대로 반환
+    else:
+        return target_date
+
+
+def _shift_month(year: int, month: int, months: int):
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+
+@lru_cache(maxsize=2048)
+def payday(year: int, month: int) -> date:
+    """
+    해당 월의 실제 월급날 (주말이면 직전 금요일)
+    """
+    return adjust_date_for_weekend(date(year, month, PAYDAY))
+
+
+@lru_cache(maxsize=4096)
+def period_for(value) -> str | None:
+    """
+    날짜가 속한 급여 주기를 "YYYY-MM" 으로 반환합니다. (월급날 이후는 다음 달 주기)
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    year, month = value.year, value.month
+    if value >= payday(year, month):
+        year, month = _shift_month(year, month, 1)
+    return f"{year:04d}-{month:02d}"
+
+
+@lru_cache(maxsize=2048)
+def period_bounds(period: str):
+    """
+    "YYYY-MM" 주기의 (시작일, 종료일)을 반환합니다. (양끝 포함, 주기끼리 겹치거나 비는 날이 없음)
+    """
+    year, month = int(period[:4]), int(period[5:7])
+    prev_year, prev_month = _shift_month(year, month, -1)
+    return payday(prev_year, prev_month), payday(year, month) - timedelta(days=1)
+
+
+def shift_period(period: str, months: int) -> str:
+    year, month = _shift_month(int(period[:4]), int(period[5:7]), months)
+    return f"{year:04d}-{month:02d}"
+
+
+def parse_period(month: str | None, today: date | None = None) -> str:
+    """
+    "YYYY-MM" 파라미터를 주기로 해석합니다. 없거나 형식이 잘못되면 오늘이 속한 주기를 반환합니다.
+    """
+    if month:
+        try:
+            return datetime.strptime(month, "%Y-%m").strftime("%Y-%m")
+        except ValueError:
+            pass
+    return period_for(today or date.today())
+
+
+def period_to_date(period: str) -> date:
+    """
+    주기의 표시용 날짜(해당 월 1일)
+    """
+    return date(int(period[:4]), int(period[5:7]), 1)
+
+
+def julian_day(value: date) -> float:
+    """
+    SQLite julianday('YYYY-MM-DD') 와 같은 값 (자정 기준)
+    """
+    return value.toordinal() + 1721424.5
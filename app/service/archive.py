@@ -0,0 +1,167 @@
+import os
+from datetime import date
+
+from sqlalchemy import select, func, delete, union_all, literal, literal_column
+
+from app.core.models import Expense, LedgerExpense, ArchivedPeriod, ARCHIVE_MODELS
+from app.core.periods import period_for, period_to_date, shift_period
+from app.core.cache import VersionedCache, mark_written
+
+# --- 오래된 기간 보관(아카이브) ---
+# 마감된 지 ARCHIVE_AFTER_MONTHS 개월이 지난 기간의 지출을 보관 테이블로 옮깁니다.
+# 기간 단위: 가계부는 급여 주기(period 컬럼), 지출은 달력 월(expense_date) 입니다.
+# 행을 옮기기만 하므로 집계 테이블(합계)은 바뀌지 않으며, 보관된 기간을 조회하면 두 테이블을 함께 읽습니다.
+ARCHIVE_AFTER_MONTHS = int(os.getenv("ARCHIVE_AFTER_MONTHS", "24"))
+
+# 보관된 기간 목록 캐시 (archived_periods 에 쓰기가 커밋되면 다시 읽습니다)
+archive_cache = VersionedCache("archived_periods", maxsize=8, ttl=300)
+
+
+def archive_cutoff(model, months: int, today: date = None) -> str:
+    """
+    이 기간("YYYY-MM")보다 이전 기간이 보관 대상입니다.
+    """
+    today = today or date.today()
+    current = period_for(today) if model is LedgerExpense else today.strftime("%Y-%m")
+    return shift_period(current, -months)
+
+
+def _period_column(model):
+    if model is LedgerExpense:
+        return model.period
+    return func.strftime("%Y-%m", model.expense_date)
+
+
+def _archive_filter(model, cutoff: str):
+    # 인덱스 범위 조건으로 만듭니다. (가계부: period, 지출: expense_date)
+    if model is LedgerExpense:
+        return model.period < cutoff
+    return model.expense_date < period_to_date(cutoff)
+
+
+def archive_closed_periods(db, months: int = ARCHIVE_AFTER_MONTHS, today: date = None, dry_run: bool = False) -> dict:
+    """
+    보관 대상 행을 INSERT ... SELECT 와 범위 DELETE 로 옮기고 {테이블명: {기간: 행 수}} 를 반환합니다.
+    (커밋은 호출한 쪽에서, dry_run 이면 대상만 세고 옮기지 않습니다)
+    """
+    moved = {}
+    for model, archive_model in ARCHIVE_MODELS.items():
+        condition = _archive_filter(model, archive_cutoff(model, months, today))
+        period_col = _period_column(model)
+        counts = dict(db.execute(
+            select(period_col, func.count()).filter(condition).group_by(period_col)
+        ).all())
+        counts.pop(None, None)
+        if not counts:
+            continue
+        moved[model.__tablename__] = counts
+        if dry_run:
+            continue
+
+        columns = [c.name for c in model.__table__.columns if c.name != "id"]
+        db.execute(
+            archive_model.__table__.insert().from_select(
+                ["source_id", *columns],
+                select(model.id, *(model.__table__.c[name] for name in columns)).filter(condition).order_by(model.id),
+            )
+        )
+        db.execute(delete(model).where(condition).execution_options(synchronize_session=False))
+        mark_written(db, model.__tablename__, archive_model.__tablename__)
+
+        existing = {
+            row.period: row for row in db.query(ArchivedPeriod).filter(
+                ArchivedPeriod.table_name == model.__tablename__, ArchivedPeriod.period.in_(list(counts))
+            )
+        }
+        for period, count in counts.items():
+            if period in existing:
+                existing[period].row_count += count
+            else:
+                db.add(ArchivedPeriod(table_name=model.__tablename__, period=period, row_count=count))
+    return moved
+
+
+def archived_periods(db, model) -> frozenset:
+    return archive_cache.get_or_build(
+        model.__tablename__, (ArchivedPeriod.__tablename__,),
+        lambda: frozenset(db.execute(
+            select(ArchivedPeriod.period).filter(ArchivedPeriod.table_name == model.__tablename__)
+        ).scalars())
+    )
+
+
+def archive_status(db):
+    """
+    [(테이블명, 기간 수, 보관 행 수, 가장 오래된 기간, 가장 최근 기간), ...]
+    """
+    return db.execute(
+        select(ArchivedPeriod.table_name, func.count(), func.sum(ArchivedPeriod.row_count),
+               func.min(ArchivedPeriod.period), func.max(ArchivedPeriod.period))
+        .group_by(ArchivedPeriod.table_name)
+    ).all()
+
+
+# --- 보관된 기간을 포함한 조회 ---
+def _ledger_select(model, archived: bool):
+    id_col = model.source_id if archived else model.id
+    return select(id_col.label("id"), model.expense_date, model.category, model.item, model.amount, model.period,
+                  literal(archived).label("archived"))
+
+
+def ledger_rows_for_period(db, period: str):
+    """
+    한 급여 주기의 가계부 지출 (최신 날짜순, dict 목록).
+    보관된 주기이면 보관 테이블도 함께 읽고, 보관된 행은 archived=True 로 표시합니다. (읽기 전용)
+    """
+    hot = _ledger_select(LedgerExpense, False).filter(LedgerExpense.period == period)
+    if period not in archived_periods(db, LedgerExpense):
+        stmt = hot.order_by(LedgerExpense.expense_date.desc())
+    else:
+        archive_model = ARCHIVE_MODELS[LedgerExpense]
+        cold = _ledger_select(archive_model, True).filter(archive_model.period == period)
+        stmt = union_all(hot, cold).order_by(literal_column("expense_date").desc())
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+
+def ledger_range_select(db, start_period: str, end_period: str):
+    """
+    엑셀 내보내기용 (period, expense_date, category, item, amount) 조회문.
+    범위에 보관된 주기가 있으면 두 테이블을 (period, expense_date) 순서로 합쳐 읽습니다.
+    """
+    columns = ("period", "expense_date", "category", "item", "amount")
+    hot = (
+        select(*(getattr(LedgerExpense, name) for name in columns))
+        .filter(LedgerExpense.period.between(start_period, end_period))
+    )
+    if not any(start_period <= period <= end_period for period in archived_periods(db, LedgerExpense)):
+        return hot.order_by(LedgerExpense.period, LedgerExpense.expense_date, LedgerExpense.id)
+    archive_model = ARCHIVE_MODELS[LedgerExpense]
+    cold = (
+        select(*(getattr(archive_model, name) for name in columns))
+        .filter(archive_model.period.between(start_period, end_period))
+    )
+    # 양쪽 모두 (period, expense_date) 인덱스 순서로 읽으므로 SQLite 가 정렬 없이 병합합니다.
+    return union_all(hot, cold).order_by(literal_column("period"), literal_column("expense_date"))
+
+
+def expense_archive_page(db, before_id: int = None, limit: int = 50):
+    """
+    보관된 지출 목록 (최근에 등록된 순서, 다음 페이지가 있으면 next_before_id 를 함께 반환)
+    """
+    archive_model = ARCHIVE_MODELS[Expense]
+    query = db.query(archive_model)
+    if before_id is not None:
+        query = query.filter(archive_model.archive_id < before_id)
+    rows = query.order_by(archive_model.archive_id.desc()).limit(limit + 1).all()
+    next_before_id = rows[limit - 1].archive_id if len(rows) > limit else None
+    return rows[:limit], next_before_id
+
+
+def archived_row_count(db, model) -> int:
+    return archive_cache.get_or_build(
+        ("row_count", model.__tablename__), (ArchivedPeriod.__tablename__,),
+        lambda: db.execute(
+            select(func.coalesce(func.sum(ArchivedPeriod.row_count), 0))
+            .filter(ArchivedPeriod.table_name == model.__tablename__)
+        ).scalar()
+    )
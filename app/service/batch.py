@@ -0,0 +1,97 @@
+from sqlalchemy import select, func, delete, update
+
+from app.core.models import Expense, Income, LedgerExpense, Assets
+from app.core.periods import period_for
+from app.service.ledger_periods import mark_ledger_periods, periods_of_ids
+from app.service.rollups import ROLLUP_SPECS, new_deltas, add_delta, apply_deltas
+
+# --- 일괄 수정 / 삭제 ---
+# 여러 행을 한 번의 DELETE/UPDATE ... WHERE id IN (...) 으로 처리합니다.
+# 커밋은 호출한 쪽에서 한 번만 하므로, 집계 테이블과 화면 캐시도 배치당 한 번만 갱신됩니다.
+
+# SQLite 바인드 변수 개수 제한을 넘지 않도록 id 목록을 나눠서 실행합니다.
+BATCH_ID_CHUNK = 500
+
+# 일괄 수정으로 바꿀 수 있는 컬럼 (금액처럼 행마다 다른 값은 개별 수정 화면을 사용)
+BATCH_UPDATE_FIELDS = {
+    Expense: {"expense_date", "expense_type", "category", "item", "notes"},
+    Income: {"income_date", "income_type"},
+    LedgerExpense: {"expense_date", "category", "item"},
+    Assets: {"category", "item", "notes"},
+}
+
+
+def _chunks(ids):
+    ids = sorted(set(ids))
+    for i in range(0, len(ids), BATCH_ID_CHUNK):
+        yield ids[i:i + BATCH_ID_CHUNK]
+
+
+def _collect_rollup_deltas(db, model, ids, sign, deltas):
+    """
+    ids 에 해당하는 행들을 (날짜, 카테고리) 별로 합산해 집계 변화량에 더합니다. (행을 하나씩 읽지 않음)
+    """
+    _, date_attr, category_attr, _ = ROLLUP_SPECS[model]
+    date_col, category_col = getattr(model, date_attr), getattr(model, category_attr)
+    rows = db.execute(
+        select(date_col, category_col, func.sum(model.amount), func.count())
+        .filter(model.id.in_(ids))
+        .group_by(date_col, category_col)
+    ).all()
+    for date_value, category, total, count in rows:
+        add_delta(deltas, model, date_value, category, total, sign, count)
+
+
+def batch_delete(db, model, ids) -> int:
+    """
+    ids 에 해당하는 행을 삭제하고 삭제된 행 수를 반환합니다. (커밋은 호출한 쪽에서)
+    """
+    tracked = model in ROLLUP_SPECS
+    deltas = new_deltas()
+    deleted = 0
+    for chunk in _chunks(ids):
+        if tracked:
+            _collect_rollup_deltas(db, model, chunk, -1, deltas)
+        if model is LedgerExpense:
+            mark_ledger_periods(db, periods_of_ids(db, chunk))
+        result = db.execute(
+            delete(model).where(model.id.in_(chunk)).execution_options(synchronize_session=False)
+        )
+        deleted += result.rowcount
+    if deltas:
+        apply_deltas(db.connection(), deltas)
+    return deleted
+
+
+def batch_update(db, model, ids, values: dict) -> int:
+    """
+    ids 에 해당하는 행의 컬럼을 values 로 한꺼번에 바꾸고 수정된 행 수를 반환합니다. (커밋은 호출한 쪽에서)
+    """
+    unknown = set(values) - BATCH_UPDATE_FIELDS[model]
+    if unknown:
+        raise ValueError(f"일괄 수정할 수 없는 항목입니다: {', '.join(sorted(unknown))}")
+    if not values:
+        return 0
+    if model is LedgerExpense and "expense_date" in values:
+        # 지출일이 바뀌면 급여 주기도 함께 바꿉니다.
+        values = {**values, "period": period_for(values["expense_date"])}
+
+    # 날짜/카테고리가 바뀌는 경우에만 집계를 옮깁니다. (변경 전 값을 빼고, 변경 후 값을 더함)
+    spec = ROLLUP_SPECS.get(model)
+    tracked = spec is not None and bool({spec[1], spec[2]} & set(values))
+    deltas = new_deltas()
+    updated = 0
+    for chunk in _chunks(ids):
+        if tracked:
+            _collect_rollup_deltas(db, model, chunk, -1, deltas)
+        if model is LedgerExpense:
+            mark_ledger_periods(db, periods_of_ids(db, chunk) | {values.get("period")})
+        result = db.execute(
+            update(model).where(model.id.in_(chunk)).values(**values).execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount
+        if tracked:
+            _collect_rollup_deltas(db, model, chunk, 1, deltas)
+    if deltas:
+        apply_deltas(db.connection(), deltas)
+    return updated
@@ -0,0 +1,272 @@
+import os
+import re
+import shutil
+import hashlib
+import asyncio
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image
+
+# --- 일기 사진 처리 ---
+# 업로드된 사진의 디코딩/리사이즈/인코딩은 CPU 를 수백 ms 씩 쓰므로 이벤트 루프가 아닌 프로세스 풀에서 실행합니다.
+# (스레드는 GIL 때문에 다른 요청 처리를 여전히 늦추므로 프로세스를 사용)
+# 사진 한 장마다 크기별 변형을 JPEG 과 WebP 로 함께 저장합니다.
+#   {해시}_{너비}.jpg / {해시}_{너비}.webp  (해시: 올린 원본의 SHA-256 앞 32자)
+# DB 의 image_url 에는 표시용(1200px) JPEG 경로를 저장하고, 나머지 변형 경로는 이름 규칙으로 만듭니다.
+# 파일 이름이 내용으로 정해지므로 같은 사진을 다시 올리면 변환 없이 기존 파일을 함께 쓰고(중복 제거),
+# 파일은 그 사진을 쓰는 일기가 하나도 남지 않았을 때만 삭제합니다. (참조 수 = 같은 image_url 을 가진 일기 수)
+# 이미 있는 이름의 파일은 다시 쓰지 않으므로(변환 설정을 바꿔도 새 사진에만 적용) 브라우저가 1년 동안 재검증 없이 캐시합니다.
+# 같은 사진의 "저장 ~ 일기 커밋" 과 "참조 수 확인 ~ 파일 삭제" 는 diary_image_lock 으로 한 번에 하나씩 실행합니다.
+# (그렇지 않으면 삭제 직전에 같은 사진을 재사용한 일기가 커밋되어 없는 파일을 가리킬 수 있음)
+UPLOAD_FOLDER = "static/diary"
+UPLOAD_URL_PREFIX = "/static/diary/"
+
+# 변형 이름 -> 긴 변 최대 픽셀 (작은 것부터)
+IMAGE_VARIANTS = {"thumb": 320, "display": 1200}
+DISPLAY_VARIANT = "display"
+# <img sizes> 값: 피드에 표시되는 사진의 CSS 너비 (브라우저가 이 너비 x 화면 배율에 맞는 변형을 고름)
+DIARY_IMAGE_SIZES = "(max-width: 768px) 100vw, 640px"
+IMAGE_FORMATS = {"jpg": ("JPEG", {"quality": 80, "optimize": True}), "webp": ("WEBP", {"quality": 75, "method": 4})}
+
+CONTENT_HASH_LENGTH = 32
+
+# 동시에 사진을 처리하는 프로세스 수와, 처리를 기다릴 수 있는 업로드 수 (넘으면 앞 작업이 끝날 때까지 대기)
+DIARY_IMAGE_WORKERS = int(os.getenv("DIARY_IMAGE_WORKERS", "2"))
+DIARY_IMAGE_MAX_PENDING = int(os.getenv("DIARY_IMAGE_MAX_PENDING", str(DIARY_IMAGE_WORKERS * 2)))
+
+_VARIANT_URL_PATTERN = re.compile(r"^(?P<base>.+)_(?P<width>\d+)\.jpg$")
+_HASHED_FILE_PATTERN = re.compile(r"^(?P<hash>[0-9a-f]{%d})(?:_\d+)?\.[0-9a-z]+$" % CONTENT_HASH_LENGTH)
+
+_pool = None
+_pending = None
+# 사진 키 -> [asyncio.Lock, 기다리는 요청 수] (기다리는 요청이 없으면 지움)
+_image_locks = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # 스케줄러/DB 스레드가 있는 프로세스를 fork 하지 않도록 spawn 으로 시작합니다.
+        _pool = ProcessPoolExecutor(max_workers=DIARY_IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_image_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+def render_variants(source_path: str, directory: str, base_name: str) -> list:
+    """
+    (작업 프로세스에서 실행) 사진을 한 번 디코딩해 큰 변형부터 차례로 줄여 저장하고, 저장한 파일 이름 목록을 반환합니다.
+    파일은 임시 이름으로 쓴 뒤 바꾸므로 처리 중인 파일이 보이지 않습니다.
+    도중에 변환/저장이 실패하면 이번 호출에서 쓴 파일(임시 파일 포함)을 모두 지우고 예외를 다시 발생시킵니다.
+    (일부 변형만 남으면 _variants_exist 는 거짓인데 파일은 디스크에 계속 남음)
+    """
+    img = Image.open(source_path)
+    # JPEG 은 가장 큰 변형보다 작아지지 않는 범위에서 축소된 상태로 디코딩합니다. (휴대폰 사진 디코딩 시간이 크게 줄어듦)
+    largest = max(IMAGE_VARIANTS.values())
+    img.draft("RGB", (largest, largest))
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    written = []
+    temp_path = None
+    try:
+        for width in sorted(IMAGE_VARIANTS.values(), reverse=True):
+            img.thumbnail((width, width))
+            for ext, (fmt, options) in IMAGE_FORMATS.items():
+                filename = f"{base_name}_{width}.{ext}"
+                path = os.path.join(directory, filename)
+                # 같은 사진이 동시에 올라와도 서로의 임시 파일을 덮지 않도록 프로세스 ID 를 붙입니다.
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                img.save(temp_path, fmt, **options)
+                os.replace(temp_path, path)
+                temp_path = None
+                written.append(filename)
+    except BaseException:
+        for path in [temp_path] + [os.path.join(directory, filename) for filename in written]:
+            if path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        raise
+    return written
+
+
+def content_base_name(sha256: str) -> str:
+    return sha256[:CONTENT_HASH_LENGTH]
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _variants_exist(base_path: str) -> bool:
+    # 변형은 큰 것부터 저장하므로 가장 마지막에 저장되는 파일(가장 작은 WebP)이 있으면 모두 있는 것입니다.
+    return os.path.exists(f"{base_path}_{min(IMAGE_VARIANTS.values())}.webp")
+
+
+def diary_image_key(image_url: str):
+    """
+    사진 URL 의 잠금 키. 내용 해시 이름이면 해시(모든 변형이 같은 키), 예전 이름이면 URL 그대로
+    """
+    if not image_url:
+        return None
+    match = _HASHED_FILE_PATTERN.match(os.path.basename(image_url))
+    return match.group("hash") if match else image_url
+
+
+@contextlib.asynccontextmanager
+async def diary_image_lock(key):
+    """
+    같은 사진(키)에 대한 작업을 한 번에 하나씩 실행합니다. key 가 None 이면 잠그지 않습니다.
+    서버가 프로세스 하나(uvicorn 워커 1개)로 실행되는 것을 전제로 한 프로세스 내 잠금입니다.
+    """
+    if key is None:
+        yield
+        return
+    entry = _image_locks.setdefault(key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _image_locks[key]
+
+
+async def save_diary_image(upload, directory: str = UPLOAD_FOLDER):
+    """
+    받은 업로드(ReceivedUpload)로 사진 변형을 만들어 저장하고 (표시용 JPEG 의 URL, 새로 만들었는지)를 반환합니다.
+    같은 사진이 이미 저장되어 있으면 변환하지 않고 기존 URL 을 반환합니다. (새로 만들었는지 = False)
+    작업 프로세스에는 파일 경로만 넘기므로 사진 내용이 메모리에 올라가는 곳은 디코딩하는 작업 프로세스뿐입니다.
+    변환할 수 없는 사진(예: HEIC)은 원본을 그대로 저장합니다.
+    diary_image_lock(content_base_name(upload.sha256)) 안에서 호출하고, 일기를 커밋하지 못하면
+    새로 만든 파일은 remove_diary_image 로 지워야 합니다.
+    """
+    base_name = content_base_name(upload.sha256)
+    display_url = f"{UPLOAD_URL_PREFIX}{base_name}_{IMAGE_VARIANTS[DISPLAY_VARIANT]}.jpg"
+    if _variants_exist(os.path.join(directory, base_name)):
+        upload.discard()
+        return display_url, False
+    if os.path.exists(os.path.join(directory, f"{base_name}.{upload.extension}")):
+        upload.discard()
+        return f"{UPLOAD_URL_PREFIX}{base_name}.{upload.extension}", False
+
+    global _pending
+    if _pending is None:
+        _pending = asyncio.Semaphore(DIARY_IMAGE_MAX_PENDING)
+    os.makedirs(directory, exist_ok=True)
+
+    try:
+        async with _pending:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(_get_pool(), render_variants, upload.temp_path, directory, base_name)
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    # 작업 프로세스가 비정상 종료되면(메모리 부족 등) 풀을 버리고 다음 업로드에서 새로 만듭니다.
+                    shutdown_image_pool()
+                print(f"[일기 사진] 변환 실패, 원본을 저장합니다: {e}")
+                return upload.commit(base_name), True
+    finally:
+        # 변형을 만들었으면 받은 원본 임시 파일은 지웁니다. (원본으로 저장했으면 아무 일도 하지 않음)
+        upload.discard()
+    return display_url, True
+
+
+def _variant_base(image_url: str):
+    match = _VARIANT_URL_PATTERN.match(image_url or "")
+    if match is None or int(match.group("width")) != IMAGE_VARIANTS[DISPLAY_VARIANT]:
+        return None
+    return match.group("base")
+
+
+def diary_image_sources(image_url: str):
+    """
+    화면에서 쓸 사진 경로들. (src: 표시용 JPEG, thumb: 작은 JPEG, srcset/webp_srcset: 너비별 후보)
+    변형이 없는 예전 사진은 src 만 있고 나머지는 None 입니다.
+    """
+    if not image_url:
+        return None
+    base = _variant_base(image_url)
+    if base is None or not _variants_exist(base.lstrip("/")):
+        return {"src": image_url, "thumb": image_url, "srcset": None, "webp_srcset": None}
+    return {
+        "src": image_url,
+        "thumb": f"{base}_{IMAGE_VARIANTS['thumb']}.jpg",
+        "srcset": ", ".join(f"{base}_{w}.jpg {w}w" for w in IMAGE_VARIANTS.values()),
+        "webp_srcset": ", ".join(f"{base}_{w}.webp {w}w" for w in IMAGE_VARIANTS.values()),
+    }
+
+
+def diary_image_files(image_url: str) -> list:
+    """
+    사진 URL 에 속한 파일 경로들. (변형이 있으면 모든 변형, 없으면 파일 하나)
+    """
+    if not image_url:
+        return []
+    base = _variant_base(image_url)
+    if base is None:
+        return [image_url.lstrip("/")]
+    return [f"{base}_{w}.{ext}".lstrip("/") for w in IMAGE_VARIANTS.values() for ext in IMAGE_FORMATS]
+
+
+def adopt_legacy_image(image_url: str, directory: str = UPLOAD_FOLDER) -> str:
+    """
+    (마이그레이션) 예전 이름(날짜_시각)의 사진을 내용 해시 이름으로 저장하고 새 URL 을 반환합니다.
+    기존 파일은 그대로 두므로, DB 를 새 URL 로 바꾼 뒤 remove_diary_image 로 지웁니다.
+      - 변형이 이미 있는 사진: 표시용 JPEG 의 해시로 변형 파일들을 다시 인코딩하지 않고 복사
+      - 변형이 없는 사진(_compressed.jpg 등): 그 파일을 원본으로 변형을 만들고, 1200px 이하 JPEG 이면 표시용은 원래 파일을 그대로 사용
+      - 이미지로 읽을 수 없는 파일: 해시 이름으로 복사
+    """
+    path = image_url.lstrip("/")
+    base_name = content_base_name(file_sha256(path))
+    target = os.path.join(directory, base_name)
+    display = IMAGE_VARIANTS[DISPLAY_VARIANT]
+    display_url = f"{UPLOAD_URL_PREFIX}{base_name}_{display}.jpg"
+    if _variants_exist(target):
+        return display_url
+
+    old_base = _variant_base(image_url)
+    if old_base is not None and _variants_exist(old_base.lstrip("/")):
+        for old_path, new_path in zip(diary_image_files(image_url), diary_image_files(display_url)):
+            shutil.copyfile(old_path, new_path + ".tmp")
+            os.replace(new_path + ".tmp", new_path)
+        return display_url
+
+    try:
+        with Image.open(path) as img:
+            keep_display = img.format == "JPEG" and max(img.size) <= display
+        render_variants(path, directory, base_name)
+    except Exception:
+        extension = os.path.splitext(path)[1] or ""
+        shutil.copyfile(path, target + extension)
+        return f"{UPLOAD_URL_PREFIX}{base_name}{extension}"
+    if keep_display:
+        shutil.copyfile(path, f"{target}_{display}.jpg.tmp")
+        os.replace(f"{target}_{display}.jpg.tmp", f"{target}_{display}.jpg")
+    return display_url
+
+
+def remove_diary_image(image_url: str):
+    """
+    사진과 모든 변형 파일을 삭제합니다.
+    """
+    for path in diary_image_files(image_url):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
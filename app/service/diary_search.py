@@ -0,0 +1,181 @@
+import html
+import re
+
+from sqlalchemy import text
+
+from app.core.models import Diary
+from app.service.diary_images import diary_image_sources
+
+# --- 일기 전문 검색 (SQLite FTS5, trigram) ---
+# diaries_fts 는 diaries 를 원본으로 하는 외부 콘텐츠(external content) FTS5 테이블입니다.
+# 본문을 한 번 더 저장하지 않고 trigram 색인만 가지며, diaries 의 INSERT/UPDATE/DELETE 트리거로 동기화합니다.
+# (ORM, 비동기 세션, 직접 SQL 등 어떤 경로로 써도 색인이 맞게 유지됩니다)
+# trigram 은 띄어쓰기/조사와 무관하게 3글자 이상 부분 문자열을 찾으므로 한국어에 적합합니다.
+# 1~2글자 검색어는 trigram 으로 찾을 수 없어 LIKE 로 검색합니다. (전체 스캔)
+# 색인 다시 만들기/확인: python diary_search_tool.py rebuild | verify
+FTS_TABLE = "diaries_fts"
+SEARCH_PAGE_SIZE = 20
+SEARCH_PAGE_MAX_SIZE = 50
+# 스니펫에 포함할 토큰(trigram 은 글자) 수
+SNIPPET_TOKENS = 32
+MIN_TRIGRAM_LENGTH = 3
+
+# 스니펫 강조 표시는 본문을 HTML 이스케이프한 뒤 <mark> 로 바꾸기 위해, 본문에 나올 수 없는 제어 문자로 받습니다.
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+
+_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"title, content, content='{Diary.__tablename__}', content_rowid='id', tokenize='trigram')",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON diaries BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON diaries BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, content ON diaries BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+_fts_enabled = None
+
+
+def ensure_diary_search(bind):
+    """
+    시작 시 FTS5 테이블과 동기화 트리거를 만듭니다. 새로 만든 경우 기존 일기로 색인을 채웁니다.
+    SQLite 가 아니거나 trigram 토크나이저가 없으면(SQLite 3.34 미만) LIKE 검색만 사용합니다.
+    """
+    global _fts_enabled
+    if bind.dialect.name != "sqlite":
+        _fts_enabled = False
+        return False
+    try:
+        with bind.begin() as conn:
+            existed = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+            ).first() is not None
+            for statement in _DDL:
+                conn.exec_driver_sql(statement)
+            if not existed:
+                conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+                print(f"[검색] {FTS_TABLE} 색인을 만들었습니다.")
+        _fts_enabled = True
+    except Exception as e:
+        print(f"[검색] FTS5 색인을 만들 수 없어 LIKE 검색을 사용합니다: {e}")
+        _fts_enabled = False
+    return _fts_enabled
+
+
+def rebuild_diary_search(conn):
+    conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def verify_diary_search(conn):
+    """
+    색인이 원본(diaries)과 일치하는지 FTS5 integrity-check 로 확인합니다. 불일치하면 예외가 발생합니다.
+    """
+    conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+
+
+def _is_fts_enabled(db) -> bool:
+    global _fts_enabled
+    if _fts_enabled is None:
+        _fts_enabled = db.get_bind().dialect.name == "sqlite" and db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first() is not None
+    return _fts_enabled
+
+
+# --- 검색 ---
+def split_terms(query: str):
+    return [term for term in (query or "").split() if term]
+
+
+def _match_expression(terms):
+    # 검색어마다 큰따옴표로 감싼 구(phrase)로 만들어 FTS5 문법 문자(*, -, OR 등)를 그대로 검색합니다. (AND 결합)
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _like_pattern(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _render_snippet(snippet: str) -> str:
+    return html.escape(snippet or "").replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+def _python_snippet(content: str, terms, width: int = SNIPPET_TOKENS) -> str:
+    """
+    FTS 스니펫을 쓸 수 없는 LIKE 검색용: 첫 번째 일치 위치 주변을 잘라 검색어를 강조합니다.
+    """
+    content = content or ""
+    lowered = content.lower()
+    positions = [lowered.find(term.lower()) for term in terms]
+    first = min((p for p in positions if p >= 0), default=0)
+    start = max(0, first - width // 2)
+    end = min(len(content), start + width * 2)
+    excerpt = content[start:end]
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    marked = pattern.sub(lambda m: _MARK_OPEN + m.group(0) + _MARK_CLOSE, excerpt)
+    return ("…" if start > 0 else "") + _render_snippet(marked) + ("…" if end < len(content) else "")
+
+
+def search_diaries(db, query: str, offset: int = 0, limit: int = SEARCH_PAGE_SIZE) -> dict:
+    """
+    일기 검색. 검색어(공백으로 구분, 모두 포함)가 있는 일기를 관련도순으로 offset 부터 limit 개 반환합니다.
+    스니펫은 HTML 이스케이프된 문자열이며 일치한 부분만 <mark> 로 감쌉니다.
+    - 3글자 이상 검색어가 있으면 FTS5 MATCH + bm25 순위 (나머지 짧은 검색어는 같은 결과 안에서 LIKE 로 거름)
+    - 모두 1~2글자이거나 FTS5 를 쓸 수 없으면 LIKE 검색, 최신 날짜순
+    """
+    terms = split_terms(query)
+    if not terms:
+        return {"query": query, "mode": None, "results": [], "next_offset": None}
+
+    long_terms = [t for t in terms if len(t) >= MIN_TRIGRAM_LENGTH]
+    short_terms = [t for t in terms if len(t) < MIN_TRIGRAM_LENGTH]
+    use_fts = bool(long_terms) and _is_fts_enabled(db)
+    like_terms = short_terms if use_fts else terms
+
+    params = {"limit": limit + 1, "offset": offset}
+    like_clauses = []
+    for i, term in enumerate(like_terms):
+        params[f"like{i}"] = _like_pattern(term)
+        like_clauses.append(
+            f"(coalesce(d.content, '') LIKE :like{i} ESCAPE '\\' OR coalesce(d.title, '') LIKE :like{i} ESCAPE '\\')"
+        )
+
+    if use_fts:
+        params["match"] = _match_expression(long_terms)
+        params.update(open=_MARK_OPEN, close=_MARK_CLOSE, tokens=SNIPPET_TOKENS)
+        where = " AND ".join([f"{FTS_TABLE} MATCH :match", *like_clauses])
+        stmt = text(
+            f"SELECT d.id, d.diary_date, d.image_url, "
+            f"snippet({FTS_TABLE}, -1, :open, :close, '…', :tokens) AS snippet "
+            f"FROM {FTS_TABLE} JOIN diaries AS d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {where} ORDER BY {FTS_TABLE}.rank, d.id LIMIT :limit OFFSET :offset"
+        )
+    else:
+        stmt = text(
+            f"SELECT d.id, d.diary_date, d.image_url, d.content FROM diaries AS d "
+            f"WHERE {' AND '.join(like_clauses)} ORDER BY d.diary_date DESC, d.id DESC LIMIT :limit OFFSET :offset"
+        )
+
+    rows = db.execute(stmt, params).all()
+    has_more = len(rows) > limit
+    results = [
+        {
+            "id": row.id,
+            "diary_date": str(row.diary_date),
+            "image_url": row.image_url,
+            "image": diary_image_sources(row.image_url),
+            "snippet": _render_snippet(row.snippet) if use_fts else _python_snippet(row.content, terms),
+        }
+        for row in rows[:limit]
+    ]
+    return {
+        "query": query,
+        "mode": "fts" if use_fts else "like",
+        "results": results,
+        "next_offset": offset + limit if has_more else None,
+    }
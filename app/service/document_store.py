@@ -0,0 +1,118 @@
+import os
+import re
+
+from sqlalchemy import event, update, delete
+from sqlalchemy.orm import Session
+
+from app.core.models import StoredDocument
+from app.service.uploads import UPLOAD_KINDS
+
+# --- 내용 주소 문서 저장소 (보험 증서) ---
+# 파일을 SHA-256 으로 한 번만 저장합니다. 같은 PDF 를 여러 보험에 올려도 파일은 하나이고 참조 수(ref_count)만 늘어납니다.
+#   static/uploads/{해시 앞 2자}/{다음 2자}/{해시}.{확장자}   (한 폴더에 파일이 몰리지 않도록 나눔)
+# 해시는 업로드를 임시 파일로 복사하는 한 번의 읽기에서 함께 계산합니다. (uploads.receive_upload)
+# 파일 변경은 DB 커밋에 맞춰 적용하므로, 실패한 요청이 파일을 남기거나 커밋된 행의 파일이 사라지지 않습니다.
+#   - 새 파일: 임시 파일(.part)로 두었다가 커밋되면 최종 위치로 이름을 바꾸고, 커밋되지 않으면 삭제
+#   - 참조 수가 0 이 된 파일: 커밋된 뒤에 삭제 (커밋되지 않으면 그대로)
+DOCUMENT_ROOT = UPLOAD_KINDS["insurance"][0]
+DOCUMENT_URL_PREFIX = UPLOAD_KINDS["insurance"][1]
+
+_DOCUMENT_URL = re.compile(r"^(?:[0-9a-f]{2}/){2}(?P<sha256>[0-9a-f]{64})\.[0-9a-z]+$")
+
+
+def document_relpath(sha256: str, extension: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}.{extension}"
+
+
+def document_url(sha256: str, extension: str) -> str:
+    return DOCUMENT_URL_PREFIX + document_relpath(sha256, extension)
+
+
+def document_sha256(file_path: str):
+    """
+    저장소 파일 URL 의 SHA-256 (저장소 이전의 파일이면 None)
+    """
+    if not file_path or not file_path.startswith(DOCUMENT_URL_PREFIX):
+        return None
+    match = _DOCUMENT_URL.match(file_path[len(DOCUMENT_URL_PREFIX):])
+    return match.group("sha256") if match else None
+
+
+def store_document(session, upload) -> str:
+    """
+    받은 업로드(ReceivedUpload)를 저장소에 넣고 파일 URL 을 반환합니다. 이미 있는 내용이면 참조 수만 올립니다.
+    커밋은 호출한 쪽에서 하며, 파일은 커밋될 때 제자리로 옮겨집니다.
+    """
+    # 참조 수 증가를 먼저 시도합니다. (SQLite 는 이 문장에서 쓰기 잠금을 잡으므로 같은 파일을 동시에 올려도 행은 하나)
+    existing = session.execute(
+        update(StoredDocument)
+        .where(StoredDocument.sha256 == upload.sha256)
+        .values(ref_count=StoredDocument.ref_count + 1)
+        .returning(StoredDocument.extension)
+    ).first()
+    extension = upload.extension if existing is None else existing.extension
+    if existing is None:
+        session.add(StoredDocument(
+            sha256=upload.sha256, size=upload.size, content_type=upload.content_type,
+            extension=extension, ref_count=1,
+        ))
+
+    final_path = os.path.join(DOCUMENT_ROOT, document_relpath(upload.sha256, extension))
+    if existing is not None and os.path.exists(final_path):
+        upload.discard()
+    else:
+        # 새 파일(또는 지워진 파일 복구)은 커밋 후에 제자리로 옮깁니다.
+        session.info.setdefault("document_moves", []).append((upload.temp_path, final_path))
+        upload.temp_path = None
+    return document_url(upload.sha256, extension)
+
+
+def release_document(session, file_path: str):
+    """
+    보험이 파일을 더 이상 쓰지 않을 때 호출합니다. 참조 수를 내리고, 0 이 되면 행을 지우고 커밋 후 파일을 삭제합니다.
+    저장소 이전의 파일(uuid 이름)은 보험 하나만 쓰므로 커밋 후 바로 삭제합니다.
+    """
+    if not file_path:
+        return
+    sha256 = document_sha256(file_path)
+    if sha256 is None:
+        session.info.setdefault("document_removals", []).append(file_path.lstrip("/"))
+        return
+    row = session.execute(
+        update(StoredDocument)
+        .where(StoredDocument.sha256 == sha256)
+        .values(ref_count=StoredDocument.ref_count - 1)
+        .returning(StoredDocument.id, StoredDocument.ref_count, StoredDocument.extension)
+    ).first()
+    if row is not None and row.ref_count <= 0:
+        session.execute(delete(StoredDocument).where(StoredDocument.id == row.id))
+        session.info.setdefault("document_removals", []).append(
+            os.path.join(DOCUMENT_ROOT, document_relpath(sha256, row.extension))
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_document_files(session):
+    for temp_path, final_path in session.info.pop("document_moves", []):
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(temp_path, final_path)
+    for path in session.info.pop("document_removals", []):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[문서] 파일 삭제 실패 ({path}): {e}")
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_document_files(session, transaction):
+    # 커밋되지 않고 끝난 트랜잭션(롤백, 커밋 없이 세션 종료)의 새 파일은 버리고, 삭제 예정 파일은 그대로 둡니다.
+    if transaction.parent is not None:
+        return
+    for temp_path, _ in session.info.pop("document_moves", []):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+    session.info.pop("document_removals", None)
@@ -0,0 +1,122 @@
+import os
+import glob
+import hashlib
+import threading
+from collections import OrderedDict
+
+from app.core.models import LedgerExpense, MonthlyBudget
+from app.core.cache import get_partition_versions, get_version
+from app.core.http_cache import BOOT_ID
+from app.core.metrics import CACHE_REQUESTS, CACHE_EVICTIONS
+
+# --- 엑셀 내보내기 파일 캐시 ---
+# 만든 엑셀 파일을 디스크에 보관해 같은 범위를 다시 내려받으면 DB 조회 없이 파일을 그대로 전송합니다.
+# 키는 (시작 주기, 끝 주기)이고, 항목마다 만들 당시의 "주기별 데이터 버전"을 함께 저장합니다.
+# 어떤 주기에 쓰기가 커밋되면 그 주기를 포함하는 범위만 버전이 달라져 다시 만들어지고, 나머지는 그대로 사용됩니다.
+EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR", "data/export_cache")
+# 캐시 파일 전체 크기 제한 (넘으면 오래 사용하지 않은 파일부터 삭제)
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+EXPORT_FILE_PATTERN = "ledger_*.xlsx"
+
+
+def ledger_export_versions(periods) -> tuple:
+    """
+    내보내기 범위가 의존하는 데이터 버전. (주기별 가계부 지출 버전 + 요약 시트의 예산 버전)
+    """
+    return (get_partition_versions(LedgerExpense.__tablename__, periods), get_version(MonthlyBudget.__tablename__))
+
+
+def export_digest(key, versions) -> str:
+    # 버전 카운터는 프로세스마다 0부터 시작하므로 부팅 ID 를 섞습니다. (ETag 와 같은 방식)
+    return hashlib.sha1(f"{BOOT_ID}|{key}|{versions}".encode()).hexdigest()
+
+
+class ExportFileCache:
+    """
+    전체 크기 제한(LRU)을 가진 디스크 파일 캐시입니다.
+    범위마다 최신 버전의 파일 하나만 보관하며, 버전이 바뀐 항목은 조회 시 삭제하고 다시 만듭니다.
+    """
+    def __init__(self, name: str, directory: str, max_bytes: int):
+        self.name = name
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (versions, path, size)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def open_or_build(self, key, versions, build):
+        """
+        (key, versions)에 해당하는 파일을 열어 반환하고, 없으면 build(directory)로 만든 파일을 저장한 뒤 엽니다.
+        버전은 호출한 쪽에서 build() 전에 읽으므로, 만드는 중에 커밋된 쓰기는 다음 조회에서 반영됩니다.
+        파일은 잠금 안에서(만든 경우에는 최종 이름으로 바꾼 직후) 열어 반환하므로, 전송 중에 다른 요청이
+        같은 파일을 교체하거나 크기 제한으로 삭제해도 열린 파일은 끝까지 읽을 수 있습니다. (닫는 것은 호출한 쪽)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions and os.path.exists(entry[1]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                CACHE_REQUESTS.labels(self.name, "hit").inc()
+                return open(entry[1], "rb")
+            self.misses += 1
+        CACHE_REQUESTS.labels(self.name, "miss").inc()
+
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = build(self.directory)
+        path = os.path.join(self.directory, f"ledger_{export_digest(key, versions)}.xlsx")
+        # 완성된 파일만 최종 이름으로 보이도록 같은 디렉터리 안에서 이름을 바꾸고, 바로 엽니다.
+        os.replace(temp_path, path)
+        file = open(path, "rb")
+        size = os.fstat(file.fileno()).st_size
+
+        with self._lock:
+            stale = self._entries.pop(key, None)
+            if stale is not None:
+                self._discard(stale, keep_path=path)
+            self._entries[key] = (versions, path, size)
+            self.total_bytes += size
+            # 방금 만든 파일은 남겨 두고, 크기 제한을 넘으면 오래된 항목부터 삭제합니다.
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._discard(evicted, keep_path=path)
+                CACHE_EVICTIONS.labels(self.name).inc()
+        return file
+
+    def _discard(self, entry, keep_path=None):
+        _, path, size = entry
+        self.total_bytes -= size
+        if path != keep_path:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def purge(self):
+        """
+        캐시 디렉터리의 파일을 모두 삭제합니다. (이전 실행의 파일은 버전을 알 수 없으므로 시작 시 호출)
+        """
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+            for path in glob.glob(os.path.join(self.directory, EXPORT_FILE_PATTERN)):
+                os.remove(path)
+
+    def stats(self) -> dict:
+        return {"name": self.name, "size": len(self._entries), "bytes": self.total_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+
+def iter_file(file, chunk_size: int = 64 * 1024):
+    """
+    열린 파일을 chunk_size 씩 읽어 돌려주고, 다 읽으면(또는 전송이 중단되면) 파일을 닫습니다. (StreamingResponse 용)
+    """
+    try:
+        while chunk := file.read(chunk_size):
+            yield chunk
+    finally:
+        file.close()
+
+
+ledger_export_cache = ExportFileCache("ledger_export", EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES)
@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+import numpy as np
+from sqlalchemy import select, func
+
+from app.core.models import LedgerDailyTotal
+from app.core.periods import period_bounds, shift_period, julian_day
+
+# --- 급여 주기 예산 소진 예측 ---
+# 이번 주기의 일별 누적 지출과, 지난 주기들의 "주기 내 같은 시점까지 쓴 비율" 곡선을 비교해
+# 주기 말 예상 지출과 예산 초과 예상일을 계산합니다. (일별 배열의 누적합으로 계산)
+
+# 비교에 사용할 지난 주기 수
+FORECAST_HISTORY_CYCLES = 6
+
+
+def build_cycle_forecast(db, period: str, today, budget: float):
+    """
+    오늘이 period 주기 안에 있을 때 예측 결과(dict)를, 아니면 None 을 반환합니다.
+    """
+    start_date, end_date = period_bounds(period)
+    if not (start_date <= today <= end_date):
+        return None
+
+    cycles = [shift_period(period, -i) for i in range(FORECAST_HISTORY_CYCLES, -1, -1)]
+    bounds = [period_bounds(p) for p in cycles]
+    starts = np.array([julian_day(s) for s, _ in bounds])
+    lengths = np.array([(e - s).days + 1 for s, e in bounds])
+
+    # 지난 주기 시작일부터 오늘까지의 일별 합계 (카테고리 합산)
+    rows = db.connection().execute(
+        select(func.julianday(LedgerDailyTotal.period), func.sum(LedgerDailyTotal.total))
+        .filter(LedgerDailyTotal.period.between(bounds[0][0], today))
+        .group_by(LedgerDailyTotal.period)
+    ).all()
+
+    # daily[i][k] = cycles[i] 주기의 k번째 날 지출, cumulative 는 주기별 누적합
+    daily = np.zeros((len(cycles), int(lengths.max())))
+    if rows:
+        days, totals = (np.array(column, dtype=float) for column in zip(*rows))
+        cycle_index = np.searchsorted(starts, days, side="right") - 1
+        day_index = (days - starts[cycle_index]).astype(int)
+        np.add.at(daily, (cycle_index, day_index), totals)
+    cumulative = np.cumsum(daily, axis=1)
+
+    length = int(lengths[-1])
+    elapsed = (today - start_date).days + 1
+    spent = float(cumulative[-1, elapsed - 1])
+
+    # 지난 주기마다 "주기 진행률 -> 누적 지출 비율" 곡선을 이번 주기 길이에 맞춰 보간한 뒤 평균
+    positions = np.arange(1, length + 1) / length
+    history_totals = cumulative[np.arange(len(cycles) - 1), lengths[:-1] - 1]
+    curves = [
+        np.interp(positions, np.arange(1, n + 1) / n, cumulative[i, :n] / history_totals[i])
+        for i, n in enumerate(lengths[:-1]) if history_totals[i] > 0
+    ]
+    if curves:
+        curve = np.mean(curves, axis=0)
+        method = "history"
+    else:
+        curve = positions  # 기록이 없으면 매일 같은 금액을 쓴다고 가정
+        method = "linear"
+
+    fraction_now = float(curve[elapsed - 1])
+    if fraction_now > 0 and spent > 0:
+        projected_total = spent / fraction_now
+    else:
+        projected_total = spent / elapsed * length
+
+    # 오늘 이후의 예상 누적 지출: 남은 금액을 곡선의 남은 비율대로 나눠 배분
+    path = cumulative[-1, :length].copy()
+    if elapsed < length:
+        remaining_fraction = 1 - fraction_now
+        if remaining_fraction > 0:
+            path[elapsed:] = spent + (projected_total - spent) * (curve[elapsed:] - fraction_now) / remaining_fraction
+        else:
+            path[elapsed:] = spent
+
+    overrun_days = np.nonzero(path > budget)[0] if budget > 0 else np.array([], dtype=int)
+    overrun_date = start_date + timedelta(days=int(overrun_days[0])) if overrun_days.size else None
+
+    return {
+        "period": period,
+        "elapsed_days": elapsed,
+        "cycle_days": length,
+        "spent_to_date": spent,
+        "daily_average": spent / elapsed,
+        "projected_total": round(projected_total),
+        "projected_remaining": round(budget - projected_total),
+        "projected_overrun_date": overrun_date,
+        "method": method,
+        "history_cycles": len(curves),
+    }
@@ -0,0 +1,206 @@
+import csv
+import io
+import zipfile
+from datetime import datetime
+from itertools import islice
+
+import openpyxl
+from openpyxl.utils.exceptions import InvalidFileException
+from pydantic import ValidationError
+from app.api.schemas import ExpenseCreate, IncomeCreate, LedgerExpenseCreate
+from app.core.models import Expense, Income, LedgerExpense
+from app.core.cache import mark_written
+from app.service.rollups import ROLLUP_SPECS, new_deltas, add_delta, apply_deltas
+from app.service.ledger_periods import mark_ledger_periods
+from app.core.periods import period_for
+
+# --- 대량 가져오기 (CSV / XLSX) ---
+# 파일을 한 번에 읽지 않고 한 행씩 읽어 검증한 뒤, BATCH_SIZE 개씩 executemany 로 저장합니다.
+BATCH_SIZE = 1000
+# 응답에 담을 오류 행의 최대 개수 (전체 오류 수는 error_count 로 따로 알려줍니다)
+MAX_REPORTED_ERRORS = 500
+
+# 엑셀 파일이 아니거나 깨진 파일을 읽을 때 openpyxl 이 내는 예외 (400 으로 응답)
+#   zip 이 아님/잘림: BadZipFile, 필요한 파트가 없음: KeyError/IndexError, XML 이 깨짐: SyntaxError (ElementTree/lxml 의 파싱 오류)
+XLSX_READ_ERRORS = (InvalidFileException, zipfile.BadZipFile, KeyError, IndexError, SyntaxError)
+
+# 헤더 이름 -> 스키마 필드 (엑셀 내보내기 파일의 한글 헤더도 그대로 받습니다)
+HEADER_ALIASES = {
+    "날짜": "date", "일자": "date", "date": "date", "expense_date": "date", "income_date": "date",
+    "카테고리": "category", "분류": "category", "category": "category",
+    "항목": "item", "내용": "item", "item": "item",
+    "금액": "amount", "amount": "amount",
+    "메모": "notes", "비고": "notes", "notes": "notes",
+    "유형": "expense_type", "지출 유형": "expense_type", "expense_type": "expense_type",
+    "수입 유형": "income_type", "수입유형": "income_type", "income_type": "income_type",
+}
+
+# 가져오기 대상: 이름 -> (스키마, 모델, 스키마 -> 모델 컬럼 변환 함수)
+IMPORT_TARGETS = {
+    "expenses": (ExpenseCreate, Expense, lambda r: {
+        "expense_date": r.date, "expense_type": r.expense_type, "category": r.category,
+        "item": r.item, "amount": r.amount, "notes": r.notes,
+    }),
+    "incomes": (IncomeCreate, Income, lambda r: {
+        "income_date": r.date, "income_type": r.income_type, "amount": r.amount,
+    }),
+    "ledger": (LedgerExpenseCreate, LedgerExpense, lambda r: {
+        "expense_date": r.date, "category": r.category, "item": r.item, "amount": r.amount,
+    }),
+}
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def _normalize_header(header):
+    fields = []
+    for name in header:
+        name = str(name).strip() if name is not None else ""
+        fields.append(HEADER_ALIASES.get(name) or HEADER_ALIASES.get(name.lower()))
+    return fields
+
+
+def _clean_value(value):
+    if isinstance(value, str):
+        value = value.strip()
+        if value == "":
+            return None
+    return value
+
+
+def _clean_amount(value):
+    # "1,000" / "₩1,000" 형태의 금액 문자열 허용
+    if isinstance(value, str):
+        return value.replace(",", "").replace("₩", "").replace("원", "").strip()
+    return value
+
+
+def iter_csv_rows(fileobj):
+    """
+    업로드된 CSV 파일을 한 행씩 (행 번호, 값 목록) 으로 읽습니다. 첫 행은 헤더입니다.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        for line_number, row in enumerate(csv.reader(text), start=1):
+            yield line_number, row
+    except UnicodeDecodeError:
+        raise ImportFormatError("CSV 파일은 UTF-8 로 저장해 주세요.")
+    finally:
+        # 래퍼가 정리될 때 업로드 파일까지 닫지 않도록 분리합니다.
+        if not fileobj.closed:
+            text.detach()
+
+
+def iter_xlsx_rows(fileobj):
+    """
+    업로드된 XLSX 파일의 첫 시트를 read_only 모드로 한 행씩 읽습니다. (통합 문서 전체를 메모리에 올리지 않음)
+    """
+    try:
+        workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    except XLSX_READ_ERRORS:
+        raise ImportFormatError("엑셀(.xlsx) 파일을 읽을 수 없습니다. 파일이 손상되지 않았는지 확인해 주세요.")
+    try:
+        sheet = workbook.worksheets[0]
+        for line_number, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+            yield line_number, row
+    except XLSX_READ_ERRORS:
+        # read_only 모드는 시트를 읽으면서 파싱하므로, 시트가 깨진 경우는 여기서 드러납니다.
+        raise ImportFormatError("엑셀(.xlsx) 파일의 시트를 읽을 수 없습니다. 파일이 손상되지 않았는지 확인해 주세요.")
+    finally:
+        workbook.close()
+
+
+def iter_upload_rows(filename: str, fileobj):
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return iter_csv_rows(fileobj)
+    if name.endswith(".xlsx") or name.endswith(".xlsm"):
+        return iter_xlsx_rows(fileobj)
+    raise ImportFormatError("CSV(.csv) 또는 엑셀(.xlsx) 파일만 가져올 수 있습니다.")
+
+
+def _validated_records(rows, schema, errors):
+    """
+    (행 번호, 값) 스트림을 스키마로 검증하여 통과한 레코드만 내보내고, 실패한 행은 errors 에 기록합니다.
+    """
+    rows = iter(rows)
+    try:
+        _, header = next(rows)
+    except StopIteration:
+        raise ImportFormatError("빈 파일입니다.")
+    fields = _normalize_header(header)
+    if "date" not in fields or "amount" not in fields:
+        raise ImportFormatError("헤더에 날짜(date)와 금액(amount) 열이 필요합니다.")
+
+    for line_number, values in rows:
+        if values is None or all(_clean_value(v) is None for v in values):
+            continue  # 빈 행 건너뛰기
+        data = {}
+        for field, value in zip(fields, values):
+            if field:
+                data[field] = _clean_value(value)
+        if "amount" in data:
+            data["amount"] = _clean_amount(data["amount"])
+        if isinstance(data.get("date"), datetime):
+            data["date"] = data["date"].date()  # 엑셀 날짜 셀은 datetime 으로 읽힙니다.
+        try:
+            yield schema(**data)
+        except ValidationError as e:
+            errors["count"] += 1
+            if len(errors["rows"]) < MAX_REPORTED_ERRORS:
+                errors["rows"].append({
+                    "row": line_number,
+                    "errors": [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()],
+                })
+
+
+def import_rows(db, target: str, rows, dry_run: bool = False) -> dict:
+    """
+    검증된 행을 BATCH_SIZE 개씩 한 번의 executemany 로 저장합니다.
+    집계(롤업) 테이블도 같은 트랜잭션에서 갱신하고, 전체를 한 번에 커밋합니다. (중간에 실패하면 모두 롤백)
+    """
+    schema, model, to_columns = IMPORT_TARGETS[target]
+    _, date_attr, category_attr, _ = ROLLUP_SPECS[model]
+    errors = {"count": 0, "rows": []}
+    inserted = 0
+    deltas = new_deltas()
+
+    records = _validated_records(rows, schema, errors)
+    try:
+        while True:
+            batch = [to_columns(record) for record in islice(records, BATCH_SIZE)]
+            if not batch:
+                break
+            inserted += len(batch)
+            if dry_run:
+                continue
+            # ORM 일괄 INSERT 보다 가벼운 Core executemany 를 사용합니다.
+            db.execute(model.__table__.insert(), batch)
+            for row in batch:
+                add_delta(deltas, model, row[date_attr], row.get(category_attr), row["amount"], 1)
+            if model is LedgerExpense:
+                mark_ledger_periods(db, {period_for(row[date_attr]) for row in batch})
+
+        if dry_run:
+            db.rollback()
+        else:
+            # 일괄 INSERT 는 flush 이벤트를 거치지 않으므로 집계는 마지막에 한 번에 반영합니다.
+            apply_deltas(db.connection(), deltas)
+            if inserted:
+                mark_written(db, model.__tablename__)
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {
+        "target": target,
+        "dry_run": dry_run,
+        "inserted": 0 if dry_run else inserted,
+        "valid": inserted,
+        "error_count": errors["count"],
+        "errors": errors["rows"],
+    }
+
@@ -0,0 +1,112 @@
+import os
+import tempfile
+
+import openpyxl
+from sqlalchemy import select
+
+from app.core.models import MonthlyBudget
+from app.core.periods import period_bounds, shift_period
+from app.service.archive import ledger_range_select
+
+# --- 가계부 엑셀 내보내기 (스트리밍) ---
+# write_only 워크북에 DB 커서(yield_per)에서 읽은 행을 바로 써 넣으므로,
+# 행 수와 관계없이 메모리 사용량이 일정합니다. 결과는 임시 파일에 저장한 뒤 파일로 전송합니다.
+
+EXPORT_HEADERS = ["날짜", "카테고리", "항목", "금액"]
+# 한 번에 내보낼 수 있는 최대 주기 수 (10년)
+EXPORT_MAX_PERIODS = 120
+# DB 커서에서 한 번에 가져올 행 수
+EXPORT_FETCH_SIZE = 2000
+SUMMARY_SHEET_TITLE = "요약"
+
+
+def period_range(start_period: str, end_period: str):
+    """
+    start_period ~ end_period (양끝 포함) 의 주기 목록. 순서가 바뀌어 있으면 바로잡습니다.
+    """
+    if start_period > end_period:
+        start_period, end_period = end_period, start_period
+    periods = [start_period]
+    while periods[-1] < end_period:
+        periods.append(shift_period(periods[-1], 1))
+    return periods
+
+
+def _iter_ledger_rows(db, start_period: str, end_period: str):
+    # (period, expense_date) 인덱스 순서대로 읽으므로 정렬을 위해 결과를 모아둘 필요가 없습니다.
+    # 보관된 주기가 범위에 있으면 보관 테이블도 같은 순서로 합쳐 읽습니다.
+    stmt = ledger_range_select(db, start_period, end_period).execution_options(yield_per=EXPORT_FETCH_SIZE)
+    yield from db.execute(stmt)
+
+
+def write_ledger_workbook(db, periods, fileobj):
+    """
+    주기마다 한 시트(날짜, 카테고리, 항목, 금액)와 마지막 "요약" 시트를 fileobj 에 저장합니다.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheets = {}
+
+    def sheet_for(period):
+        # write_only 시트는 만든 순서대로 저장되므로, 데이터가 없는 주기도 순서대로 만들어 둡니다.
+        while period not in sheets:
+            next_period = periods[len(sheets)]
+            sheet = workbook.create_sheet(title=next_period)
+            sheet.append(EXPORT_HEADERS)
+            sheets[next_period] = sheet
+        return sheets[period]
+
+    period_totals = {period: [0, 0.0] for period in periods}
+    category_totals = {}
+
+    for period, expense_date, category, item, amount in _iter_ledger_rows(db, periods[0], periods[-1]):
+        sheet_for(period).append([expense_date, category, item, amount])
+        period_totals[period][0] += 1
+        period_totals[period][1] += amount or 0
+        totals = category_totals.setdefault(category or "", [0, 0.0])
+        totals[0] += 1
+        totals[1] += amount or 0
+    sheet_for(periods[-1])
+
+    budgets = dict(db.execute(
+        select(MonthlyBudget.month, MonthlyBudget.amount).filter(MonthlyBudget.month.in_(periods))
+    ).all())
+
+    summary = workbook.create_sheet(title=SUMMARY_SHEET_TITLE)
+    summary.append(["주기", "시작일", "종료일", "건수", "지출 합계", "예산", "잔액"])
+    for period in periods:
+        start_date, end_date = period_bounds(period)
+        count, total = period_totals[period]
+        budget = budgets.get(period)
+        summary.append([period, start_date, end_date, count, total, budget, budget - total if budget is not None else None])
+    summary.append([])
+    summary.append(["카테고리", "건수", "지출 합계"])
+    for category, (count, total) in sorted(category_totals.items(), key=lambda item: -item[1][1]):
+        summary.append([category, count, total])
+
+    workbook.save(fileobj)
+
+
+def export_periods(start_period: str, end_period: str):
+    """
+    내보낼 주기 목록. 최대 주기 수를 넘으면 ValueError 를 발생시킵니다.
+    """
+    periods = period_range(start_period, end_period)
+    if len(periods) > EXPORT_MAX_PERIODS:
+        raise ValueError(f"한 번에 최대 {EXPORT_MAX_PERIODS}개월까지 내보낼 수 있습니다.")
+    return periods
+
+
+def export_ledger_to_tempfile(db, start_period: str, end_period: str, directory: str = None) -> str:
+    """
+    엑셀 파일을 임시 파일(directory 가 없으면 시스템 임시 디렉터리)로 만들어 경로를 반환합니다.
+    """
+    periods = export_periods(start_period, end_period)
+
+    fd, path = tempfile.mkstemp(prefix="ledger_export_", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as fileobj:
+            write_ledger_workbook(db, periods, fileobj)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
@@ -0,0 +1,90 @@
+from sqlalchemy import event, select, update, bindparam
+from sqlalchemy.orm import Session
+
+from app.core.models import LedgerExpense
+from app.core.periods import period_for
+from app.core.cache import mark_written_partitions
+from app.service.rollups import _committed_value
+
+# --- 가계부 급여 주기(period) 컬럼 채우기 / 검증 ---
+# 주기는 날짜에만 의존하므로, 행 단위가 아닌 "서로 다른 지출일" 단위로 계산해 한 번의 executemany 로 갱신합니다.
+
+
+# --- 변경된 급여 주기 표시 ---
+# 가계부 지출이 바뀐 주기의 파티션 버전을 커밋 시 올려, 그 주기에 의존하는 캐시(엑셀 내보내기 등)만 무효화합니다.
+def mark_ledger_periods(session, periods):
+    mark_written_partitions(session, LedgerExpense.__tablename__, periods)
+
+
+def periods_of_ids(db, ids):
+    """
+    id 목록에 해당하는 행들의 급여 주기 (일괄 수정/삭제 전에 호출)
+    """
+    return set(db.execute(
+        select(LedgerExpense.period).filter(LedgerExpense.id.in_(ids)).distinct()
+    ).scalars())
+
+
+@event.listens_for(Session, "before_flush")
+def _mark_ledger_periods_before_flush(session, flush_context, instances):
+    periods = set()
+    for obj in session.new:
+        if isinstance(obj, LedgerExpense):
+            periods.add(period_for(obj.expense_date))
+    for obj in (*session.deleted, *session.dirty):
+        if isinstance(obj, LedgerExpense) and (obj in session.deleted or session.is_modified(obj)):
+            periods.add(period_for(_committed_value(obj, "expense_date")))
+            periods.add(period_for(obj.expense_date))
+    if periods:
+        mark_ledger_periods(session, periods)
+
+
+def _distinct_dates(db, only_missing: bool):
+    query = select(LedgerExpense.expense_date).filter(LedgerExpense.expense_date.is_not(None)).distinct()
+    if only_missing:
+        query = query.filter(LedgerExpense.period.is_(None))
+    return db.execute(query).scalars().all()
+
+
+def backfill_periods(db, only_missing: bool = True) -> int:
+    """
+    period 컬럼을 지출일로부터 다시 계산하고, 갱신된 행 수를 반환합니다. (커밋은 호출한 쪽에서)
+    only_missing=False 면 모든 행을 다시 계산합니다. (주기 규칙이 바뀐 경우)
+    """
+    dates = _distinct_dates(db, only_missing)
+    if not dates:
+        return 0
+    stmt = (
+        update(LedgerExpense.__table__)
+        .where(LedgerExpense.__table__.c.expense_date == bindparam("b_date"))
+        .values(period=bindparam("b_period"))
+    )
+    previous = set(db.execute(
+        select(LedgerExpense.period).filter(LedgerExpense.period.is_not(None)).distinct()
+    ).scalars()) if not only_missing else set()
+    params = [{"b_date": d, "b_period": period_for(d)} for d in dates]
+    result = db.execute(stmt, params)
+    mark_ledger_periods(db, previous | {p["b_period"] for p in params})
+    return result.rowcount
+
+
+def verify_periods(db):
+    """
+    저장된 period 가 지출일로 계산한 주기와 다른 (지출일, 저장된 값, 올바른 값) 목록을 반환합니다.
+    """
+    rows = db.execute(
+        select(LedgerExpense.expense_date, LedgerExpense.period)
+        .filter(LedgerExpense.expense_date.is_not(None))
+        .distinct()
+    ).all()
+    return [(d, stored, period_for(d)) for d, stored in rows if stored != period_for(d)]
+
+
+def ensure_ledger_periods(db):
+    """
+    시작 시 period 가 비어 있는 행(컬럼 추가 직후 등)을 채웁니다.
+    """
+    updated = backfill_periods(db, only_missing=True)
+    if updated:
+        db.commit()
+        print(f"[가계부] 급여 주기(period)가 없는 {updated}건을 채웠습니다.")
@@ -0,0 +1,253 @@
+from collections import defaultdict
+
+from sqlalchemy import event, inspect, select, func, delete, update, bindparam, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import sqlite as sqlite_dialect, postgresql as postgresql_dialect
+
+from app.core.models import (
+    Expense, Income, LedgerExpense,
+    ExpenseMonthlyTotal, IncomeMonthlyTotal, LedgerDailyTotal,
+    ARCHIVE_MODELS,
+)
+
+# --- 집계 대상 정의 ---
+# 원본 모델 -> (집계 모델, 날짜 컬럼, 카테고리 컬럼, 기간 단위)
+# 기간 단위: "month" 는 "YYYY-MM" 문자열, "day" 는 날짜 그대로 사용합니다.
+ROLLUP_SPECS = {
+    Expense: (ExpenseMonthlyTotal, "expense_date", "category", "month"),
+    Income: (IncomeMonthlyTotal, "income_date", "income_type", "month"),
+    LedgerExpense: (LedgerDailyTotal, "expense_date", "category", "day"),
+}
+
+# 합계 비교 시 허용 오차 (Float 누적 오차)
+DRIFT_TOLERANCE = 0.01
+
+
+def _period_key(value, granularity):
+    if value is None:
+        return None
+    return value.strftime("%Y-%m") if granularity == "month" else value
+
+
+def _period_expr(column, granularity):
+    return func.strftime("%Y-%m", column) if granularity == "month" else column
+
+
+def _committed_value(obj, attr):
+    """
+    flush 이전(DB에 저장된) 값을 반환합니다. 변경되지 않았다면 현재 값과 같습니다.
+    """
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, attr)
+
+
+def add_delta(deltas, model, date_value, category, amount, sign, count=1):
+    """
+    deltas[(집계 모델, 기간, 카테고리)] 에 금액/건수 변화량을 누적합니다.
+    여러 행을 미리 합산한 경우 amount 에 합계, count 에 행 수를 넘깁니다.
+    """
+    rollup_model, _, _, granularity = ROLLUP_SPECS[model]
+    period = _period_key(date_value, granularity)
+    if period is None:
+        return
+    delta = deltas[(rollup_model, period, category or "")]
+    delta[0] += sign * (amount or 0)
+    delta[1] += sign * count
+
+
+def new_deltas():
+    return defaultdict(lambda: [0.0, 0])
+
+
+def apply_deltas(conn, deltas):
+    """
+    누적된 변화량을 집계 테이블에 반영합니다. (호출한 커넥션의 트랜잭션 안에서 실행)
+    집계 테이블마다 한 번의 executemany 로 반영하고, 건수가 0이 된 행은 삭제합니다.
+    """
+    dialect_insert = {"sqlite": sqlite_dialect.insert, "postgresql": postgresql_dialect.insert}.get(conn.dialect.name)
+
+    rows_by_model = defaultdict(list)
+    for (rollup_model, period, category), (total, count) in deltas.items():
+        if count == 0 and abs(total) < DRIFT_TOLERANCE:
+            continue
+        rows_by_model[rollup_model].append({"period": period, "category": category, "total": total, "count": count})
+
+    for rollup_model, rows in rows_by_model.items():
+        if dialect_insert is not None:
+            stmt = dialect_insert(rollup_model)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["period", "category"],
+                set_={"total": rollup_model.total + stmt.excluded.total, "count": rollup_model.count + stmt.excluded.count},
+            )
+            conn.execute(stmt, rows)
+        else:
+            for row in rows:
+                result = conn.execute(
+                    update(rollup_model)
+                    .where(rollup_model.period == row["period"], rollup_model.category == row["category"])
+                    .values(total=rollup_model.total + row["total"], count=rollup_model.count + row["count"])
+                )
+                if result.rowcount == 0:
+                    conn.execute(rollup_model.__table__.insert().values(**row))
+
+        shrunk = [{"b_period": row["period"], "b_category": row["category"]} for row in rows if row["count"] < 0]
+        if shrunk:
+            conn.execute(
+                delete(rollup_model).where(
+                    rollup_model.period == bindparam("b_period"),
+                    rollup_model.category == bindparam("b_category"),
+                    rollup_model.count <= 0,
+                ),
+                shrunk,
+            )
+
+
+@event.listens_for(Session, "before_flush")
+def _update_rollups_before_flush(session, flush_context, instances):
+    """
+    Expense / Income / LedgerExpense 가 추가, 수정, 삭제되면 같은 트랜잭션에서 집계 테이블을 갱신합니다.
+    (동기 Session 과 AsyncSession 모두 이 이벤트를 거칩니다)
+    """
+    deltas = new_deltas()
+
+    for obj in session.new:
+        spec = ROLLUP_SPECS.get(type(obj))
+        if spec:
+            _, date_attr, category_attr, _ = spec
+            add_delta(deltas, type(obj), getattr(obj, date_attr), getattr(obj, category_attr), obj.amount, 1)
+
+    for obj in session.deleted:
+        spec = ROLLUP_SPECS.get(type(obj))
+        if spec:
+            _, date_attr, category_attr, _ = spec
+            add_delta(deltas, type(obj), _committed_value(obj, date_attr), _committed_value(obj, category_attr),
+                      _committed_value(obj, "amount"), -1)
+
+    for obj in session.dirty:
+        spec = ROLLUP_SPECS.get(type(obj))
+        if spec and obj not in session.deleted and session.is_modified(obj):
+            _, date_attr, category_attr, _ = spec
+            add_delta(deltas, type(obj), _committed_value(obj, date_attr), _committed_value(obj, category_attr),
+                      _committed_value(obj, "amount"), -1)
+            add_delta(deltas, type(obj), getattr(obj, date_attr), getattr(obj, category_attr), obj.amount, 1)
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+# --- 합계 조회 ---
+def get_expense_category_totals(db):
+    """
+    전체 기간의 지출 카테고리별 합계 {카테고리: 합계}
+    """
+    rows = db.execute(
+        select(ExpenseMonthlyTotal.category, func.sum(ExpenseMonthlyTotal.total))
+        .group_by(ExpenseMonthlyTotal.category)
+    ).all()
+    return {category: total for category, total in rows}
+
+
+def get_grand_totals(db):
+    """
+    전체 (수입 합계, 지출 합계)를 한 번의 조회로 반환합니다.
+    """
+    income_sum = select(func.coalesce(func.sum(IncomeMonthlyTotal.total), 0)).scalar_subquery()
+    expense_sum = select(func.coalesce(func.sum(ExpenseMonthlyTotal.total), 0)).scalar_subquery()
+    return tuple(db.execute(select(income_sum, expense_sum)).one())
+
+
+def get_ledger_category_totals(db, start_date, end_date):
+    """
+    기간(start_date ~ end_date, 양끝 포함)의 가계부 카테고리별 합계 {카테고리: 합계}
+    """
+    rows = db.execute(
+        select(LedgerDailyTotal.category, func.sum(LedgerDailyTotal.total))
+        .filter(LedgerDailyTotal.period.between(start_date, end_date))
+        .group_by(LedgerDailyTotal.category)
+    ).all()
+    return {category: total for category, total in rows}
+
+
+# --- 재계산 / 검증 ---
+def _source_rows(model):
+    """
+    집계의 원본 행 (보관 테이블이 있으면 보관된 행도 포함, 집계는 보관 후에도 전체 기간을 유지합니다)
+    """
+    _, date_attr, category_attr, _ = ROLLUP_SPECS[model]
+    sources = [model] + ([ARCHIVE_MODELS[model]] if model in ARCHIVE_MODELS else [])
+    selects = [
+        select(getattr(source, date_attr).label("date"), getattr(source, category_attr).label("category"),
+               source.amount.label("amount"))
+        for source in sources
+    ]
+    return (union_all(*selects) if len(selects) > 1 else selects[0]).subquery()
+
+
+def _expected_rows(model):
+    granularity = ROLLUP_SPECS[model][3]
+    source = _source_rows(model)
+    category_col = func.coalesce(source.c.category, "")
+    period = _period_expr(source.c.date, granularity)
+    return (
+        select(period.label("period"), category_col.label("category"),
+               func.coalesce(func.sum(source.c.amount), 0).label("total"), func.count().label("count"))
+        .filter(source.c.date.is_not(None))
+        .group_by(period, category_col)
+    )
+
+
+def rebuild_rollups(db, models=None):
+    """
+    집계 테이블을 원본 데이터로부터 다시 계산합니다. (커밋은 호출한 쪽에서)
+    """
+    for model in models or ROLLUP_SPECS:
+        rollup_model = ROLLUP_SPECS[model][0]
+        db.execute(delete(rollup_model))
+        db.execute(
+            rollup_model.__table__.insert().from_select(["period", "category", "total", "count"], _expected_rows(model))
+        )
+
+
+def verify_rollups(db):
+    """
+    집계 테이블과 원본 데이터의 불일치 목록을 반환합니다.
+    [(테이블명, 기간, 카테고리, 원본 합계/건수, 집계 합계/건수), ...]
+    """
+    drifts = []
+    for model, (rollup_model, _, _, _) in ROLLUP_SPECS.items():
+        expected = {(str(p), c): (t, n) for p, c, t, n in db.execute(_expected_rows(model)).all()}
+        actual = {
+            (str(p), c): (t, n)
+            for p, c, t, n in db.execute(
+                select(rollup_model.period, rollup_model.category, rollup_model.total, rollup_model.count)
+            ).all()
+        }
+        for key in sorted(set(expected) | set(actual)):
+            exp_total, exp_count = expected.get(key, (0, 0))
+            act_total, act_count = actual.get(key, (0, 0))
+            if exp_count != act_count or abs(exp_total - act_total) > DRIFT_TOLERANCE:
+                drifts.append((rollup_model.__tablename__, key[0], key[1], (exp_total, exp_count), (act_total, act_count)))
+    return drifts
+
+
+def ensure_rollups(db):
+    """
+    시작 시 집계 테이블의 건수가 원본과 다르면(처음 배포 등) 해당 집계를 다시 계산합니다.
+    """
+    stale = []
+    for model, (rollup_model, date_attr, _, _) in ROLLUP_SPECS.items():
+        source_count = sum(
+            db.execute(select(func.count()).select_from(source).filter(getattr(source, date_attr).is_not(None))).scalar()
+            for source in (model, ARCHIVE_MODELS.get(model)) if source is not None
+        )
+        rollup_count = db.execute(select(func.coalesce(func.sum(rollup_model.count), 0))).scalar()
+        if source_count != rollup_count:
+            stale.append(model)
+    if stale:
+        rebuild_rollups(db, stale)
+        db.commit()
+        print(f"[집계] {', '.join(m.__tablename__ for m in stale)} 집계 테이블을 다시 계산했습니다.")
@@ -0,0 +1,68 @@
+import numpy as np
+from sqlalchemy import select, func
+
+from app.core.models import LedgerDailyTotal, MonthlyBudget
+from app.core.periods import period_bounds, julian_day
+from app.service.ledger_export import period_range
+
+# --- 카테고리별 주기 추이 (기간 x 카테고리 행렬) ---
+# 일별 집계 테이블을 한 번 조회한 뒤, 날짜 -> 주기 매핑과 합산을 numpy 배열 연산으로 처리합니다.
+
+# 한 번에 조회할 수 있는 최대 주기 수 (10년)
+TREND_MAX_PERIODS = 120
+
+
+def build_trend_matrix(db, start_period: str, end_period: str, default_budget: float) -> dict:
+    """
+    start_period ~ end_period 주기별 카테고리 지출 합계 행렬과 예산을 반환합니다.
+    matrix[i][j] = periods[i] 주기의 categories[j] 합계 (카테고리는 전체 합계가 큰 순서)
+    """
+    periods = period_range(start_period, end_period)
+    if len(periods) > TREND_MAX_PERIODS:
+        raise ValueError(f"한 번에 최대 {TREND_MAX_PERIODS}개월까지 조회할 수 있습니다.")
+    start_date, end_date = period_bounds(periods[0])[0], period_bounds(periods[-1])[1]
+
+    # 날짜는 julianday(실수)로 받아 문자열 -> date 변환 없이 바로 배열로 만듭니다.
+    # 행 수가 많으므로 ORM 결과 처리를 거치지 않고 커넥션에서 바로 읽습니다.
+    rows = db.connection().execute(
+        select(func.julianday(LedgerDailyTotal.period), LedgerDailyTotal.category, LedgerDailyTotal.total)
+        .filter(LedgerDailyTotal.period.between(start_date, end_date))
+    ).all()
+    budget_rows = dict(db.execute(
+        select(MonthlyBudget.month, MonthlyBudget.amount).filter(MonthlyBudget.month.in_(periods))
+    ).all())
+
+    if rows:
+        days, category_values, totals = zip(*rows)
+        days = np.array(days, dtype=float)
+        totals = np.array(totals, dtype=float)
+        # 각 날짜가 속한 주기 = 시작일 목록에서 해당 날짜 이하인 마지막 위치
+        starts = np.array([julian_day(period_bounds(p)[0]) for p in periods], dtype=float)
+        period_index = np.searchsorted(starts, days, side="right") - 1
+        # 카테고리 -> 열 번호 (등장 순서)
+        columns = {category: i for i, category in enumerate(dict.fromkeys(category_values))}
+        category_index = np.fromiter(map(columns.__getitem__, category_values), dtype=np.intp, count=len(category_values))
+        categories = np.array(list(columns), dtype=object)
+
+        matrix = np.zeros((len(periods), len(categories)))
+        np.add.at(matrix, (period_index, category_index), totals)
+
+        # 전체 합계가 큰 카테고리부터
+        order = np.argsort(-matrix.sum(axis=0), kind="stable")
+        categories, matrix = categories[order], matrix[:, order]
+    else:
+        categories, matrix = np.array([], dtype=object), np.zeros((len(periods), 0))
+
+    budgets = np.array([budget_rows.get(p, default_budget) for p in periods], dtype=float)
+    period_totals = matrix.sum(axis=1)
+    usage = np.divide(period_totals * 100, budgets, out=np.zeros_like(period_totals), where=budgets > 0)
+
+    return {
+        "periods": periods,
+        "categories": categories.tolist(),
+        "matrix": matrix.tolist(),
+        "period_totals": period_totals.tolist(),
+        "category_totals": matrix.sum(axis=0).tolist(),
+        "budgets": budgets.tolist(),
+        "usage_percentage": usage.round(1).tolist(),
+    }
@@ -0,0 +1,417 @@
+import os
+import hashlib
+import tempfile
+
+from fastapi import UploadFile, HTTPException, Request
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from starlette.datastructures import FormData, Headers
+import python_multipart
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import parse_options_header
+
+# --- 업로드 파일 저장 ---
+# 업로드 경로(UPLOAD_ROUTES)의 multipart 본문은 요청 스트림(request.stream())을 python-multipart 로 직접 파싱해,
+# 파일 부분을 도착하는 대로 대상 폴더의 임시 파일(.part)에 씁니다. (Starlette 기본 파서처럼 먼저 임시 파일에 받았다가 다시 복사하지 않음)
+# 완료되면 최종 이름으로 바꿉니다. 쓰기는 스레드에서 실행되므로 큰 PDF 를 받는 동안에도 다른 요청이 멈추지 않고,
+# 업로드당 메모리는 청크 크기로 일정합니다.
+# - 크기 제한: 종류별 최대 크기 (Content-Length 로 본문을 읽기 전에 먼저 거절하고, Content-Length 가 없는
+#   chunked 요청도 받는 중에 제한을 넘는 순간 413 으로 거절)
+# - 형식 확인: 파일 이름이 아닌 앞부분 바이트(매직 넘버)로 판별해, 허용되지 않으면 첫 청크에서 415 로 거절합니다.
+# - 내용 해시: 받으면서 SHA-256 을 함께 계산합니다. (같은 파일을 다시 올렸는지 확인하는 데 사용)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# 형식 판별에 필요한 앞부분 바이트 수
+SNIFF_BYTES = 16
+_MB = 1024 * 1024
+
+# 종류 -> (저장 폴더, URL 접두사, 최대 크기, 허용 형식)
+UPLOAD_KINDS = {
+    "diary": (
+        "static/diary", "/static/diary/",
+        int(os.getenv("DIARY_UPLOAD_MAX_MB", "20")) * _MB,
+        {"image/jpeg", "image/png", "image/gif", "image/webp", "image/heic"},
+    ),
+    "insurance": (
+        "static/uploads", "/static/uploads/",
+        int(os.getenv("INSURANCE_UPLOAD_MAX_MB", "100")) * _MB,
+        {"application/pdf", "image/jpeg", "image/png", "image/gif", "image/webp", "image/heic",
+         "application/x-ole-storage", "application/zip"},
+    ),
+}
+
+# 업로드를 받는 경로 -> 종류 (본문을 읽기 전 Content-Length 확인용)
+UPLOAD_ROUTES = {
+    "/diary/save": "diary",
+    "/insurance/add": "insurance",
+    "/insurance/update": "insurance",
+}
+# 파일 외 폼 필드와 multipart 경계 문자열에 허용하는 여유분
+FORM_OVERHEAD_BYTES = 1 * _MB
+
+# 한 컨테이너 형식을 여러 문서 형식이 쓰는 경우(한글/오피스) 파일 이름의 확장자를 이 목록 안에서만 받아들입니다.
+CONTAINER_EXTENSIONS = {
+    "application/x-ole-storage": {"hwp", "doc", "xls", "ppt"},
+    "application/zip": {"hwpx", "docx", "xlsx", "pptx", "zip"},
+}
+
+
+class UploadRejected(ValueError):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def sniff_content_type(head: bytes):
+    """
+    파일 앞부분으로 (MIME 형식, 확장자)를 판별합니다. 모르는 형식이면 (None, None)
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg", "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png", "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif", "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"heic", b"heix", b"mif1", b"msf1", b"heif"):
+        return "image/heic", "heic"
+    if head.startswith(b"%PDF-"):
+        return "application/pdf", "pdf"
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return "application/x-ole-storage", None
+    if head.startswith(b"PK\x03\x04"):
+        return "application/zip", None
+    return None, None
+
+
+def upload_limit_for_path(path: str):
+    """
+    업로드 경로의 요청 본문 최대 크기 (업로드 경로가 아니면 None)
+    """
+    kind = UPLOAD_ROUTES.get(path)
+    if kind is None:
+        return None
+    return UPLOAD_KINDS[kind][2] + FORM_OVERHEAD_BYTES
+
+
+class ReceivedUpload:
+    """
+    대상 폴더의 임시 파일로 받은 업로드. commit() 으로 최종 이름을 붙이거나 discard() 로 버립니다.
+    """
+    def __init__(self, kind: str, temp_path: str, size: int, content_type: str, extension: str, sha256: str):
+        self.kind = kind
+        self.temp_path = temp_path
+        self.size = size
+        self.content_type = content_type
+        self.extension = extension
+        self.sha256 = sha256
+
+    def commit(self, base_name: str) -> str:
+        """
+        "{base_name}.{확장자}" 로 이름을 바꾸고 URL 을 반환합니다. (같은 폴더 안이므로 원자적)
+        """
+        directory, url_prefix, _, _ = UPLOAD_KINDS[self.kind]
+        filename = f"{base_name}.{self.extension}"
+        os.replace(self.temp_path, os.path.join(directory, filename))
+        self.temp_path = None
+        return url_prefix + filename
+
+    def discard(self):
+        if self.temp_path:
+            try:
+                os.remove(self.temp_path)
+            except OSError:
+                pass
+            self.temp_path = None
+
+
+class _UploadSink:
+    """
+    업로드 한 개를 대상 폴더의 임시 파일로 받습니다. write() 로 받은 청크마다 형식/크기를 확인하고 해시를 계산합니다.
+    (write/finish 는 파일 입출력을 하므로 스레드에서 호출)
+    """
+    def __init__(self, kind: str, filename: str):
+        directory, _, self.max_bytes, self.allowed = UPLOAD_KINDS[kind]
+        self.kind = kind
+        self.filename = filename
+        self.head = b""
+        self.content_type = self.extension = None
+        self.size = 0
+        self.digest = hashlib.sha256()
+        os.makedirs(directory, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+        self.file = os.fdopen(fd, "w+b")
+
+    def _check_type(self):
+        content_type, extension = sniff_content_type(self.head)
+        if content_type in CONTAINER_EXTENSIONS:
+            name_ext = os.path.splitext(self.filename or "")[1].lstrip(".").lower()
+            extension = name_ext if name_ext in CONTAINER_EXTENSIONS[content_type] else None
+        if content_type not in self.allowed or extension is None:
+            raise UploadRejected("지원하지 않는 파일 형식입니다.", status_code=415)
+        self.content_type, self.extension = content_type, extension
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadRejected(f"파일이 너무 큽니다. (최대 {self.max_bytes // _MB}MB)", status_code=413)
+        if self.content_type is None:
+            self.head += data[:SNIFF_BYTES]
+            if len(self.head) >= SNIFF_BYTES:
+                self._check_type()
+        self.digest.update(data)
+        self.file.write(data)
+
+    def finish(self) -> "ReceivedUpload":
+        if self.size == 0:
+            raise UploadRejected("빈 파일은 올릴 수 없습니다.")
+        if self.content_type is None:
+            self._check_type()
+        self.file.close()
+        return ReceivedUpload(self.kind, self.temp_path, self.size, self.content_type, self.extension, self.digest.hexdigest())
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+
+def _copy_to_temp(source, filename: str, kind: str):
+    # 스트리밍으로 받지 않은 UploadFile(업로드 경로가 아닌 곳에서 받은 파일)용: 한 번 더 복사합니다.
+    source.seek(0)
+    sink = _UploadSink(kind, filename)
+    try:
+        for chunk in iter(lambda: source.read(UPLOAD_CHUNK_SIZE), b""):
+            sink.write(chunk)
+        return sink.finish()
+    except BaseException:
+        sink.discard()
+        raise
+
+
+class StreamedUploadFile(StarletteUploadFile):
+    """
+    요청 스트림에서 대상 폴더의 임시 파일로 바로 받은 업로드 파일. (receive_upload 가 복사 없이 그대로 사용)
+    """
+    def __init__(self, sink: _UploadSink, headers):
+        super().__init__(file=sink.file, size=0, filename=sink.filename, headers=headers)
+        self.sink = sink
+        self.received = None
+
+    async def write(self, data: bytes) -> None:
+        await run_in_threadpool(self.sink.write, data)
+        self.size += len(data)
+
+    async def close(self) -> None:
+        # 요청이 끝날 때 호출됩니다. receive_upload 로 가져가지 않은 파일(예: 처리 전에 거절된 요청)은 지웁니다.
+        if self.received is not None:
+            self.received.discard()
+            self.received = None
+        self.file.close()
+
+
+class _MultipartPart:
+    """
+    받고 있는 multipart 부분 하나 (헤더, 필드 이름, 파일이면 받을 곳)
+    """
+    def __init__(self):
+        self.raw_headers = []
+        self.header_field = b""
+        self.header_value = b""
+        self.name = None
+        self.file = None
+        self.data = bytearray()
+
+
+class StreamingFormParser:
+    """
+    업로드 경로의 multipart 본문을 request.stream() 에서 python-multipart 로 직접 파싱합니다.
+    파일 부분은 StreamedUploadFile(대상 폴더의 .part 파일)로, 나머지 필드는 문자열로 받아 FormData 를 만듭니다.
+    (Starlette 의 MultiPartParser 내부 구현에 기대지 않고 공개 API 만 사용)
+    python-multipart 콜백은 동기 함수이므로 받은 데이터를 모아 두었다가, 청크마다 파일 쓰기를 스레드에서 실행합니다.
+    """
+    def __init__(self, headers, stream, kind: str, max_files: int = 1, max_fields: int = 1000,
+                 max_part_size: int = 1024 * 1024):
+        self.headers = headers
+        self.stream = stream
+        self.kind = kind
+        self.max_files = max_files
+        self.max_fields = max_fields
+        self.max_part_size = max_part_size
+        self.charset = "utf-8"
+        self.items = []
+        self.files = []
+        self.fields = 0
+        self.part = None
+        self._pending_writes = []
+
+    # --- python-multipart 콜백 ---
+    def _on_part_begin(self):
+        self.part = _MultipartPart()
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self.part.header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self.part.header_value += data[start:end]
+
+    def _on_header_end(self):
+        part = self.part
+        part.raw_headers.append((part.header_field.lower(), part.header_value))
+        part.header_field = part.header_value = b""
+
+    def _on_headers_finished(self):
+        part = self.part
+        disposition = dict(part.raw_headers).get(b"content-disposition", b"")
+        _, options = parse_options_header(disposition)
+        if b"name" not in options:
+            raise UploadRejected('Content-Disposition 헤더에 "name" 이 필요합니다.')
+        part.name = self._decode(options[b"name"])
+        if b"filename" not in options:
+            self.fields += 1
+            if self.fields > self.max_fields:
+                raise UploadRejected(f"폼 필드가 너무 많습니다. (최대 {self.max_fields}개)")
+            return
+        filename = self._decode(options[b"filename"])
+        if not filename:
+            # 파일을 고르지 않은 파일 필드: 빈 UploadFile 로 넘깁니다. (라우트에서 file.filename 으로 확인)
+            part.file = StarletteUploadFile(file=tempfile.SpooledTemporaryFile(max_size=self.max_part_size),
+                                            size=0, filename=filename, headers=Headers(raw=part.raw_headers))
+            return
+        if len(self.files) >= self.max_files:
+            raise UploadRejected(f"파일이 너무 많습니다. (최대 {self.max_files}개)")
+        part.file = StreamedUploadFile(_UploadSink(self.kind, filename), Headers(raw=part.raw_headers))
+        self.files.append(part.file)
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        part = self.part
+        if part.file is not None:
+            self._pending_writes.append((part.file, data[start:end]))
+            return
+        part.data += data[start:end]
+        if len(part.data) > self.max_part_size:
+            raise UploadRejected(f"폼 필드가 너무 큽니다. (최대 {self.max_part_size // 1024}KB)")
+
+    def _on_part_end(self):
+        part = self.part
+        self.items.append((part.name, part.file if part.file is not None else self._decode(bytes(part.data))))
+        self.part = None
+
+    def _decode(self, value: bytes) -> str:
+        try:
+            return value.decode(self.charset)
+        except UnicodeDecodeError:
+            return value.decode("latin-1")
+
+    # --- 파싱 ---
+    async def _flush(self):
+        writes, self._pending_writes = self._pending_writes, []
+        for upload, data in writes:
+            if isinstance(upload, StreamedUploadFile):
+                await upload.write(data)
+            else:
+                if upload.size + len(data) > self.max_part_size:
+                    raise UploadRejected(f"폼 필드가 너무 큽니다. (최대 {self.max_part_size // 1024}KB)")
+                await upload.write(data)
+
+    async def parse(self) -> FormData:
+        """
+        본문 전체를 읽어 FormData 를 반환합니다. 실패하면 받던 파일을 모두 지우고 UploadRejected 를 발생시킵니다.
+        """
+        _, params = parse_options_header(self.headers.get("Content-Type", ""))
+        charset = params.get(b"charset")
+        if charset:
+            self.charset = charset.decode("latin-1")
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise UploadRejected("multipart 경계(boundary)가 없습니다.")
+
+        parser = python_multipart.MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+        try:
+            try:
+                async for chunk in self.stream:
+                    parser.write(chunk)
+                    await self._flush()
+                parser.finalize()
+            except MultipartParseError:
+                raise UploadRejected("multipart 본문 형식이 잘못되었습니다.")
+            for upload in self.files:
+                upload.received = await run_in_threadpool(upload.sink.finish)
+            for _, value in self.items:
+                if isinstance(value, StarletteUploadFile) and not isinstance(value, StreamedUploadFile):
+                    await value.seek(0)
+            return FormData(self.items)
+        except BaseException:
+            for upload in self.files:
+                upload.sink.discard()
+            for _, value in self.items:
+                if isinstance(value, StarletteUploadFile) and not isinstance(value, StreamedUploadFile):
+                    await value.close()
+            raise
+
+
+class UploadRequest(Request):
+    """
+    업로드 경로의 multipart 본문을 StreamingFormParser 로 파싱하는 Request
+    FastAPI 는 폼 본문을 await request.form() 으로 읽으므로, 이 경로에서는 form() 이 스트리밍 파서의 결과를 돌려줍니다.
+    """
+    _upload_form = None
+
+    def form(self, *, max_files=1000, max_fields=1000, max_part_size=1024 * 1024):
+        kind = UPLOAD_ROUTES.get(self.url.path)
+        content_type, _ = parse_options_header(self.headers.get("Content-Type", ""))
+        if kind is None or content_type != b"multipart/form-data":
+            return super().form(max_files=max_files, max_fields=max_fields, max_part_size=max_part_size)
+        return self._streamed_form(kind, max_fields, max_part_size)
+
+    async def _streamed_form(self, kind: str, max_fields: int, max_part_size: int) -> FormData:
+        if self._upload_form is None:
+            # 업로드 경로는 파일 필드가 하나뿐이므로 파일 수를 1개로 제한합니다. (종류별 최대 크기가 요청당 한도가 되도록)
+            parser = StreamingFormParser(
+                self.headers, self.stream(), kind, max_files=1, max_fields=max_fields, max_part_size=max_part_size
+            )
+            try:
+                self._upload_form = await parser.parse()
+            except UploadRejected as e:
+                raise HTTPException(status_code=e.status_code, detail=str(e))
+        return self._upload_form
+
+
+class UploadRoute(APIRoute):
+    """
+    업로드를 받는 라우터에 쓰는 route_class. 요청을 UploadRequest 로 바꿔 파일을 스트리밍으로 받습니다.
+    """
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def upload_route_handler(request: Request):
+            return await handler(UploadRequest(request.scope, request.receive))
+        return upload_route_handler
+
+
+async def receive_upload(upload: UploadFile, kind: str) -> ReceivedUpload:
+    """
+    업로드 파일을 대상 폴더의 임시 파일로 받은 ReceivedUpload 를 반환합니다.
+    UploadRoute 로 받은 파일은 요청을 받으면서 이미 확인이 끝났으므로 그대로 반환하고,
+    그 밖의 UploadFile 은 형식/크기를 확인하며 임시 파일로 복사합니다. (스레드에서 실행)
+    허용되지 않으면 UploadRejected (status_code 413: 너무 큼, 415: 형식)
+    """
+    if isinstance(upload, StreamedUploadFile) and upload.sink.kind == kind:
+        # 요청을 받으면서 이미 형식/크기 확인과 해시 계산을 마친 파일
+        received, upload.received = upload.received, None
+        return received
+    try:
+        return await run_in_threadpool(_copy_to_temp, upload.file, upload.filename, kind)
+    finally:
+        await upload.close()
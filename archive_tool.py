@@ -0,0 +1,62 @@
+import sys
+
+from app.core.database import SessionLocal, Base, engine, ensure_columns, ensure_indexes
+from app.service.archive import archive_closed_periods, archive_status, ARCHIVE_AFTER_MONTHS
+
+# --- 사용법 ---
+# python archive_tool.py status            : 보관된 기간과 행 수를 보여줍니다.
+# python archive_tool.py run [개월] [--dry-run]
+#                                          : 마감된 지 N개월(기본 ARCHIVE_AFTER_MONTHS)이 지난 기간의 지출을 보관 테이블로 옮깁니다.
+#                                            --dry-run 이면 옮길 대상만 보여줍니다.
+# 보관해도 합계(집계 테이블)는 바뀌지 않으며, 화면/엑셀 내보내기는 보관된 기간을 그대로 보여줍니다.
+# 실행 중인 서버의 캐시는 최대 VIEW_CACHE_TTL(기본 300초) 뒤에 반영됩니다. (서버의 매월 1일 작업은 즉시 반영)
+
+
+def status():
+    db = SessionLocal()
+    try:
+        rows = archive_status(db)
+        for table_name, period_count, row_count, first_period, last_period in rows:
+            print(f"{table_name}: {period_count}개 기간 ({first_period} ~ {last_period}), {row_count or 0:,}건")
+        if not rows:
+            print("보관된 기간이 없습니다.")
+        return 0
+    finally:
+        db.close()
+
+
+def run(months: int, dry_run: bool):
+    db = SessionLocal()
+    try:
+        moved = archive_closed_periods(db, months=months, dry_run=dry_run)
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        action = "보관 대상" if dry_run else "보관 완료"
+        for table_name, counts in moved.items():
+            print(f"[{action}] {table_name}: {min(counts)} ~ {max(counts)} {len(counts)}개 기간, {sum(counts.values()):,}건")
+        if not moved:
+            print(f"{months}개월이 지난 보관 대상이 없습니다.")
+        return 0
+    except Exception as e:
+        print(f"보관 중 오류 발생: {e}")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    command = args[0] if args else "status"
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    if command == "run":
+        sys.exit(run(int(args[1]) if len(args) > 1 else ARCHIVE_AFTER_MONTHS, "--dry-run" in sys.argv))
+    elif command == "status":
+        sys.exit(status())
+    else:
+        print("사용법: python archive_tool.py [status|run [개월] [--dry-run]]")
+        sys.exit(2)
@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import date, timedelta
+
+from common import use_bench_database, timed_ms
+
+# --- 사용법 ---
+# python bench/archive_bench.py [--ledger 400000] [--expenses 120000] [--months 24]
+#   10년치 가계부/지출을 만들어 두고, 보관(아카이브) 전후의 hot 테이블 크기와 현재 주기 조회/내보내기/VACUUM 시간을 비교합니다.
+#   보관된 주기를 다시 읽은 결과가 보관 전과 같은지, 합계 테이블이 어긋나지 않았는지도 확인합니다.
+#   DB 는 BENCH_DIR(기본: 임시 폴더/house_manage_bench)의 archive.db 를 매번 새로 만듭니다.
+
+TODAY = date(2026, 10, 17)
+CATEGORIES = ["식비", "교통", "쇼핑", "생활", "의료"]
+
+
+def seed(engine, ledger_rows: int, expense_rows: int):
+    from app.core.models import LedgerExpense, Expense
+    from app.core.periods import period_for
+
+    random.seed(1)
+    start = TODAY.replace(year=TODAY.year - 10)
+    days = (TODAY - start).days
+    ledger, expenses = [], []
+    for i in range(ledger_rows):
+        d = start + timedelta(days=random.randrange(days))
+        ledger.append({"expense_date": d, "period": period_for(d), "category": random.choice(CATEGORIES),
+                       "item": f"item {i}", "amount": random.randint(1, 500) * 100})
+    for i in range(expense_rows):
+        d = start + timedelta(days=random.randrange(days))
+        expenses.append({"expense_type": random.choice(["고정적", "변동적"]), "expense_date": d,
+                         "category": random.choice(CATEGORIES), "item": f"x{i}", "amount": 1000.0, "notes": None})
+    with engine.begin() as conn:
+        conn.execute(LedgerExpense.__table__.insert(), ledger)
+        conn.execute(Expense.__table__.insert(), expenses)
+
+
+def table_sizes(engine) -> dict:
+    """
+    {테이블/인덱스 이름: 바이트} (dbstat 가상 테이블 사용)
+    """
+    with engine.connect() as conn:
+        return dict(conn.exec_driver_sql("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").all())
+
+
+def vacuum(engine):
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+
+
+def measure(label: str, engine, db_path: str):
+    from sqlalchemy import text
+    from app.core.database import SessionLocal
+    from app.core.periods import period_for
+    from app.service import archive
+    from app.service.archive import ledger_rows_for_period
+    from app.service.ledger_export import export_ledger_to_tempfile
+    from app.service.ledger_periods import verify_periods
+    from app.api.routers.expenses import get_expense_page
+
+    archive.archive_cache.clear()
+    vacuum(engine)
+    sizes = table_sizes(engine)
+    hot_ledger = sum(v for k, v in sizes.items() if k.startswith(("ledger_expenses", "ix_ledger_expenses")) and "archive" not in k)
+    hot_expenses = sum(v for k, v in sizes.items() if k.startswith(("expenses", "ix_expenses")) and "archive" not in k)
+    current = period_for(TODAY)
+    db = SessionLocal()
+    try:
+        rows = db.execute(text("SELECT COUNT(*) FROM ledger_expenses")).scalar()
+        results = {
+            "현재 주기 조회": timed_ms(lambda: ledger_rows_for_period(db, current), 50),
+            "현재 주기 엑셀": timed_ms(lambda: os.remove(export_ledger_to_tempfile(db, current, current)), 5),
+            "지출 첫 페이지": timed_ms(lambda: get_expense_page(db, None, 50), 50),
+            "주기 키 검사(전체)": timed_ms(lambda: verify_periods(db), 3),
+            "VACUUM": timed_ms(lambda: vacuum(engine), 2),
+        }
+    finally:
+        db.close()
+    print(f"[{label}] ledger_expenses {rows}건, hot 가계부 {hot_ledger / 1e6:.1f}MB, hot 지출 {hot_expenses / 1e6:.1f}MB, "
+          f"DB 파일 {os.path.getsize(db_path) / 1e6:.1f}MB")
+    for name, ms in results.items():
+        print(f"  {name:<14} {ms:8.2f}ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ledger", type=int, default=400_000)
+    parser.add_argument("--expenses", type=int, default=120_000)
+    parser.add_argument("--months", type=int, default=24)
+    args = parser.parse_args()
+
+    db_path = use_bench_database("archive", fresh=True)
+    from app.core.database import engine, Base, SessionLocal, ensure_columns, ensure_indexes
+    from app.service.archive import archive_closed_periods, ledger_rows_for_period
+    from app.service.rollups import rebuild_rollups, verify_rollups
+
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    print(f"데이터 생성: 가계부 {args.ledger}건, 지출 {args.expenses}건 (10년)")
+    seed(engine, args.ledger, args.expenses)
+    db = SessionLocal()
+    rebuild_rollups(db)
+    db.commit()
+    db.close()
+
+    old_period = f"{TODAY.year - 8}-03"
+    db = SessionLocal()
+    before_rows = ledger_rows_for_period(db, old_period)
+    db.close()
+    before = measure("보관 전", engine, db_path)
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    moved = archive_closed_periods(db, months=args.months, today=TODAY)
+    db.commit()
+    elapsed = time.perf_counter() - start
+    drift = verify_rollups(db)
+    after_rows = ledger_rows_for_period(db, old_period)
+    db.close()
+    print(f"보관: {elapsed:.2f}s, " + ", ".join(f"{t} {sum(c.values())}건" for t, c in moved.items()) + f", 합계 불일치 {len(drift)}건")
+
+    after = measure("보관 후", engine, db_path)
+    print("속도 변화:")
+    for name in before:
+        print(f"  {name:<14} {before[name]:8.2f}ms -> {after[name]:8.2f}ms")
+
+    strip = lambda rows: sorted(({k: v for k, v in r.items() if k != "archived"} for r in rows), key=lambda r: r["id"])
+    same = strip(before_rows) == strip(after_rows) and all(r["archived"] for r in after_rows)
+    print(f"보관된 주기({old_period}, {len(after_rows)}건)를 보관 전과 같게 읽음: {same}")
+    return 0 if same and not drift else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+import tempfile
+
+# --- 벤치마크 공통 설정 ---
+# 벤치마크는 실제 DB(data/sql_app.db)를 건드리지 않도록 임시 폴더의 전용 SQLite 파일을 사용합니다.
+# app 모듈은 가져올 때 DATABASE_URL 로 엔진을 만들므로, use_bench_database() 를 app 을 가져오기 전에 호출해야 합니다.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.getenv("BENCH_DIR", os.path.join(tempfile.gettempdir(), "house_manage_bench"))
+
+
+def use_bench_database(name: str, fresh: bool = False) -> str:
+    """
+    벤치마크용 DB 파일 경로를 DATABASE_URL 로 지정하고 경로를 반환합니다. fresh 이면 기존 파일을 지웁니다.
+    (정적 파일/템플릿 경로가 맞도록 작업 폴더도 저장소 루트로 바꿈)
+    """
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    path = os.path.join(BENCH_DIR, f"{name}.db")
+    if fresh:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    return path
+
+
+def timed_ms(fn, repeat: int = 20) -> float:
+    """
+    한 번 미리 실행한 뒤 repeat 번 실행한 평균 시간(ms)
+    """
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
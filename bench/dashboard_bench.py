@@ -0,0 +1,148 @@
+import sys
+import random
+import argparse
+import tracemalloc
+from datetime import date, timedelta
+
+from common import use_bench_database, timed_ms
+
+# --- 사용법 ---
+# python bench/dashboard_bench.py [--rows 10000 100000]
+#   수입/지출을 각각 rows 건씩 만든 DB 마다 대시보드 비용을 잽니다.
+#   1) 예전 방식(수입/지출 전체를 읽어 파이썬에서 합계) vs build_dashboard_view (집계 테이블 + 최근 항목만)
+#      - 캐시 없이 매번 계산한 시간과 tracemalloc 최대 메모리
+#   2) GET /dashboard, /dashboard/api/data 응답 시간 (캐시를 비운 첫 요청 / 캐시된 요청)
+#   3) "더 보기" 깊은 페이지: before_id 키셋 vs 같은 위치의 OFFSET 조회
+#   DB 는 BENCH_DIR(기본: 임시 폴더/house_manage_bench)의 dashboard_{rows}.db 를 매번 새로 만듭니다.
+
+TODAY = date(2026, 10, 17)
+CATEGORIES = ["식비", "교통", "쇼핑", "생활", "의료"]
+
+
+def seed(engine, rows: int):
+    from app.core.models import Income, Expense
+
+    random.seed(rows)
+    start = TODAY.replace(year=TODAY.year - 5)
+    days = (TODAY - start).days
+    incomes, expenses = [], []
+    for i in range(rows):
+        d = start + timedelta(days=random.randrange(days))
+        incomes.append({"income_date": d, "income_type": random.choice(["급여", "부수입", "이자"]),
+                        "amount": random.randint(1, 500) * 1000.0})
+        expenses.append({"expense_type": random.choice(["고정적", "변동적"]), "expense_date": d,
+                         "category": random.choice(CATEGORIES), "item": f"item {i}",
+                         "amount": random.randint(1, 500) * 100.0, "notes": None})
+    with engine.begin() as conn:
+        conn.execute(Income.__table__.insert(), incomes)
+        conn.execute(Expense.__table__.insert(), expenses)
+
+
+def legacy_dashboard_view(db) -> dict:
+    """
+    예전 대시보드 방식: 수입/지출 전체를 읽어 파이썬에서 합계를 내고 목록도 전부 넘김
+    """
+    from app.core.models import Income, Expense, Assets, Task, row_to_dict
+
+    incomes = db.query(Income).all()
+    expenses = db.query(Expense).all()
+    assets = db.query(Assets).all()
+    tasks = db.query(Task).order_by(Task.due_date.asc()).all()
+    return {
+        "incomes": [row_to_dict(i) for i in incomes],
+        "expenses": [row_to_dict(e) for e in expenses],
+        "total_income_sum": sum(i.amount for i in incomes),
+        "total_expense_sum": sum(e.amount for e in expenses),
+        "assets_data": [row_to_dict(a) for a in assets],
+        "tasks_data": [row_to_dict(t) for t in tasks],
+    }
+
+
+def peak_mb(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def deep_page_ms(db, rows: int, limit: int = 10):
+    """
+    목록 끝 근처(앞에서 rows-limit*2 번째) 페이지를 키셋/OFFSET 으로 가져온 시간
+    """
+    from app.core.models import Income
+    from app.api.routers.dashboard import get_recent_rows
+
+    offset = rows - limit * 2
+    max_id = db.query(Income.id).order_by(Income.id.desc()).limit(1).scalar()
+    before_id = max_id - offset + 1
+    keyset = lambda: get_recent_rows(db, Income, before_id, limit)
+    by_offset = lambda: db.query(Income).order_by(Income.id.desc()).offset(offset).limit(limit + 1).all()
+    assert [r.id for r in keyset()[0]] == [r.id for r in by_offset()[:limit]]
+    return timed_ms(keyset, 50), timed_ms(by_offset, 50)
+
+
+def run(rows: int):
+    use_bench_database(f"dashboard_{rows}", fresh=True)
+    from fastapi.testclient import TestClient
+    from app.core.database import engine, Base, SessionLocal, ensure_columns, ensure_indexes
+    from app.core.cache import dashboard_cache
+    from app.core.dependencies import login_required
+    from app.api.routers.dashboard import build_dashboard_view
+    from app.service.rollups import rebuild_rollups
+    import main
+
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    seed(engine, rows)
+    db = SessionLocal()
+    rebuild_rollups(db)
+    db.commit()
+
+    try:
+        legacy = legacy_dashboard_view(db)
+        view = build_dashboard_view(db, TODAY)
+        same = (round(legacy["total_income_sum"], 2) == round(view["total_income_sum"], 2)
+                and round(legacy["total_expense_sum"], 2) == round(view["total_expense_sum"], 2))
+        del legacy
+
+        print(f"[수입/지출 각 {rows}건] 합계 일치: {same}")
+        repeat = 3 if rows > 20_000 else 10
+        for name, fn in (("예전 방식", lambda: legacy_dashboard_view(db)),
+                         ("build_dashboard_view", lambda: build_dashboard_view(db, TODAY))):
+            db.expire_all()
+            print(f"  {name:<22} {timed_ms(fn, repeat):9.2f}ms  최대 메모리 {peak_mb(fn):7.2f}MB")
+
+        keyset, by_offset = deep_page_ms(db, rows)
+        print(f"  깊은 페이지 (키셋)       {keyset:9.2f}ms")
+        print(f"  깊은 페이지 (OFFSET)     {by_offset:9.2f}ms")
+    finally:
+        db.close()
+
+    main.app.dependency_overrides[login_required] = lambda: None
+    with TestClient(main.app) as client:
+        for path in ("/dashboard", "/dashboard/api/data"):
+            def cold():
+                dashboard_cache.clear()
+                assert client.get(path).status_code == 200
+            warm = lambda: client.get(path)
+            print(f"  GET {path:<20} 캐시 없음 {timed_ms(cold, 10):8.2f}ms, 캐시됨 {timed_ms(warm, 50):8.2f}ms")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+    # app 모듈은 처음 가져올 때의 DATABASE_URL 로 엔진을 만들므로, 크기마다 새 프로세스에서 실행합니다.
+    if len(args.rows) > 1:
+        import subprocess
+        codes = [subprocess.call([sys.executable, __file__, "--rows", str(rows)]) for rows in args.rows]
+        return max(codes)
+    return 0 if run(args.rows[0]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import sys
+import json
+import random
+import argparse
+from datetime import date, timedelta
+
+from common import use_bench_database, timed_ms
+
+# --- 사용법 ---
+# python bench/diary_search_bench.py [--entries 10000]
+#   하루 한 편씩 entries 편의 일기를 만들고 다음을 잽니다.
+#   1) 목록 페이지: 예전 OFFSET 조회(본문 전체) vs get_diary_entries 커서(본문 전체 / 요약) - 처음, 중간, 끝 근처
+#   2) 검색: search_diaries (FTS5 trigram + bm25 순위, 1~2글자는 LIKE) vs 같은 검색어의 LIKE 최신순 조회
+#      (드문 검색어는 LIKE 가 전체를 훑어야 하고, 대부분의 일기에 있는 검색어는 FTS 가 모든 결과의 순위를 매겨야 함)
+#   커서로 처음부터 끝까지 넘기며 빠지거나 겹치는 일기가 없는지, 드문 검색어의 결과 수가 LIKE 와 같은지도 확인합니다.
+#   DB 는 BENCH_DIR(기본: 임시 폴더/house_manage_bench)의 diary_search.db 를 매번 새로 만듭니다.
+
+FIRST_DAY = date(1995, 1, 1)
+WORDS = ("오늘 가족 바다 산책 아이 학교 회사 점심 저녁 주말 여행 공원 비 눈 햇살 커피 영화 생일 선물 병원 시장 "
+         "자전거 도서관 운동 요리 케이크 할머니 강아지 고양이 놀이터 수영장 박물관 동물원 기차 제주도 부산 강릉 "
+         "단풍 벚꽃 불꽃놀이 크리스마스 설날 추석 졸업식 발표회").split()
+JOSA = ["에", "에서", "과", "와", "를", "을", "이", "가", "는", "도", ""]
+QUERIES = ["캠핑카", "캠핑카 여행", "불꽃놀이", "제주도 강아지", "바다", "비"]
+# 이 건수 이하인 검색어는 결과를 끝까지 넘겨 LIKE 와 비교합니다.
+VERIFY_MAX_RESULTS = 1000
+
+
+def seed(engine, entries: int):
+    from app.core.models import Diary
+
+    random.seed(entries)
+    rows = []
+    for i in range(entries):
+        content = " ".join(random.choice(WORDS) + random.choice(JOSA) for _ in range(random.randint(80, 250)))
+        if i % 997 == 0:
+            content += " 특별한 캠핑카 여행"
+        rows.append({"diary_date": FIRST_DAY + timedelta(days=i), "title": None, "content": content,
+                     "image_url": None, "video_url": None})
+    with engine.begin() as conn:
+        conn.execute(Diary.__table__.insert(), rows)
+
+
+def offset_page(db, skip: int, limit: int = 10) -> str:
+    """
+    예전 목록 조회: OFFSET 으로 건너뛰고 본문 전체를 보냄
+    """
+    from app.core.models import Diary
+
+    diaries = db.query(Diary).order_by(Diary.diary_date.asc()).offset(skip).limit(limit).all()
+    return json.dumps([
+        {"id": d.id, "diary_date": str(d.diary_date), "content": d.content, "image_url": d.image_url, "video_url": d.video_url}
+        for d in diaries
+    ], ensure_ascii=False)
+
+
+def cursor_page(db, cursor, excerpt: bool) -> str:
+    from app.api.routers.diary import get_diary_entries
+
+    return json.dumps(get_diary_entries(db, cursor, "next", 10, excerpt=excerpt)[0], ensure_ascii=False)
+
+
+def walk_all(db, entries: int) -> bool:
+    from app.api.routers.diary import get_diary_entries, decode_diary_cursor
+
+    seen, cursor = [], None
+    while True:
+        page, _, next_cursor = get_diary_entries(db, cursor, "next", 50, excerpt=True)
+        seen.extend(entry["id"] for entry in page)
+        if next_cursor is None:
+            break
+        cursor = decode_diary_cursor(next_cursor)
+    return len(seen) == entries and len(set(seen)) == entries
+
+
+def like_count(db, query: str) -> int:
+    from sqlalchemy import text
+
+    terms = query.split()
+    clauses = " AND ".join(f"content LIKE :t{i}" for i in range(len(terms)))
+    return db.execute(text(f"SELECT COUNT(*) FROM diaries WHERE {clauses}"),
+                      {f"t{i}": f"%{term}%" for i, term in enumerate(terms)}).scalar()
+
+
+def search_count(db, query: str) -> int:
+    from app.service.diary_search import search_diaries
+
+    total, offset = 0, 0
+    while offset is not None:
+        result = search_diaries(db, query, offset, 50)
+        total += len(result["results"])
+        offset = result["next_offset"]
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=10_000)
+    args = parser.parse_args()
+    entries = args.entries
+
+    use_bench_database("diary_search", fresh=True)
+    from sqlalchemy import text
+    from app.core.database import engine, Base, SessionLocal, ensure_columns, ensure_indexes
+    from app.service.diary_search import ensure_diary_search, search_diaries, SEARCH_PAGE_SIZE
+
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    ensure_diary_search(engine)
+    seed(engine, entries)
+
+    db = SessionLocal()
+    ok = True
+    try:
+        print(f"[일기 {entries}편] 목록 10개 페이지")
+        for depth in (0, entries // 2, entries - 20):
+            cursor = (FIRST_DAY + timedelta(days=depth - 1), depth) if depth else None
+            old_ms = timed_ms(lambda: offset_page(db, depth), 30)
+            full_ms = timed_ms(lambda: cursor_page(db, cursor, False), 30)
+            excerpt_ms = timed_ms(lambda: cursor_page(db, cursor, True), 30)
+            old_kb = len(offset_page(db, depth).encode()) / 1024
+            excerpt_kb = len(cursor_page(db, cursor, True).encode()) / 1024
+            print(f"  위치 {depth:>6}: OFFSET {old_ms:6.2f}ms | 커서(전체) {full_ms:6.2f}ms | 커서(요약) {excerpt_ms:6.2f}ms"
+                  f" | 응답 {old_kb:6.1f}KB -> {excerpt_kb:5.1f}KB")
+        walked = walk_all(db, entries)
+        ok &= walked
+        print(f"  커서로 끝까지 넘김 (빠짐/겹침 없음): {walked}")
+
+        print("검색 (첫 페이지 20개)")
+        for query in QUERIES:
+            result = search_diaries(db, query)
+            terms = query.split()
+            clauses = " AND ".join(f"content LIKE :t{i}" for i in range(len(terms)))
+            params = {f"t{i}": f"%{term}%" for i, term in enumerate(terms)}
+            like = lambda: db.execute(
+                text(f"SELECT id FROM diaries WHERE {clauses} ORDER BY diary_date DESC LIMIT 21"), params
+            ).all()
+            expected = like_count(db, query)
+            # 결과가 적은 검색어는 모든 페이지를 넘겨 LIKE 와 건수를 비교합니다. (많으면 첫 페이지가 꽉 찼는지만 확인)
+            if expected <= VERIFY_MAX_RESULTS:
+                ok &= search_count(db, query) == expected
+            else:
+                ok &= len(result["results"]) == SEARCH_PAGE_SIZE and result["next_offset"] is not None
+            print(f"  {query!r:<16} {result['mode']:<5} 일치 {expected:>5}건 | "
+                  f"search_diaries {timed_ms(lambda: search_diaries(db, query), 10):7.2f}ms | "
+                  f"LIKE (최신순 21개) {timed_ms(like, 10):7.2f}ms")
+    finally:
+        db.close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
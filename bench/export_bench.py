@@ -0,0 +1,142 @@
+import io
+import os
+import sys
+import time
+import random
+import argparse
+import resource
+import subprocess
+import tracemalloc
+from datetime import timedelta
+
+from common import use_bench_database
+
+# --- 사용법 ---
+# python bench/export_bench.py [--rows 20000 200000] [--legacy]
+#   1년(12주기)에 rows 건의 가계부를 만들고 엑셀 내보내기(export_ledger_to_tempfile)의 시간과 메모리를 잽니다.
+#   - tracemalloc 최대 할당량과 프로세스 최대 RSS 증가량 (행 수가 10배가 되어도 거의 같아야 함)
+#   - 만든 파일의 요약 시트 건수 합계가 rows 와 같은지 확인
+#   --legacy 이면 예전 방식(전체 행을 ORM 으로 읽어 일반 워크북에 담아 메모리에서 저장)도 함께 잽니다.
+#   크기/방식마다 새 프로세스에서 실행하며, DB 는 BENCH_DIR 의 export_{rows}.db 를 한 번 만들어 다시 씁니다.
+
+START_PERIOD, END_PERIOD = "2024-01", "2024-12"
+CATEGORIES = ["식비", "교통", "통신", "쇼핑", "의료"]
+
+
+def seed(rows: int):
+    from app.core.database import engine, Base, ensure_columns, ensure_indexes
+    from app.core.models import LedgerExpense
+    from app.core.periods import period_bounds, period_for
+
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    with engine.connect() as conn:
+        if conn.exec_driver_sql("SELECT COUNT(*) FROM ledger_expenses").scalar() == rows:
+            return
+    random.seed(rows)
+    start, end = period_bounds(START_PERIOD)[0], period_bounds(END_PERIOD)[1]
+    days = (end - start).days + 1
+    batch = []
+    with engine.begin() as conn:
+        conn.execute(LedgerExpense.__table__.delete())
+        for i in range(rows):
+            d = start + timedelta(days=random.randrange(days))
+            batch.append({"expense_date": d, "period": period_for(d), "category": random.choice(CATEGORIES),
+                          "item": f"항목 {i}", "amount": float(random.randint(100, 100_000))})
+            if len(batch) == 10_000:
+                conn.execute(LedgerExpense.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(LedgerExpense.__table__.insert(), batch)
+
+
+def exported_rows(path: str) -> int:
+    import openpyxl
+    from app.service.ledger_export import SUMMARY_SHEET_TITLE
+
+    # 내보내기 임시 파일은 확장자가 .tmp 이므로 파일 객체로 엽니다.
+    with open(path, "rb") as f:
+        workbook = openpyxl.load_workbook(f, read_only=True)
+        try:
+            summary = workbook[SUMMARY_SHEET_TITLE]
+            return sum(row[3] for row in summary.iter_rows(min_row=2, max_row=13, values_only=True))
+        finally:
+            workbook.close()
+
+
+def legacy_export(db):
+    """
+    예전 내보내기: 전체 행을 ORM 으로 읽어 일반 워크북에 담고 메모리(BytesIO)에 저장
+    """
+    import openpyxl
+    from app.core.models import LedgerExpense
+
+    rows = (db.query(LedgerExpense)
+            .filter(LedgerExpense.period.between(START_PERIOD, END_PERIOD))
+            .order_by(LedgerExpense.expense_date.desc()).all())
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for e in rows:
+        sheet.append([e.expense_date.strftime("%Y-%m-%d"), e.category, e.item, e.amount])
+    out = io.BytesIO()
+    workbook.save(out)
+    return len(rows)
+
+
+def run(rows: int, mode: str):
+    use_bench_database(f"export_{rows}")
+    seed(rows)
+    from app.core.database import SessionLocal
+    from app.service.ledger_export import export_ledger_to_tempfile
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        if mode == "stream":
+            path = export_ledger_to_tempfile(db, START_PERIOD, END_PERIOD)
+        else:
+            count = legacy_export(db)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss_growth = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+
+    ok = True
+    if mode == "stream":
+        try:
+            size = os.path.getsize(path)
+            count = exported_rows(path)
+        finally:
+            os.remove(path)
+        ok = count == rows
+        extra = f", 파일 {size / 1e6:.1f}MB"
+    else:
+        extra = ""
+    label = "스트리밍" if mode == "stream" else "예전 방식"
+    print(f"[{rows}건] {label:<5} {elapsed:6.2f}s, tracemalloc 최대 {peak / 1e6:7.1f}MB, "
+          f"최대 RSS 증가 {rss_growth:7.1f}MB, 내보낸 행 {count}{extra}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[20_000, 200_000])
+    parser.add_argument("--legacy", action="store_true")
+    parser.add_argument("--mode", choices=["stream", "legacy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        return 0 if run(args.rows[0], args.mode) else 1
+    # 최대 RSS 는 프로세스 단위이므로 크기/방식마다 새 프로세스에서 잽니다.
+    modes = ["stream", "legacy"] if args.legacy else ["stream"]
+    codes = [
+        subprocess.call([sys.executable, __file__, "--rows", str(rows), "--mode", mode])
+        for rows in args.rows for mode in modes
+    ]
+    return max(codes)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import sys
+import time
+import asyncio
+import argparse
+import timeit
+
+from common import use_bench_database
+
+# --- 사용법 ---
+# python bench/metrics_bench.py [--requests 20000]
+#   /metrics 계측의 요청당 비용을 잽니다.
+#   1) 미들웨어가 요청마다 하는 일(처리 중 게이지 증감 + 카운터/히스토그램 기록)만 timeit 으로 반복
+#   2) 빈 라우트 하나짜리 앱을 ASGI 로 직접 호출해, MetricsMiddleware 를 붙이기 전/후의 요청당 시간 비교
+#      (같은 기록을 @app.middleware("http") 로 붙였을 때와도 비교)
+#   3) 라우트 수만큼 라벨이 쌓인 상태에서 /metrics 본문 생성(스크레이프) 시간
+
+
+def bookkeeping_us(iterations: int) -> float:
+    from app.core import metrics
+
+    def one_request():
+        metrics.REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        metrics.REQUESTS_IN_FLIGHT.dec()
+        metrics.observe_request("GET", "/bench/{item_id}", 200, time.perf_counter() - start)
+
+    return timeit.timeit(one_request, number=iterations) / iterations * 1e6
+
+
+def build_app(middleware: str):
+    from fastapi import FastAPI
+    from fastapi.responses import PlainTextResponse
+    from app.core import metrics
+
+    app = FastAPI()
+
+    @app.get("/bench/{item_id}")
+    def item(item_id: int):
+        return PlainTextResponse("ok")
+
+    if middleware == "asgi":
+        app.add_middleware(metrics.MetricsMiddleware)
+    elif middleware == "http":
+        @app.middleware("http")
+        async def metrics_http_middleware(request, call_next):
+            metrics.REQUESTS_IN_FLIGHT.inc()
+            start = time.perf_counter()
+            response = await call_next(request)
+            metrics.REQUESTS_IN_FLIGHT.dec()
+            route = request.scope.get("route")
+            metrics.observe_request(request.method, getattr(route, "path", metrics.UNMATCHED_ROUTE),
+                                    response.status_code, time.perf_counter() - start)
+            return response
+    return app
+
+
+async def asgi_per_request_us(app, requests: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/bench/1", "raw_path": b"/bench/1", "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def scrape_ms(routes: int) -> float:
+    from app.core import metrics
+
+    for i in range(routes):
+        metrics.observe_request("GET", f"/bench/route_{i}", 200, 0.01)
+    return timeit.timeit(metrics.render_metrics, number=50) / 50 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+    use_bench_database("metrics")
+
+    print(f"계측 기록만 (요청 1건당):     {bookkeeping_us(200_000):6.2f}us")
+    bare = asyncio.run(asgi_per_request_us(build_app("none"), args.requests))
+    timed = asyncio.run(asgi_per_request_us(build_app("asgi"), args.requests))
+    http = asyncio.run(asgi_per_request_us(build_app("http"), args.requests))
+    print(f"빈 라우트 ASGI 요청 (계측 없음):            {bare:6.1f}us")
+    print(f"빈 라우트 ASGI 요청 (MetricsMiddleware):     {timed:6.1f}us  (+{timed - bare:.1f}us)")
+    print(f"빈 라우트 ASGI 요청 (@app.middleware 로 계측): {http:6.1f}us  (+{http - bare:.1f}us)")
+    print(f"/metrics 본문 생성 (라우트 50개):  {scrape_ms(50):6.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import io
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import statistics
+import subprocess
+from datetime import date, timedelta
+
+from common import ROOT, BENCH_DIR, use_bench_database, percentile
+
+# --- 사용법 ---
+# python bench/upload_bench.py [--uploads 8] [--megapixels 12] [--port 8765] [--keep]
+#   uvicorn 서버를 따로 띄우고, 큰 사진 여러 장을 동시에 일기에 올리는 동안 다른 요청(/diary/api/list)의 응답 시간을 잽니다.
+#   - 업로드 전(기준)과 업로드 중의 p50/p95/최대 응답 시간, 업로드 전체/한 건 시간
+#   - 모든 업로드가 200 이고 일기마다 사진이 붙었는지 확인
+#   사진 파일이 저장소의 static/diary 에 쌓이지 않도록, 서버는 BENCH_DIR/upload_root 를 작업 폴더로 씁니다.
+#   (templates 만 저장소를 가리키고 static 은 새로 만듦, 끝나면 폴더를 지움. --keep 이면 남겨 둠)
+
+
+def serve(work_dir: str, port: int):
+    """
+    벤치마크용 서버 (로그인 없이 호출할 수 있도록 login_required 를 통과시킴)
+    """
+    os.chdir(work_dir)
+    sys.path.insert(0, ROOT)
+    import uvicorn
+    import main
+    from app.core.dependencies import login_required
+
+    main.app.dependency_overrides[login_required] = lambda: True
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def make_work_dir() -> str:
+    work_dir = os.path.join(BENCH_DIR, "upload_root")
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+    os.symlink(os.path.join(ROOT, "templates"), os.path.join(work_dir, "templates"))
+    return work_dir
+
+
+def make_photos(count: int, megapixels: int):
+    """
+    서로 내용 해시가 다른 JPEG count 장 (같은 사진에 뒤쪽 바이트만 다르게 붙임 - 디코더는 EOI 뒤를 무시)
+    """
+    from PIL import Image
+
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    size = (width, width * 3 // 4)
+    noise = Image.effect_noise(size, 40)
+    gradient = Image.linear_gradient("L").resize(size)
+    image = Image.merge("RGB", (noise, gradient, Image.blend(noise, gradient, 0.5)))
+    buf = io.BytesIO()
+    image.save(buf, "JPEG", quality=92)
+    photo = buf.getvalue()
+    return [photo + f"bench-{i}".encode() for i in range(count)]
+
+
+async def wait_ready(client, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/diary/api/list")).status_code == 200:
+                return
+        except Exception:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("서버가 시작되지 않았습니다.")
+        await asyncio.sleep(0.2)
+
+
+async def run(port: int, photos) -> bool:
+    import httpx
+    from app.api.routers.diary import DIARY_PAGE_MAX_SIZE
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120) as client:
+        await wait_ready(client)
+
+        async def probe_once(latencies):
+            start = time.perf_counter()
+            response = await client.get("/diary/api/list")
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200
+
+        baseline = []
+        for _ in range(40):
+            await probe_once(baseline)
+            await asyncio.sleep(0.01)
+
+        during, done = [], False
+
+        async def probe():
+            while not done:
+                await probe_once(during)
+                await asyncio.sleep(0.01)
+
+        async def upload(i, photo):
+            start = time.perf_counter()
+            response = await client.post(
+                "/diary/save",
+                data={"date": str(date(2031, 1, 1) + timedelta(days=i)), "text": f"업로드 {i}"},
+                files={"file": (f"photo_{i}.jpg", photo, "image/jpeg")},
+            )
+            return response.status_code, (time.perf_counter() - start) * 1000
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        results = await asyncio.gather(*(upload(i, photo) for i, photo in enumerate(photos)))
+        wall = time.perf_counter() - start
+        done = True
+        await probe_task
+
+        listed = (await client.get("/diary/api/list", params={"limit": DIARY_PAGE_MAX_SIZE})).json()
+        with_image = sum(1 for entry in listed["diaries"] if entry["image_url"])
+
+    statuses = [status for status, _ in results]
+    upload_ms = [ms for _, ms in results]
+    print(f"사진 {len(photos)}장 ({len(photos[0]) / 1e6:.1f}MB) 동시 업로드")
+    print(f"  /diary/api/list 기준      p50 {statistics.median(baseline):7.1f}ms, p95 {percentile(baseline, 95):7.1f}ms")
+    print(f"  /diary/api/list 업로드 중  p50 {statistics.median(during):7.1f}ms, p95 {percentile(during, 95):7.1f}ms, "
+          f"최대 {max(during):7.1f}ms ({len(during)}회)")
+    print(f"  업로드 전체 {wall:.2f}s, 한 건 p50 {statistics.median(upload_ms):.0f}ms, 응답 코드 {sorted(set(statuses))}, "
+          f"사진이 붙은 일기 {with_image}/{len(photos)}")
+    return all(status == 200 for status in statuses) and with_image == len(photos)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--megapixels", type=int, default=12)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--serve", metavar="WORK_DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    # 업로드 결과는 일기 목록 한 페이지로 확인합니다.
+    args.uploads = max(1, min(args.uploads, 50))
+
+    use_bench_database("upload", fresh=not args.serve)
+    if args.serve:
+        serve(args.serve, args.port)
+        return 0
+
+    work_dir = make_work_dir()
+    photos = make_photos(args.uploads, args.megapixels)
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", work_dir, "--port", str(args.port)])
+    try:
+        ok = asyncio.run(run(args.port, photos))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
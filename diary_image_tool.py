@@ -0,0 +1,105 @@
+import os
+import sys
+
+from sqlalchemy import select, update, func
+
+from app.core.database import SessionLocal, Base, engine, ensure_columns, ensure_indexes
+from app.core.http_cache import CONTENT_HASHED_NAME
+from app.core.models import Diary
+from app.service.diary_images import UPLOAD_FOLDER, adopt_legacy_image, diary_image_files, remove_diary_image
+
+# --- 사용법 ---
+# python diary_image_tool.py status              : 일기 사진 파일 상태(내용 해시 이름/예전 이름/없는 파일/어느 일기도 쓰지 않는 파일)를 보여줍니다.
+# python diary_image_tool.py migrate [--dry-run] : 예전 이름(날짜_시각)의 사진을 내용 해시 이름으로 옮깁니다. (한 번만 실행)
+#                                                  같은 사진은 파일 하나로 합쳐지고, 옮긴 뒤 예전 파일은 삭제합니다.
+#                                                  --dry-run 이면 옮길 대상만 보여줍니다.
+
+
+def _is_hashed(image_url: str) -> bool:
+    return CONTENT_HASHED_NAME.match(os.path.basename(image_url)) is not None
+
+
+def _image_refs(db) -> dict:
+    """
+    {image_url: 그 사진을 쓰는 일기 수}
+    """
+    return dict(db.execute(
+        select(Diary.image_url, func.count()).filter(Diary.image_url.is_not(None)).group_by(Diary.image_url)
+    ).all())
+
+
+def status():
+    db = SessionLocal()
+    try:
+        refs = _image_refs(db)
+        hashed = [url for url in refs if _is_hashed(url)]
+        legacy = [url for url in refs if not _is_hashed(url)]
+        missing = [url for url in refs if not os.path.exists(url.lstrip("/"))]
+        referenced = {os.path.normpath(p) for url in refs for p in diary_image_files(url)}
+        orphans = [
+            name for name in os.listdir(UPLOAD_FOLDER)
+            if os.path.normpath(os.path.join(UPLOAD_FOLDER, name)) not in referenced
+        ] if os.path.isdir(UPLOAD_FOLDER) else []
+
+        print(f"사진: {len(refs)}개 (일기 {sum(refs.values())}편), 여러 일기가 함께 쓰는 사진 {sum(1 for n in refs.values() if n > 1)}개")
+        print(f"  내용 해시 이름: {len(hashed)}개")
+        print(f"  예전 이름: {len(legacy)}개" + (" -> 'python diary_image_tool.py migrate'로 옮기세요." if legacy else ""))
+        for url in missing:
+            print(f"  [없는 파일] {url}")
+        if orphans:
+            print(f"어느 일기도 쓰지 않는 파일: {len(orphans)}개")
+            for name in sorted(orphans)[:20]:
+                print(f"  - {name}")
+        return 0
+    finally:
+        db.close()
+
+
+def migrate(dry_run: bool):
+    db = SessionLocal()
+    moved = failed = 0
+    try:
+        for image_url, count in _image_refs(db).items():
+            if _is_hashed(image_url):
+                continue
+            if not os.path.exists(image_url.lstrip("/")):
+                print(f"[건너뜀] 파일이 없습니다: {image_url}")
+                failed += 1
+                continue
+            if dry_run:
+                print(f"[옮길 대상] {image_url} (일기 {count}편)")
+                moved += 1
+                continue
+            try:
+                new_url = adopt_legacy_image(image_url)
+                db.execute(update(Diary).where(Diary.image_url == image_url).values(image_url=new_url))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"[실패] {image_url}: {e}")
+                failed += 1
+                continue
+            # DB 가 새 이름을 가리킨 뒤에 예전 파일을 지웁니다.
+            remove_diary_image(image_url)
+            print(f"[옮김] {image_url} -> {new_url}")
+            moved += 1
+
+        action = "옮길 대상" if dry_run else "옮긴 사진"
+        print(f"{action}: {moved}개, 실패/건너뜀: {failed}개")
+        return 1 if failed else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    if command == "migrate":
+        sys.exit(migrate("--dry-run" in sys.argv))
+    elif command == "status":
+        sys.exit(status())
+    else:
+        print("사용법: python diary_image_tool.py [status|migrate [--dry-run]]")
+        sys.exit(2)
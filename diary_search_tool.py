@@ -0,0 +1,48 @@
+import sys
+
+from app.core.database import Base, engine, ensure_columns, ensure_indexes
+from app.service.diary_search import ensure_diary_search, rebuild_diary_search, verify_diary_search
+
+# --- 사용법 ---
+# python diary_search_tool.py verify   : 일기 검색 색인(diaries_fts)이 원본과 일치하는지 확인합니다. (불일치하면 종료 코드 1)
+# python diary_search_tool.py rebuild  : 검색 색인을 원본 일기로부터 다시 만듭니다.
+
+
+def verify():
+    try:
+        with engine.begin() as conn:
+            verify_diary_search(conn)
+        print("일기 검색 색인이 원본과 일치합니다.")
+        return 0
+    except Exception as e:
+        print(f"[불일치] 일기 검색 색인: {getattr(e, 'orig', e)}")
+        print("'python diary_search_tool.py rebuild'로 다시 만드세요.")
+        return 1
+
+
+def rebuild():
+    try:
+        with engine.begin() as conn:
+            rebuild_diary_search(conn)
+        print("일기 검색 색인을 다시 만들었습니다.")
+        return 0
+    except Exception as e:
+        print(f"검색 색인 재생성 중 오류 발생: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    if not ensure_diary_search(engine):
+        print("이 데이터베이스에서는 FTS5 검색 색인을 사용할 수 없습니다.")
+        sys.exit(1)
+    if command == "rebuild":
+        sys.exit(rebuild())
+    elif command == "verify":
+        sys.exit(verify())
+    else:
+        print("사용법: python diary_search_tool.py [verify|rebuild]")
+        sys.exit(2)
@@ -0,0 +1,146 @@
+import os
+import sys
+import shutil
+
+from sqlalchemy import select, update, func
+
+from app.core.database import SessionLocal, Base, engine, ensure_columns, ensure_indexes
+from app.core.models import Insurance, StoredDocument
+from app.service.diary_images import file_sha256
+from app.service.document_store import DOCUMENT_ROOT, document_sha256, document_url, document_relpath
+from app.service.uploads import sniff_content_type, CONTAINER_EXTENSIONS
+
+# --- 사용법 ---
+# python document_tool.py status              : 보험 문서 저장소 상태(저장소 파일/예전 파일/없는 파일/참조 수가 맞지 않는 문서)를 보여줍니다.
+# python document_tool.py migrate [--dry-run] : 예전 이름(uuid)의 보험 문서를 내용 해시 저장소로 옮기고 참조 수를 다시 계산합니다.
+#                                               같은 내용의 문서는 파일 하나로 합쳐지고, 옮긴 뒤 예전 파일은 삭제합니다.
+#                                               --dry-run 이면 옮길 대상만 보여줍니다.
+
+
+def _document_refs(db) -> dict:
+    """
+    {file_path: 그 파일을 쓰는 보험 수}
+    """
+    return dict(db.execute(
+        select(Insurance.file_path, func.count()).filter(Insurance.file_path.is_not(None)).group_by(Insurance.file_path)
+    ).all())
+
+
+def _ref_counts(refs: dict) -> dict:
+    """
+    {sha256: 저장소 파일을 쓰는 보험 수}
+    """
+    counts = {}
+    for file_path, count in refs.items():
+        sha256 = document_sha256(file_path)
+        if sha256 is not None:
+            counts[sha256] = counts.get(sha256, 0) + count
+    return counts
+
+
+def status():
+    db = SessionLocal()
+    try:
+        refs = _document_refs(db)
+        legacy = [path for path in refs if document_sha256(path) is None]
+        missing = [path for path in refs if not os.path.exists(path.lstrip("/"))]
+        expected = _ref_counts(refs)
+        stored = {doc.sha256: doc.ref_count for doc in db.query(StoredDocument).all()}
+        mismatched = [
+            (sha256, stored.get(sha256, 0), expected.get(sha256, 0))
+            for sha256 in set(stored) | set(expected) if stored.get(sha256, 0) != expected.get(sha256, 0)
+        ]
+
+        print(f"문서: {len(refs)}개 (보험 {sum(refs.values())}건)")
+        print(f"  저장소 문서: {len(stored)}개, 여러 보험이 함께 쓰는 문서 {sum(1 for n in expected.values() if n > 1)}개")
+        print(f"  예전 이름: {len(legacy)}개" + (" -> 'python document_tool.py migrate'로 옮기세요." if legacy else ""))
+        for path in missing:
+            print(f"  [없는 파일] {path}")
+        for sha256, count, actual in mismatched:
+            print(f"  [참조 수 불일치] {sha256[:12]}… 저장된 값 {count}, 실제 {actual} -> migrate 로 다시 계산됩니다.")
+        return 1 if missing or mismatched else 0
+    finally:
+        db.close()
+
+
+def _legacy_extension(path: str):
+    with open(path, "rb") as f:
+        content_type, extension = sniff_content_type(f.read(16))
+    if content_type in CONTAINER_EXTENSIONS or content_type is None:
+        extension = os.path.splitext(path)[1].lstrip(".").lower() or "bin"
+    return content_type or "application/octet-stream", extension
+
+
+def migrate(dry_run: bool):
+    db = SessionLocal()
+    moved = failed = 0
+    try:
+        for file_path, count in _document_refs(db).items():
+            if document_sha256(file_path) is not None:
+                continue
+            path = file_path.lstrip("/")
+            if not os.path.exists(path):
+                print(f"[건너뜀] 파일이 없습니다: {file_path}")
+                failed += 1
+                continue
+            if dry_run:
+                print(f"[옮길 대상] {file_path} (보험 {count}건)")
+                moved += 1
+                continue
+            try:
+                sha256 = file_sha256(path)
+                doc = db.query(StoredDocument).filter(StoredDocument.sha256 == sha256).first()
+                if doc is None:
+                    content_type, extension = _legacy_extension(path)
+                    doc = StoredDocument(
+                        sha256=sha256, size=os.path.getsize(path), content_type=content_type,
+                        extension=extension, ref_count=0,
+                    )
+                    db.add(doc)
+                target = os.path.join(DOCUMENT_ROOT, document_relpath(sha256, doc.extension))
+                if not os.path.exists(target):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.copyfile(path, target + ".tmp")
+                    os.replace(target + ".tmp", target)
+                new_url = document_url(sha256, doc.extension)
+                doc.ref_count += count
+                db.execute(update(Insurance).where(Insurance.file_path == file_path).values(file_path=new_url))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"[실패] {file_path}: {e}")
+                failed += 1
+                continue
+            # DB 가 새 경로를 가리킨 뒤에 예전 파일을 지웁니다.
+            os.remove(path)
+            print(f"[옮김] {file_path} -> {new_url}")
+            moved += 1
+
+        if not dry_run:
+            # 참조 수를 실제 보험 수로 맞춥니다.
+            expected = _ref_counts(_document_refs(db))
+            for doc in db.query(StoredDocument).all():
+                if doc.ref_count != expected.get(doc.sha256, 0):
+                    print(f"[참조 수 수정] {doc.sha256[:12]}… {doc.ref_count} -> {expected.get(doc.sha256, 0)}")
+                    doc.ref_count = expected.get(doc.sha256, 0)
+            db.commit()
+
+        action = "옮길 대상" if dry_run else "옮긴 문서"
+        print(f"{action}: {moved}개, 실패/건너뜀: {failed}개")
+        return 1 if failed else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    if command == "migrate":
+        sys.exit(migrate("--dry-run" in sys.argv))
+    elif command == "status":
+        sys.exit(status())
+    else:
+        print("사용법: python document_tool.py [status|migrate [--dry-run]]")
+        sys.exit(2)
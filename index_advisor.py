@@ -0,0 +1,186 @@
+import sys
+from datetime import date
+
+from sqlalchemy import select, func, union_all, literal_column, tuple_, text
+
+from app.core.database import engine, Base, ensure_columns, ensure_indexes
+from app.core.models import (
+    Income, Expense, Assets, Task, LedgerExpense, MonthlyBudget,
+    FamilyMember, Insurance, StoredDocument, Diary, TrustedDevice,
+    ExpenseMonthlyTotal, IncomeMonthlyTotal, LedgerDailyTotal,
+    ExpenseArchive, LedgerExpenseArchive, ArchivedPeriod,
+    EXPENSE_TYPE_ORDER, EXPENSE_CATEGORY_ORDER,
+)
+from app.service.archive import _ledger_select, _archive_filter, _period_column
+from app.service.diary_search import ensure_diary_search, FTS_TABLE
+
+# --- 설정 ---
+# 라우터별 대표 쿼리 목록입니다. 라우터에 새 쿼리를 추가하면 여기에도 같은 형태로 추가해주세요.
+# (라우터 이름, 설명, SELECT 문)
+_today = date.today()
+_start = date(2000, 1, 25)
+_end = date(2000, 2, 24)
+
+ROUTER_QUERIES = [
+    ("main", "마감일 알림 조회", select(Task).filter(Task.due_date == _today)),
+    ("main", "오래된 기기 정리", select(TrustedDevice).filter(TrustedDevice.created_at <= _today)),
+    ("auth", "기기 토큰 확인", select(TrustedDevice).filter(TrustedDevice.token == "x")),
+    ("dashboard", "알림 목록", select(Task).filter(Task.due_date >= _today).order_by(Task.due_date.asc())),
+    ("dashboard", "자산 목록", select(Assets)),
+    ("dashboard", "최근 수입", select(Income).filter(Income.id < 100).order_by(Income.id.desc()).limit(11)),
+    ("dashboard", "최근 지출", select(Expense).filter(Expense.id < 100).order_by(Expense.id.desc()).limit(11)),
+    ("expenses", "수입 페이지", select(Income).filter(Income.id < 100).order_by(Income.id.desc()).limit(51)),
+    ("expenses", "지출 카테고리 합계(집계)",
+        select(ExpenseMonthlyTotal.category, func.sum(ExpenseMonthlyTotal.total)).group_by(ExpenseMonthlyTotal.category)),
+    ("expenses", "지출 첫 페이지",
+        select(Expense).order_by(EXPENSE_TYPE_ORDER, EXPENSE_CATEGORY_ORDER, Expense.id.desc()).limit(51)),
+    ("expenses", "지출 페이지(같은 그룹)",
+        select(Expense).filter(EXPENSE_TYPE_ORDER == 1, EXPENSE_CATEGORY_ORDER == 1, Expense.id < 100)
+        .order_by(Expense.id.desc()).limit(51)),
+    ("expenses", "지출 페이지(다음 카테고리)",
+        select(Expense).filter(EXPENSE_TYPE_ORDER == 1, EXPENSE_CATEGORY_ORDER > 1)
+        .order_by(EXPENSE_CATEGORY_ORDER, Expense.id.desc()).limit(51)),
+    ("expenses", "지출 페이지(다음 유형)",
+        select(Expense).filter(EXPENSE_TYPE_ORDER > 1)
+        .order_by(EXPENSE_TYPE_ORDER, EXPENSE_CATEGORY_ORDER, Expense.id.desc()).limit(51)),
+    ("expenses", "일괄 수정/삭제 집계",
+        select(Expense.expense_date, Expense.category, func.sum(Expense.amount), func.count())
+        .filter(Expense.id.in_([1, 2, 3])).group_by(Expense.expense_date, Expense.category)),
+    ("monthly_ledger", "일괄 수정/삭제 대상 주기",
+        select(LedgerExpense.period).filter(LedgerExpense.id.in_([1, 2, 3])).distinct()),
+    ("monthly_ledger", "예산 조회", select(MonthlyBudget).filter(MonthlyBudget.month == "2000-01")),
+    ("monthly_ledger", "급여 주기 지출",
+        select(LedgerExpense)
+        .filter(LedgerExpense.period == "2000-02")
+        .order_by(LedgerExpense.expense_date.desc())),
+    ("monthly_ledger", "엑셀 내보내기(주기 범위)",
+        select(LedgerExpense.period, LedgerExpense.expense_date, LedgerExpense.category, LedgerExpense.item, LedgerExpense.amount)
+        .filter(LedgerExpense.period.between("2000-01", "2000-12"))
+        .order_by(LedgerExpense.period, LedgerExpense.expense_date, LedgerExpense.id)),
+    ("monthly_ledger", "주기별 카테고리 추이(집계)",
+        select(func.julianday(LedgerDailyTotal.period), LedgerDailyTotal.category, LedgerDailyTotal.total)
+        .filter(LedgerDailyTotal.period.between(_start, _end))),
+    ("monthly_ledger", "예산 소진 예측 일별 합계(집계)",
+        select(func.julianday(LedgerDailyTotal.period), func.sum(LedgerDailyTotal.total))
+        .filter(LedgerDailyTotal.period.between(_start, _today)).group_by(LedgerDailyTotal.period)),
+    ("monthly_ledger", "보관된 주기 지출(원본+보관 병합)",
+        union_all(
+            _ledger_select(LedgerExpense, False).filter(LedgerExpense.period == "2000-02"),
+            _ledger_select(LedgerExpenseArchive, True).filter(LedgerExpenseArchive.period == "2000-02"),
+        ).order_by(literal_column("expense_date").desc())),
+    ("monthly_ledger", "엑셀 내보내기(보관 포함)",
+        union_all(
+            select(LedgerExpense.period, LedgerExpense.expense_date).filter(LedgerExpense.period.between("2000-01", "2000-12")),
+            select(LedgerExpenseArchive.period, LedgerExpenseArchive.expense_date)
+            .filter(LedgerExpenseArchive.period.between("2000-01", "2000-12")),
+        ).order_by(literal_column("period"), literal_column("expense_date"))),
+    ("monthly_ledger", "보관된 주기 목록",
+        select(ArchivedPeriod.period).filter(ArchivedPeriod.table_name == "ledger_expenses")),
+    ("expenses", "보관된 지출 페이지",
+        select(ExpenseArchive).filter(ExpenseArchive.archive_id < 100).order_by(ExpenseArchive.archive_id.desc()).limit(51)),
+    ("archive_tool", "가계부 보관 대상",
+        select(_period_column(LedgerExpense), func.count()).filter(_archive_filter(LedgerExpense, "2000-01"))
+        .group_by(_period_column(LedgerExpense))),
+    ("archive_tool", "지출 보관 대상",
+        select(_period_column(Expense), func.count()).filter(_archive_filter(Expense, "2000-01"))
+        .group_by(_period_column(Expense))),
+    ("period_tool", "주기 미입력 지출일",
+        select(LedgerExpense.expense_date).filter(LedgerExpense.expense_date.is_not(None), LedgerExpense.period.is_(None)).distinct()),
+    ("monthly_ledger", "카테고리별 합계(집계)",
+        select(LedgerDailyTotal.category, func.sum(LedgerDailyTotal.total))
+        .filter(LedgerDailyTotal.period.between(_start, _end))
+        .group_by(LedgerDailyTotal.category)),
+    ("insurance", "가족 목록", select(FamilyMember)),
+    ("insurance", "가족 이름 조회", select(FamilyMember).filter(FamilyMember.name == "x")),
+    ("insurance", "문서 저장소 해시 조회",
+        select(StoredDocument.ref_count).filter(StoredDocument.sha256 == "0" * 64)),
+    ("insurance", "보험 목록", select(Insurance)),
+    ("diary", "달력 작성일(월 범위)",
+        select(Diary.diary_date).filter(Diary.diary_date >= _start, Diary.diary_date < _end)),
+    ("diary", "일기 목록", select(Diary).order_by(Diary.diary_date.asc(), Diary.id.asc()).limit(11)),
+    ("diary", "일기 목록(다음 커서)",
+        select(Diary.id, func.substr(Diary.content, 1, 301))
+        .filter(tuple_(Diary.diary_date, Diary.id) > tuple_(_today, 1))
+        .order_by(Diary.diary_date.asc(), Diary.id.asc()).limit(11)),
+    ("diary", "일기 목록(이전 커서)",
+        select(Diary.id, func.substr(Diary.content, 1, 301))
+        .filter(tuple_(Diary.diary_date, Diary.id) < tuple_(_today, 1))
+        .order_by(Diary.diary_date.desc(), Diary.id.desc()).limit(11)),
+    ("diary", "날짜로 일기 조회", select(Diary).filter(Diary.diary_date == _today)),
+    ("diary", "사진 참조 수", select(func.count()).select_from(Diary).filter(Diary.image_url == "x")),
+    ("diary", "일기 전문 검색(FTS5)",
+        text(f"SELECT d.id, snippet({FTS_TABLE}, -1, '[', ']', '…', 32) FROM {FTS_TABLE} "
+             f"JOIN diaries AS d ON d.id = {FTS_TABLE}.rowid WHERE {FTS_TABLE} MATCH '\"캠핑카\"' "
+             f"ORDER BY {FTS_TABLE}.rank, d.id LIMIT 21")),
+]
+
+# 전체 조회가 의도된 쿼리입니다. (행 수가 적은 테이블)
+# 전체 스캔이 나와도 경고만 하고 실패로 치지 않습니다.
+ALLOWED_SCANS = {
+    "assets", "family_members", "insurances", "house_data", "trusted_devices",
+    # 집계 테이블은 기간 x 카테고리 수만큼만 행이 있습니다.
+    "expense_monthly_totals", "income_monthly_totals",
+}
+# --- 설정 끝 ---
+
+
+def explain(conn, stmt):
+    """
+    SELECT 문의 EXPLAIN QUERY PLAN 결과(detail 목록)를 반환합니다.
+    """
+    compiled = stmt.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in (compiled.positiontup or []))
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def find_full_scans(plan):
+    """
+    인덱스를 쓰지 않는 테이블 전체 스캔(`SCAN <table>`)을 찾습니다.
+    """
+    scans = []
+    for detail in plan:
+        # FTS5 등 가상 테이블은 자체 색인으로 검색하므로 제외합니다. ("SCAN x VIRTUAL TABLE INDEX ...")
+        if detail.startswith("SCAN ") and "USING" not in detail and "VIRTUAL TABLE" not in detail:
+            scans.append(detail.split()[1])
+    return scans
+
+
+def run_advisor():
+    """
+    라우터별 쿼리의 실행 계획을 출력하고, 전체 스캔이 있으면 실패(1)를 반환합니다.
+    """
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    ensure_diary_search(engine)
+
+    failures = 0
+    with engine.connect() as conn:
+        for router_name, label, stmt in ROUTER_QUERIES:
+            plan = explain(conn, stmt)
+            scans = find_full_scans(plan)
+            unexpected = [t for t in scans if t not in ALLOWED_SCANS]
+
+            if unexpected:
+                status = "FULL SCAN"
+                failures += 1
+            elif scans:
+                status = "SCAN(허용)"
+            else:
+                status = "OK"
+
+            print(f"[{status:>10}] {router_name:<15} {label}")
+            for detail in plan:
+                print(f"{'':13}- {detail}")
+
+    if failures:
+        print(f"\n전체 테이블 스캔이 {failures}건 발견되었습니다. 인덱스를 추가하거나 ALLOWED_SCANS를 확인하세요.")
+        return 1
+    print("\n모든 쿼리가 인덱스를 사용합니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    print("--- 인덱스 어드바이저 시작 ---")
+    sys.exit(run_advisor())
@@ -1,26 +1,37 @@
 import os
 import json
+import logging
 import pytz
 from urllib.parse import urlencode
 from datetime import date, timedelta, datetime
 from typing import List
 from fastapi import FastAPI, Depends, Form, Request, BackgroundTasks, HTTPException, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
-from sqlalchemy import Column, Integer, String, Date, REAL, Float, func
+from sqlalchemy import Column, Integer, String, Date, REAL, Float, func, select
 from pydantic import BaseModel
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from starlette.middleware.sessions import SessionMiddleware
-from app.core.database import SessionLocal, Base, engine, get_db
+from app.core.database import SessionLocal, AsyncSessionLocal, Base, engine, get_db, report_engine_profile, ensure_columns, ensure_indexes, track_queries
 from app.core.models import Income, Expense, Task
 from app.api import assets
 from app.api.routers.tasks import send_email
-from app.api.routers import auth, expenses, tasks, dashboard, monthly_ledger, insurance, diary
+from app.api.routers import auth, expenses, tasks, dashboard, monthly_ledger, insurance, diary, imports
 from app.core import models 
 from app.core.database import engine, Base
 from app.core.models import TrustedDevice
+from app.core import metrics
+from app.core.dependencies import metrics_access_required
+from app.service.rollups import ensure_rollups
+from app.service.ledger_periods import ensure_ledger_periods
+from app.service.export_cache import ledger_export_cache
+from app.service.archive import archive_closed_periods
+from app.service.diary_search import ensure_diary_search
+from app.service.diary_images import shutdown_image_pool
+from app.service.uploads import upload_limit_for_path
+from app.core.http_cache import ContentHashedStaticFiles
 
 app = FastAPI()
 
@@ -32,23 +43,90 @@ app.add_middleware(
     max_age=3600# 3600초(1시간) 동안 활동이 없으면 세션 만료
 )
 
+# --- 요청별 SQL 계측 미들웨어 ---
+# 응답 헤더 `X-DB-Queries`(문장 수), `X-DB-Repeated`(N+1 의심 문장 수)와
+# `Server-Timing: db;dur=...`(총 DB 시간, ms)을 추가하고 디버그 로그를 남깁니다.
+# 라우트별 쿼리 수 예산을 넘으면 경고 로그를 남깁니다.
+sql_logger = logging.getLogger("app.sql")
+
+QUERY_BUDGETS = {
+    "/dashboard": 5,
+    "/expenses": 7, # 지출 목록 커서 조회가 최대 3단계
+    "/monthly_ledger": 5,
+    "/insurance": 5,
+    "/diary": 5,
+    "/diary/api/list": 2,
+    "/diary/api/calendar": 1,
+}
+
+@app.middleware("http")
+async def sql_instrumentation_middleware(request: Request, call_next):
+    with track_queries() as stats:
+        response = await call_next(request)
+
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path)
+    db_ms = stats.total_time * 1000
+    repeated = stats.repeated
+
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["X-DB-Repeated"] = str(len(repeated))
+    response.headers["Server-Timing"] = f'db;dur={db_ms:.2f};desc="{stats.count} queries"'
+
+    sql_logger.debug("%s %s queries=%d db=%.2fms repeated=%d", request.method, path, stats.count, db_ms, len(repeated))
+    for statement, n in repeated.items():
+        sql_logger.warning("N+1 의심: %s %s 에서 같은 문장이 %d번 실행됨: %s", request.method, path, n, statement[:200])
+    budget = QUERY_BUDGETS.get(path)
+    if budget is not None and stats.count > budget:
+        sql_logger.warning("쿼리 예산 초과: %s %s %d > %d", request.method, path, stats.count, budget)
+    return response
+
+# --- Prometheus 메트릭 미들웨어 ---
+# 라우트 템플릿별 요청 수/지연 시간 히스토그램과 처리 중인 요청 수를 기록합니다. (/metrics 에서 확인)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# --- 업로드 크기 제한 ---
+# 업로드 경로는 본문을 읽기 전에 Content-Length 로 먼저 확인해, 제한을 넘는 요청은 받지 않고 413 으로 거절합니다.
+# (Content-Length 가 없는 chunked 요청은 UploadRoute 가 파일을 받는 중에 실제 크기로 확인해 거절합니다)
+@app.middleware("http")
+async def upload_size_limit_middleware(request: Request, call_next):
+    limit = upload_limit_for_path(request.url.path)
+    if limit is not None and request.method == "POST":
+        length = request.headers.get("content-length", "")
+        if length.isdigit() and int(length) > limit:
+            return JSONResponse(status_code=413, content={"detail": "업로드 요청이 너무 큽니다."})
+    return await call_next(request)
+
 # --- 로그인 비밀번호 설정 ---
 LOGIN_PASSWORD = os.getenv("LOGIN_PASSWORD", "3152")
 
 # 정적 파일을 서빙하기 위한 설정입니다.
+# 일기 사진과 보험 문서는 내용 해시 이름이므로 immutable 캐시 헤더를 붙여 서빙합니다. ("/static" 보다 먼저 등록)
+os.makedirs("static/diary", exist_ok=True)
+os.makedirs("static/uploads", exist_ok=True)
+app.mount("/static/diary", ContentHashedStaticFiles(directory="static/diary"), name="diary_images")
+app.mount("/static/uploads", ContentHashedStaticFiles(directory="static/uploads"), name="insurance_documents")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Jinja2 템플릿 엔진을 설정합니다.
 templates = Jinja2Templates(directory="templates")
 
-# 스케줄러 설정
+# 스케줄러 설정 (이벤트 루프가 필요하므로 시작은 startup 이벤트에서 합니다)
 scheduler = AsyncIOScheduler(timezone=pytz.timezone('Asia/Seoul'))
-scheduler.start()
 
 # --- 데이터베이스 테이블 생성 ---
 print("Creating database tables...")
 models.Base.metadata.create_all(bind=engine) 
+ensure_columns(engine)
+ensure_indexes(engine)
+ensure_diary_search(engine)
+with SessionLocal() as _db:
+    ensure_rollups(_db)
+    ensure_ledger_periods(_db)
+# 이전 실행에서 만든 엑셀 캐시 파일은 데이터 버전을 알 수 없으므로 지웁니다.
+ledger_export_cache.purge()
 print("Database tables created.")
+report_engine_profile()
 
 # --- 라우터 포함 ---
 app.include_router(assets.router, tags=["Assets"])
@@ -59,21 +137,30 @@ app.include_router(dashboard.router, tags=["Dashboard"])
 app.include_router(monthly_ledger.router, tags=["MonthlyLedger"])
 app.include_router(insurance.router, tags=["Insurance"])
 app.include_router(diary.router)
+app.include_router(imports.router, tags=["Import"])
 
 # --- 메인 페이지 라우트 ---
 @app.get("/", response_class=HTMLResponse)
 def home(request: Request):
     return RedirectResponse(url="/login", status_code=303)
 
+# --- Prometheus 메트릭 엔드포인트 ---
+# 로그인한 세션 또는 METRICS_ALLOW_IPS 에 있는 수집기만 볼 수 있습니다. (app.core.dependencies.metrics_access_required)
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(metrics_access_required)])
+def get_metrics():
+    body, content_type = metrics.render_metrics()
+    return Response(content=body, media_type=content_type)
+
 # --- 마감일 이메일 발송 함수 정의 ---
+@metrics.timed_job("send_due_date_reminders")
 async def send_due_date_reminders():
     """
     매일 정해진 시간에 실행되어, 마감일이 오늘인 Task에 대해 알림 이메일을 보냅니다.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         today = date.today()
-        tasks_due_today = db.query(Task).filter(Task.due_date == today).all()
+        result = await db.execute(select(Task).filter(Task.due_date == today))
+        tasks_due_today = result.scalars().all()
 
         if tasks_due_today:
             print(f"오늘 마감인 {len(tasks_due_today)}개의 알림을 발견했습니다. 이메일 발송을 시작합니다...")
@@ -84,11 +171,9 @@ async def send_due_date_reminders():
             
             # ▼▼▼ [핵심] 이제 이 함수는 tasks.py의 send_email 함수를 정확히 호출합니다. ▼▼▼
             await send_email(to_email=task.email, subject=subject, body=body)
-            
-    finally:
-        db.close()
         
 # 1. 90일 지난 기기 삭제 함수 정의
+@metrics.timed_job("cleanup_old_trusted_devices")
 async def cleanup_old_trusted_devices():
     """
     등록된 지 90일이 지난 기기 데이터를 DB에서 삭제합니다.
@@ -111,9 +196,40 @@ async def cleanup_old_trusted_devices():
     finally:
         db.close()
 
+# 2. 오래된 기간의 지출 보관(아카이브)
+@metrics.timed_job("archive_closed_periods")
+def archive_closed_periods_job():
+    """
+    ARCHIVE_AFTER_MONTHS 개월이 지난 주기/월의 지출을 보관 테이블로 옮깁니다. (합계는 그대로 유지)
+    수십만 건을 옮기면 수 초가 걸리므로 일반 함수로 두어 스케줄러가 이벤트 루프가 아닌 스레드에서 실행하게 합니다.
+    """
+    db = SessionLocal()
+    try:
+        moved = archive_closed_periods(db)
+        db.commit()
+        for table_name, counts in moved.items():
+            print(f"[보관] {table_name}: {len(counts)}개 기간, {sum(counts.values())}건을 보관했습니다.")
+    except Exception as e:
+        db.rollback()
+        print(f"지출 보관 중 오류 발생: {e}")
+        # 실패를 다시 던져 timed_job 이 scheduler_job_failures_total 에 기록하게 합니다. (스케줄러는 로그만 남기고 계속 실행)
+        raise
+    finally:
+        db.close()
+
 # --- 애플리케이션 시작 시 실행될 이벤트 ---
 @app.on_event("startup")
 def startup_event():
     os.makedirs("static/diary", exist_ok=True)
     # 스케줄러에 마감일 알림 작업 등록
     scheduler.add_job(send_due_date_reminders, 'cron', hour=9, minute=10)
+    # 매월 1일 새벽에 오래된 기간의 지출을 보관
+    scheduler.add_job(archive_closed_periods_job, 'cron', day=1, hour=3, minute=30)
+    scheduler.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    # 처리 중인 일기 사진 변환을 마치고 작업 프로세스를 종료합니다.
+    shutdown_image_pool()
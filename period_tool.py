@@ -0,0 +1,55 @@
+import sys
+
+from app.core.database import SessionLocal, Base, engine, ensure_columns, ensure_indexes
+from app.service.ledger_periods import backfill_periods, verify_periods
+
+# --- 사용법 ---
+# python period_tool.py verify    : 가계부 지출의 급여 주기(period) 값이 지출일과 맞는지 확인합니다. (불일치가 있으면 종료 코드 1)
+# python period_tool.py backfill  : period 가 비어 있는 행을 채웁니다.
+# python period_tool.py rebuild   : 모든 행의 period 를 다시 계산합니다. (주기 규칙을 바꾼 경우)
+
+
+def verify():
+    db = SessionLocal()
+    try:
+        mismatches = verify_periods(db)
+        for expense_date, stored, expected in mismatches:
+            print(f"[불일치] {expense_date}: 저장된 값 {stored}, 올바른 값 {expected}")
+        if mismatches:
+            print(f"불일치 {len(mismatches)}건이 발견되었습니다. 'python period_tool.py rebuild'로 다시 계산하세요.")
+            return 1
+        print("모든 가계부 지출의 급여 주기가 올바릅니다.")
+        return 0
+    finally:
+        db.close()
+
+
+def backfill(only_missing: bool):
+    db = SessionLocal()
+    try:
+        updated = backfill_periods(db, only_missing=only_missing)
+        db.commit()
+        print(f"{updated}건의 급여 주기를 갱신했습니다.")
+        return 0
+    except Exception as e:
+        print(f"급여 주기 갱신 중 오류 발생: {e}")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    if command == "backfill":
+        sys.exit(backfill(only_missing=True))
+    elif command == "rebuild":
+        sys.exit(backfill(only_missing=False))
+    elif command == "verify":
+        sys.exit(verify())
+    else:
+        print("사용법: python period_tool.py [verify|backfill|rebuild]")
+        sys.exit(2)
@@ -0,0 +1,50 @@
+import sys
+
+from app.core.database import SessionLocal, Base, engine
+from app.service.rollups import rebuild_rollups, verify_rollups
+
+# --- 사용법 ---
+# python rollup_tool.py verify   : 집계 테이블과 원본 데이터의 불일치(drift)를 확인합니다. (불일치가 있으면 종료 코드 1)
+# python rollup_tool.py rebuild  : 집계 테이블을 원본 데이터로부터 다시 계산합니다.
+
+
+def verify():
+    db = SessionLocal()
+    try:
+        drifts = verify_rollups(db)
+        for table, period, category, (exp_total, exp_count), (act_total, act_count) in drifts:
+            print(f"[불일치] {table} {period} '{category}': 원본 {exp_total:,.0f}원/{exp_count}건, 집계 {act_total:,.0f}원/{act_count}건")
+        if drifts:
+            print(f"불일치 {len(drifts)}건이 발견되었습니다. 'python rollup_tool.py rebuild'로 다시 계산하세요.")
+            return 1
+        print("집계 테이블이 원본 데이터와 일치합니다.")
+        return 0
+    finally:
+        db.close()
+
+
+def rebuild():
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db)
+        db.commit()
+        print("집계 테이블을 다시 계산했습니다.")
+        return 0
+    except Exception as e:
+        print(f"집계 재계산 중 오류 발생: {e}")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    Base.metadata.create_all(bind=engine)
+    if command == "rebuild":
+        sys.exit(rebuild())
+    elif command == "verify":
+        sys.exit(verify())
+    else:
+        print("사용법: python rollup_tool.py [verify|rebuild]")
+        sys.exit(2)
@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# --- 테스트 공통 설정 ---
+# app 모듈은 가져올 때 DATABASE_URL 로 엔진을 만들므로, 가져오기 전에 임시 폴더의 테스트 DB 를 지정합니다.
+# (실제 DB(data/sql_app.db)는 건드리지 않음) 템플릿/정적 파일 경로가 맞도록 작업 폴더는 저장소 루트로 둡니다.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = tempfile.mkdtemp(prefix="house_manage_test_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.chdir(ROOT)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def app():
+    import main
+    from app.core.dependencies import login_required
+
+    main.app.dependency_overrides[login_required] = lambda: True
+    yield main.app
+    main.app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    """
+    로그인된 상태의 TestClient (startup/shutdown 이벤트도 실행)
+    """
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,31 @@
+import pytest
+
+# 보관 작업이 실패하면 롤백한 뒤 예외를 다시 던져, timed_job 이 실패 횟수(scheduler_job_failures_total)를 기록해야 합니다.
+
+
+def job_failures(job: str) -> float:
+    from app.core import metrics
+
+    return metrics.registry.get_sample_value("scheduler_job_failures_total", {"job": job}) or 0.0
+
+
+def test_failed_archive_run_is_counted(app, monkeypatch):
+    import main
+
+    def broken_archive(db):
+        raise RuntimeError("보관 실패")
+
+    monkeypatch.setattr(main, "archive_closed_periods", broken_archive)
+    before = job_failures("archive_closed_periods")
+    with pytest.raises(RuntimeError):
+        main.archive_closed_periods_job()
+    assert job_failures("archive_closed_periods") == before + 1
+
+
+def test_successful_archive_run_is_not_counted(app, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "archive_closed_periods", lambda db: {})
+    before = job_failures("archive_closed_periods")
+    main.archive_closed_periods_job()
+    assert job_failures("archive_closed_periods") == before
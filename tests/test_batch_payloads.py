@@ -0,0 +1,76 @@
+from datetime import date
+
+import pytest
+
+# 일괄 삭제/수정 요청은 모르는 필드를 무시하지 않고 422 로 거절합니다. (app.api.schemas.BatchPayload)
+# 날짜/분류/항목에 명시적인 null 을 보내도 NULL 을 쓰지 않고 422 로 거절합니다.
+
+
+@pytest.fixture
+def ledger_ids(db):
+    from app.core.models import LedgerExpense
+    from app.core.periods import period_for
+
+    today = date.today()
+    rows = [LedgerExpense(expense_date=today, period=period_for(today), category="식비", item=f"일괄 {i}", amount=1000)
+            for i in range(3)]
+    db.add_all(rows)
+    db.commit()
+    return [row.id for row in rows]
+
+
+@pytest.mark.parametrize("path, payload", [
+    ("/monthly_ledger/batch_update", {"category": "교통", "amount": 0}),
+    ("/monthly_ledger/batch_update", {"categroy": "교통"}),
+    ("/monthly_ledger/batch_delete", {"all": True}),
+    ("/expenses/batch_update", {"category": "교통", "amount": 0}),
+    ("/incomes/batch_update", {"income_type": "급여", "amount": 0}),
+    ("/assets/batch_update", {"item": "통장", "amount": 0}),
+])
+def test_unknown_fields_are_rejected(client, db, ledger_ids, path, payload):
+    from app.core.models import LedgerExpense
+
+    response = client.post(path, json={"ids": ledger_ids, **payload})
+    assert response.status_code == 422
+    extra = [error["loc"][-1] for error in response.json()["detail"] if error["type"] == "extra_forbidden"]
+    assert extra
+
+    db.expire_all()
+    rows = db.query(LedgerExpense).filter(LedgerExpense.id.in_(ledger_ids)).all()
+    assert len(rows) == len(ledger_ids)
+    assert {(row.category, row.amount) for row in rows} == {("식비", 1000)}
+
+
+@pytest.mark.parametrize("path, field", [
+    ("/monthly_ledger/batch_update", "expense_date"),
+    ("/monthly_ledger/batch_update", "category"),
+    ("/monthly_ledger/batch_update", "item"),
+    ("/expenses/batch_update", "expense_date"),
+    ("/expenses/batch_update", "category"),
+    ("/incomes/batch_update", "income_date"),
+    ("/incomes/batch_update", "income_type"),
+    ("/assets/batch_update", "category"),
+])
+def test_explicit_null_is_rejected(client, db, ledger_ids, path, field):
+    from app.core.models import LedgerExpense
+
+    response = client.post(path, json={"ids": ledger_ids, field: None})
+    assert response.status_code == 422
+    assert [error["loc"][-1] for error in response.json()["detail"]] == [field]
+
+    db.expire_all()
+    rows = db.query(LedgerExpense).filter(LedgerExpense.id.in_(ledger_ids)).all()
+    assert {(row.period, row.category) for row in rows} == {(rows[0].period, "식비")}
+    assert rows[0].period is not None
+
+
+def test_known_fields_still_update(client, db, ledger_ids):
+    from app.core.models import LedgerExpense
+
+    response = client.post("/monthly_ledger/batch_update", json={"ids": ledger_ids, "category": "교통"})
+    assert response.status_code == 200
+    assert response.json() == {"updated": len(ledger_ids)}
+
+    db.expire_all()
+    rows = db.query(LedgerExpense).filter(LedgerExpense.id.in_(ledger_ids)).all()
+    assert {row.category for row in rows} == {"교통"}
@@ -0,0 +1,72 @@
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 다른 연결이 쓰기 잠금을 잡고 있는 동안(느린 쓰기) 비동기 쓰기 요청은 busy_timeout 만큼 기다리고,
+# 그 사이에도 이벤트 루프가 멈추지 않아 다른 요청은 계속 처리되어야 합니다. (WAL 이므로 읽기는 잠금과 무관)
+LOCK_SECONDS = 1.0
+
+
+def _hold_write_lock(db_path: str, locked: threading.Event, release: threading.Event):
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=5)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("INSERT INTO monthly_budgets (month, amount) VALUES ('1999-01', 1)")
+        locked.set()
+        release.wait(10)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def test_requests_progress_while_write_waits_for_lock(client):
+    from app.core.database import engine, get_applied_pragmas
+
+    pragmas = get_applied_pragmas()
+    assert str(pragmas["journal_mode"]).lower() == "wal"
+    assert int(pragmas["busy_timeout"]) >= LOCK_SECONDS * 1000 * 2
+
+    locked, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=_hold_write_lock, args=(engine.url.database, locked, release))
+    holder.start()
+    assert locked.wait(5)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # 잠금이 풀릴 때까지 기다리는 비동기 쓰기 (AsyncSession / aiosqlite)
+        write_started = time.perf_counter()
+        write = pool.submit(client.post, "/set_budget", data={"month": "2099-01", "amount": 1000}, follow_redirects=False)
+        time.sleep(0.1)
+
+        # 쓰기가 기다리는 동안 다른 요청들은 바로 끝나야 합니다.
+        read_latencies = []
+        for _ in range(5):
+            start = time.perf_counter()
+            response = pool.submit(client.get, "/diary/api/list").result(timeout=LOCK_SECONDS)
+            read_latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+        assert not write.done(), "쓰기 요청이 잠금을 기다리지 않았습니다."
+        assert max(read_latencies) < LOCK_SECONDS / 2, read_latencies
+
+        threading.Timer(LOCK_SECONDS, release.set).start()
+        response = write.result(timeout=10)
+        write_elapsed = time.perf_counter() - write_started
+    holder.join()
+
+    # 잠금이 풀린 뒤 busy_timeout 안에서 재시도해 성공합니다.
+    assert response.status_code == 303
+    assert write_elapsed >= LOCK_SECONDS
+
+
+def test_concurrent_async_writes_all_commit(client, db):
+    from app.core.models import MonthlyBudget
+
+    months = [f"2098-{m:02d}" for m in range(1, 13)]
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        responses = list(pool.map(
+            lambda month: client.post("/set_budget", data={"month": month, "amount": 500}, follow_redirects=False),
+            months,
+        ))
+    assert [r.status_code for r in responses] == [303] * len(months)
+    saved = db.query(MonthlyBudget).filter(MonthlyBudget.month.in_(months)).count()
+    assert saved == len(months)
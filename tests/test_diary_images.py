@@ -0,0 +1,74 @@
+import asyncio
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+
+# 사진 변형(thumb/display x JPEG/WebP) 중 하나라도 만들지 못하면, 그 호출에서 쓴 변형은 모두 지워야 합니다.
+# (일부 변형만 남으면 다음 업로드는 변형이 없다고 보고, 남은 파일은 어떤 일기도 참조하지 않음)
+
+
+def png_bytes() -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (1600, 1200), (200, 120, 40)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def failing_save(monkeypatch):
+    """
+    n 번째 Image.save 호출에서 실패하게 합니다.
+    """
+    def fail_on(n):
+        original = Image.Image.save
+        calls = []
+
+        def save(self, fp, *args, **kwargs):
+            calls.append(fp)
+            if len(calls) == n:
+                with open(fp, "wb") as f:
+                    f.write(b"partial")
+                raise OSError("디스크 쓰기 실패")
+            return original(self, fp, *args, **kwargs)
+
+        monkeypatch.setattr(Image.Image, "save", save)
+    return fail_on
+
+
+@pytest.mark.parametrize("fail_at", [1, 3, 4])
+def test_failed_variant_removes_written_files(tmp_path, failing_save, fail_at):
+    from app.service.diary_images import render_variants
+
+    source = tmp_path / "source.png"
+    source.write_bytes(png_bytes())
+    out = tmp_path / "out"
+    out.mkdir()
+
+    failing_save(fail_at)
+    with pytest.raises(OSError):
+        render_variants(str(source), str(out), "abc")
+    assert os.listdir(out) == []
+
+
+def test_save_falls_back_to_original_without_partial_variants(tmp_path, failing_save, monkeypatch):
+    from app.service import diary_images, uploads
+
+    monkeypatch.setitem(uploads.UPLOAD_KINDS, "diary", (str(tmp_path), "/static/diary/", 1024 * 1024, {"image/png"}))
+    # 프로세스 풀 대신 스레드에서 실행해 같은 프로세스의 Image.save 교체가 적용되게 합니다.
+    monkeypatch.setattr(diary_images, "_get_pool", lambda: ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(diary_images, "_pending", None)
+
+    data = png_bytes()
+    temp_path = tmp_path / "upload.part"
+    temp_path.write_bytes(data)
+    sha256 = hashlib.sha256(data).hexdigest()
+    upload = uploads.ReceivedUpload("diary", str(temp_path), len(data), "image/png", "png", sha256)
+
+    failing_save(3)
+    url, created = asyncio.run(diary_images.save_diary_image(upload, directory=str(tmp_path)))
+    base_name = diary_images.content_base_name(sha256)
+    assert (url, created) == (f"/static/diary/{base_name}.png", True)
+    assert os.listdir(tmp_path) == [f"{base_name}.png"]
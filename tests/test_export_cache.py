@@ -0,0 +1,58 @@
+import os
+
+# 엑셀 내보내기 캐시는 파일을 열어서 돌려주므로, 전송 중에 다른 요청이 그 파일을 교체하거나
+# 크기 제한으로 삭제해도 이미 열린 파일은 끝까지 읽을 수 있어야 합니다.
+
+
+def builder(content: bytes):
+    def build(directory):
+        path = os.path.join(directory, f"build_{os.urandom(4).hex()}.tmp")
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+    return build
+
+
+def test_open_file_survives_eviction(tmp_path):
+    from app.service.export_cache import ExportFileCache
+
+    cache = ExportFileCache("test_export", str(tmp_path), max_bytes=1500)
+    first = cache.open_or_build(("2024-01", "2024-01"), 1, builder(b"a" * 1000))
+    first_path = first.name
+
+    # 두 번째 파일로 크기 제한을 넘기면 첫 번째 캐시 파일은 삭제됩니다.
+    second = cache.open_or_build(("2024-02", "2024-02"), 1, builder(b"b" * 1000))
+    assert not os.path.exists(first_path)
+    assert first.read() == b"a" * 1000
+    first.close()
+    second.close()
+
+
+def test_open_file_survives_rebuild(tmp_path):
+    from app.service.export_cache import ExportFileCache
+
+    cache = ExportFileCache("test_export", str(tmp_path), max_bytes=10_000)
+    key = ("2024-01", "2024-01")
+    old = cache.open_or_build(key, 1, builder(b"old" * 100))
+    # 버전이 바뀌어 다시 만들면 예전 파일은 삭제됩니다.
+    new = cache.open_or_build(key, 2, builder(b"new" * 100))
+    assert old.read() == b"old" * 100
+    assert new.read() == b"new" * 100
+    old.close()
+    new.close()
+
+    hit = cache.open_or_build(key, 2, builder(b"unused"))
+    assert hit.read() == b"new" * 100
+    hit.close()
+    assert cache.stats()["hits"] == 1
+
+
+def test_download_excel_streams_cached_file(client, tmp_path, monkeypatch):
+    from app.service.export_cache import ledger_export_cache
+
+    monkeypatch.setattr(ledger_export_cache, "directory", str(tmp_path))
+    for _ in range(2):
+        response = client.get("/monthly_ledger/download_excel", params={"month": "2024-01"})
+        assert response.status_code == 200
+        assert response.content[:4] == b"PK\x03\x04"
+        assert int(response.headers["content-length"]) == len(response.content)
@@ -0,0 +1,72 @@
+import io
+import zipfile
+
+import openpyxl
+import pytest
+
+# 깨진 엑셀/CSV 파일은 500 이 아니라 사유와 함께 400 으로 응답하고, 아무 행도 저장하지 않습니다.
+
+
+def xlsx_bytes(rows) -> bytes:
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buf = io.BytesIO()
+    workbook.save(buf)
+    return buf.getvalue()
+
+
+GOOD_XLSX = xlsx_bytes([["날짜", "카테고리", "항목", "금액"], ["2024-01-05", "식비", "가져오기 테스트", 1200]])
+
+
+def rebuild_xlsx(drop=None, truncate=None) -> bytes:
+    """
+    GOOD_XLSX 에서 파트 하나를 빼거나(drop) 반으로 자른(truncate) 파일
+    """
+    source = zipfile.ZipFile(io.BytesIO(GOOD_XLSX))
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w") as target:
+        for name in source.namelist():
+            if name == drop:
+                continue
+            data = source.read(name)
+            target.writestr(name, data[:len(data) // 2] if name == truncate else data)
+    return out.getvalue()
+
+
+def ledger_count(db):
+    from app.core.models import LedgerExpense
+
+    return db.query(LedgerExpense).filter(LedgerExpense.item == "가져오기 테스트").count()
+
+
+# 파일 이름 -> 내용
+BROKEN_FILES = {
+    "garbage.xlsx": b"this is not a spreadsheet",
+    "truncated.xlsx": GOOD_XLSX[:len(GOOD_XLSX) // 2],
+    "no_workbook.xlsx": rebuild_xlsx(drop="xl/workbook.xml"),
+    "no_content_types.xlsx": rebuild_xlsx(drop="[Content_Types].xml"),
+    "no_sheet.xlsx": rebuild_xlsx(drop="xl/worksheets/sheet1.xml"),
+    "broken_sheet.xlsx": rebuild_xlsx(truncate="xl/worksheets/sheet1.xml"),
+    "broken_workbook.xlsx": rebuild_xlsx(truncate="xl/workbook.xml"),
+    "euc_kr.csv": "날짜,금액\n2024-01-05,1200\n".encode("euc-kr"),
+}
+
+
+@pytest.mark.parametrize("filename", BROKEN_FILES)
+def test_unreadable_files_are_rejected(client, db, filename):
+    before = ledger_count(db)
+    response = client.post("/import/ledger", files={"file": (filename, BROKEN_FILES[filename])})
+    assert response.status_code == 400
+    assert response.json()["detail"]
+    db.expire_all()
+    assert ledger_count(db) == before
+
+
+def test_valid_xlsx_is_imported(client, db):
+    before = ledger_count(db)
+    response = client.post("/import/ledger", files={"file": ("ledger.xlsx", GOOD_XLSX)})
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 1
+    db.expire_all()
+    assert ledger_count(db) == before + 1
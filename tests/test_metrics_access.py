@@ -0,0 +1,58 @@
+import pytest
+
+# /metrics 는 로그인한 세션이나 METRICS_ALLOW_IPS 에 있는 주소에서만 볼 수 있습니다.
+# (다른 테스트의 login_required 우회와 관계없이, 로그인하지 않은 요청은 로그인 화면으로 보내짐)
+
+
+@pytest.fixture
+def allow_ips(monkeypatch):
+    from app.core import dependencies
+
+    def allow(value):
+        monkeypatch.setattr(dependencies, "METRICS_ALLOW_NETWORKS", dependencies._parse_networks(value))
+    return allow
+
+
+def client_from(app, host):
+    from fastapi.testclient import TestClient
+
+    return TestClient(app, client=(host, 50000), follow_redirects=False)
+
+
+@pytest.mark.parametrize("host", ["testclient", "127.0.0.1", "203.0.113.7"])
+def test_anonymous_request_is_redirected_to_login(app, allow_ips, host):
+    allow_ips("")
+    response = client_from(app, host).get("/metrics")
+    assert response.status_code == 307
+    assert response.headers["location"] == "/login"
+
+
+@pytest.mark.parametrize("allowed, host, status_code", [
+    ("127.0.0.1", "127.0.0.1", 200),
+    ("10.0.0.0/8, ::1", "10.1.2.3", 200),
+    ("10.0.0.0/8, ::1", "::1", 200),
+    ("10.0.0.0/8", "10.0.0.0.1", 307),
+    ("10.0.0.0/8", "192.168.0.10", 307),
+])
+def test_allowlisted_scraper(app, allow_ips, allowed, host, status_code):
+    allow_ips(allowed)
+    response = client_from(app, host).get("/metrics")
+    assert response.status_code == status_code
+    if status_code == 200:
+        assert "http_requests_total" in response.text
+
+
+def test_logged_in_session_can_read_metrics(app, db, allow_ips):
+    from app.core.models import TrustedDevice
+    from app.api.routers.auth import LOGIN_PASSWORD
+
+    allow_ips("")
+    db.add(TrustedDevice(device_name="metrics test", token="metrics-test-token"))
+    db.commit()
+
+    client = client_from(app, "203.0.113.7")
+    client.cookies.set("trusted_device_token", "metrics-test-token")
+    assert client.post("/login", data={"password": LOGIN_PASSWORD}).status_code == 303
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
@@ -0,0 +1,122 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.periods import (
+    PAYDAY, payday, period_for, period_bounds, shift_period, parse_period, period_to_date, adjust_date_for_weekend,
+    julian_day,
+)
+
+# 급여 주기 계산(app.core.periods)의 성질을 여러 해에 걸쳐 확인합니다.
+#   - 모든 날짜는 자기 주기의 [시작일, 종료일] 안에 있고, 이웃한 주기끼리 겹치거나 비는 날이 없음
+#   - 월급날은 항상 평일이며, 25일이 주말이면 직전 금요일
+#   - shift_period 는 되돌리면 원래 주기
+FIRST_YEAR, LAST_YEAR = 1990, 2100
+MONTHS = [(year, month) for year in range(FIRST_YEAR, LAST_YEAR + 1) for month in range(1, 13)]
+PERIODS = [f"{year:04d}-{month:02d}" for year, month in MONTHS]
+
+
+def all_days():
+    day, end = date(FIRST_YEAR, 1, 1), date(LAST_YEAR, 12, 31)
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def test_every_day_falls_inside_its_period():
+    for day in all_days():
+        start, end = period_bounds(period_for(day))
+        assert start <= day <= end, day
+
+
+def test_periods_tile_the_calendar():
+    for period in PERIODS[:-1]:
+        _, end = period_bounds(period)
+        next_start, next_end = period_bounds(shift_period(period, 1))
+        assert next_start == end + timedelta(days=1), period
+        assert next_start <= next_end
+        # 주기 길이는 월급날이 당겨진 만큼만 달라짐 (28일 - 2일 ~ 31일 + 2일)
+        assert 26 <= (next_end - next_start).days + 1 <= 33
+
+
+@pytest.mark.parametrize("year, month", MONTHS[::7])
+def test_payday_is_weekday_and_adjusted_backwards(year, month):
+    nominal = date(year, month, PAYDAY)
+    actual = payday(year, month)
+    assert actual.weekday() < 5
+    if nominal.weekday() < 5:
+        assert actual == nominal
+    else:
+        assert actual.weekday() == 4
+        assert nominal - actual == timedelta(days=nominal.weekday() - 4)
+
+
+def test_payday_starts_next_period():
+    for year, month in MONTHS:
+        day = payday(year, month)
+        period = f"{year:04d}-{month:02d}"
+        assert period_for(day - timedelta(days=1)) == period
+        assert period_for(day) == shift_period(period, 1)
+        assert period_bounds(period)[1] == day - timedelta(days=1)
+
+
+def test_weekend_payday_examples():
+    # 2024-02-25 는 일요일 -> 2024-02-23(금)부터 2024-03 주기
+    assert period_bounds("2024-03") == (date(2024, 2, 23), date(2024, 3, 24))
+    assert period_for(date(2024, 2, 22)) == "2024-02"
+    assert period_for(date(2024, 2, 23)) == "2024-03"
+    # 2025-10-25 는 토요일 -> 2025-10-24(금)
+    assert payday(2025, 10) == date(2025, 10, 24)
+    assert adjust_date_for_weekend(date(2025, 10, 26)) == date(2025, 10, 24)
+    # 연말: 12월 월급날 이후는 다음 해 1월 주기
+    assert period_for(date(2024, 12, 25)) == "2025-01"
+    assert period_for(date(2024, 12, 24)) == "2024-12"
+
+
+def test_shift_period_round_trip():
+    rng = random.Random(13)
+    for _ in range(5000):
+        period = rng.choice(PERIODS)
+        months = rng.randint(-300, 300)
+        shifted = shift_period(period, months)
+        assert shift_period(shifted, -months) == period
+        # 주기 문자열의 월 차이가 months 와 같음
+        diff = (int(shifted[:4]) - int(period[:4])) * 12 + int(shifted[5:7]) - int(period[5:7])
+        assert diff == months
+        assert 1 <= int(shifted[5:7]) <= 12
+
+
+def test_shift_period_crosses_year_boundary():
+    assert shift_period("2024-12", 1) == "2025-01"
+    assert shift_period("2025-01", -1) == "2024-12"
+    assert shift_period("2024-06", 12) == "2025-06"
+    assert shift_period("2024-06", -18) == "2022-12"
+
+
+def test_period_for_accepts_datetime_and_none():
+    rng = random.Random(2)
+    for _ in range(500):
+        day = date(FIRST_YEAR, 1, 1) + timedelta(days=rng.randrange(365 * 100))
+        assert period_for(datetime(day.year, day.month, day.day, 23, 59)) == period_for(day)
+    assert period_for(None) is None
+
+
+def test_parse_period():
+    today = date(2024, 2, 23)
+    assert parse_period("2024-5", today) == "2024-05"
+    assert parse_period("2024-05", today) == "2024-05"
+    assert parse_period("2024-13", today) == "2024-03"
+    assert parse_period("abc", today) == "2024-03"
+    assert parse_period(None, today) == "2024-03"
+    assert period_to_date("2024-03") == date(2024, 3, 1)
+
+
+def test_julian_day_matches_sqlite():
+    import sqlite3
+
+    conn = sqlite3.connect(":memory:")
+    for value in [date(1990, 1, 1), date(2000, 2, 29), date(2024, 12, 31), date(2100, 3, 1)]:
+        expected = conn.execute("SELECT julianday(?)", (value.isoformat(),)).fetchone()[0]
+        assert julian_day(value) == expected
+    conn.close()
@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+
+import pytest
+
+from main import QUERY_BUDGETS
+
+# 라우트별 쿼리 수 예산(main.QUERY_BUDGETS)을 실제 요청의 X-DB-Queries 로 확인합니다.
+# 데이터가 있어야 목록/집계 쿼리가 모두 실행되므로 각 화면에 몇 건씩 넣어 둡니다.
+TODAY = date.today()
+
+# 예산이 있는 라우트 중 쿼리 파라미터가 필요한 것
+ROUTE_PARAMS = {
+    "/diary/api/calendar": {"year": TODAY.year, "month": TODAY.month},
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seeded(client):
+    from app.core.database import SessionLocal
+    from app.core.models import Expense, Income, Assets, Task, LedgerExpense, MonthlyBudget, Diary
+
+    db = SessionLocal()
+    try:
+        for i in range(30):
+            day = TODAY - timedelta(days=i)
+            db.add(Expense(expense_type=("고정적", "변동적")[i % 2], expense_date=day,
+                           category=("식비", "교통", "생활")[i % 3], item=f"지출 {i}", amount=1000 + i))
+            db.add(LedgerExpense(expense_date=day, category=("식비", "교통", "생활")[i % 3], item=f"가계부 {i}", amount=500 + i))
+            db.add(Diary(diary_date=day, content=f"일기 {i}"))
+        for i in range(5):
+            db.add(Income(income_date=TODAY - timedelta(days=i * 7), income_type="급여", amount=3_000_000))
+            db.add(Assets(date=TODAY, category="예금", item=f"통장 {i}", amount=1_000_000))
+            db.add(Task(item_name=f"할 일 {i}", due_date=TODAY + timedelta(days=i), email="a@example.com"))
+        db.add(MonthlyBudget(month=TODAY.strftime("%Y-%m"), amount=1_000_000))
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("path, budget", sorted(QUERY_BUDGETS.items()))
+def test_route_stays_within_query_budget(client, path, budget):
+    # 첫 요청(기본 데이터 생성, 캐시 채우기)과 이후 요청 모두 예산 안이어야 합니다.
+    for _ in range(2):
+        response = client.get(path, params=ROUTE_PARAMS.get(path))
+        assert response.status_code == 200, response.text[:200]
+        queries = int(response.headers["X-DB-Queries"])
+        assert queries <= budget, f"{path}: {queries} queries > budget {budget}"
+        assert response.headers["X-DB-Repeated"] == "0", f"{path}: N+1 의심 문장 {response.headers['X-DB-Repeated']}개"
@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+# 업로드 경로의 multipart 본문은 StreamingFormParser 가 요청 스트림에서 바로 대상 폴더의 .part 파일로 받습니다.
+# (대상 폴더는 임시 폴더로 바꿔, 저장소의 static/ 에는 아무것도 남기지 않음)
+
+BOUNDARY = "test-boundary"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 4096
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    from app.service import uploads
+
+    monkeypatch.setitem(uploads.UPLOAD_KINDS, "diary", (str(tmp_path), "/static/diary/", 1024 * 1024, {"image/png"}))
+    return tmp_path
+
+
+def multipart_body(fields=(), files=()) -> bytes:
+    body = b""
+    for name, value in fields:
+        body += (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n").encode()
+    for name, filename, data in files:
+        body += (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"; filename=\"{filename}\"\r\n"
+                 f"Content-Type: application/octet-stream\r\n\r\n").encode() + data + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def parse(body: bytes, content_type=f"multipart/form-data; boundary={BOUNDARY}", chunk_size=1000):
+    """
+    body 를 chunk_size 씩 나눠 보내며 파싱합니다. (form, parser) 를 반환하고, 거절되면 UploadRejected 를 발생시킵니다.
+    """
+    from starlette.datastructures import Headers
+    from app.service.uploads import StreamingFormParser
+
+    async def stream():
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+
+    parser = StreamingFormParser(Headers({"content-type": content_type}), stream(), "diary")
+    return asyncio.run(parser.parse()), parser
+
+
+def leftovers(directory):
+    return sorted(os.listdir(directory))
+
+
+def test_file_is_streamed_into_upload_dir(upload_dir):
+    from app.service.uploads import StreamedUploadFile
+
+    form, _ = parse(multipart_body(fields=[("title", "제목"), ("content", "내용")], files=[("image", "a.png", PNG)]))
+    assert form["title"] == "제목"
+    assert form["content"] == "내용"
+    upload = form["image"]
+    assert isinstance(upload, StreamedUploadFile)
+    assert upload.size == len(PNG)
+    received = upload.received
+    assert received.sha256 == hashlib.sha256(PNG).hexdigest()
+    assert (received.content_type, received.extension) == ("image/png", "png")
+    assert os.path.dirname(received.temp_path) == str(upload_dir)
+    assert leftovers(upload_dir) == [os.path.basename(received.temp_path)]
+
+    # 라우트가 가져가지 않은 파일은 요청이 끝날 때(close) 지워집니다.
+    asyncio.run(upload.close())
+    assert leftovers(upload_dir) == []
+
+
+@pytest.mark.parametrize("files, status_code", [
+    ([("image", "big.png", PNG * 300)], 413),
+    ([("image", "a.txt", b"just some text, not an image")], 415),
+    ([("image", "a.png", PNG), ("image", "b.png", PNG)], 400),
+    ([("image", "empty.png", b"")], 400),
+])
+def test_rejected_upload_leaves_nothing(upload_dir, files, status_code):
+    from app.service.uploads import UploadRejected
+
+    with pytest.raises(UploadRejected) as e:
+        parse(multipart_body(files=files))
+    assert e.value.status_code == status_code
+    assert leftovers(upload_dir) == []
+
+
+def test_empty_file_field_is_plain_upload(upload_dir):
+    from app.service.uploads import StreamedUploadFile
+
+    form, _ = parse(multipart_body(fields=[("title", "제목")], files=[("image", "", b"")]))
+    assert form["image"].filename == ""
+    assert not isinstance(form["image"], StreamedUploadFile)
+    assert leftovers(upload_dir) == []
+
+
+@pytest.mark.parametrize("body, content_type", [
+    (multipart_body(fields=[("title", "제목")]), "multipart/form-data"),
+    (b"--test-boundary\r\nContent-Disposition: form-data\r\n\r\nx\r\n--test-boundary--\r\n",
+     f"multipart/form-data; boundary={BOUNDARY}"),
+])
+def test_malformed_body_is_rejected(upload_dir, body, content_type):
+    from app.service.uploads import UploadRejected
+
+    with pytest.raises(UploadRejected) as e:
+        parse(body, content_type=content_type)
+    assert e.value.status_code == 400
+
+
+def test_upload_route_uses_streaming_parser(upload_dir, monkeypatch):
+    from fastapi import APIRouter, FastAPI, File, Form, UploadFile
+    from fastapi.testclient import TestClient
+    from app.service import uploads
+
+    monkeypatch.setitem(uploads.UPLOAD_ROUTES, "/upload_test", "diary")
+    router = APIRouter(route_class=uploads.UploadRoute)
+
+    @router.post("/upload_test")
+    async def upload_test(title: str = Form(...), image: UploadFile = File(...)):
+        received = await uploads.receive_upload(image, "diary")
+        url = received.commit("saved")
+        return {"title": title, "url": url, "streamed": isinstance(image, uploads.StreamedUploadFile)}
+
+    test_app = FastAPI()
+    test_app.include_router(router)
+    client = TestClient(test_app)
+
+    response = client.post("/upload_test", data={"title": "제목"}, files={"image": ("a.png", PNG)})
+    assert response.status_code == 200
+    assert response.json() == {"title": "제목", "url": "/static/diary/saved.png", "streamed": True}
+    assert leftovers(upload_dir) == ["saved.png"]
+
+    response = client.post("/upload_test", data={"title": "제목"}, files={"image": ("a.txt", b"plain text file")})
+    assert response.status_code == 415
+    assert leftovers(upload_dir) == ["saved.png"]